@@ -2,31 +2,75 @@ from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from app.config import Config
+from app.json_provider import FleetJSONProvider
+from app import db
+from app.cache import cache
+from app.versions import versions
+from app.availability import availability
+from app.schedule import schedule
+from app.metrics import metrics
+from app.profiler import profiler
+from app.compression import compressor
+from app.events import events
 
 jwt = JWTManager()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FleetJSONProvider(app)
     CORS(app)
     jwt.init_app(app)
+    db.init_app(app)
+    cache.init_app(app)
+    versions.init_app(app)
+    availability.init_app(app)
+    schedule.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    compressor.init_app(app)
+    events.init_app(app)
+    if app.config["ANALYTICS_ENGINE"]:
+        from app.columnar import engine
+        engine.init_app(app)
 
     from app.routes.auth import auth
     from app.routes.vehicle_Reg import vehicle_bp
     from app.routes.trips import trip_bp
     from app.routes.drivers import driver_bp
+    from app.routes.driver import driver_performance_bp
     from app.routes.maintenance import maintenance_bp
     from app.routes.expense import expense_bp
     from app.routes.analytics import analytics_bp
     from app.routes.users import users_bp
+    from app.routes.system import system_bp
+    from app.routes.export import export_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.events import events_bp
 
     app.register_blueprint(auth)
     app.register_blueprint(vehicle_bp)
     app.register_blueprint(trip_bp)
     app.register_blueprint(driver_bp)
+    app.register_blueprint(driver_performance_bp)
     app.register_blueprint(maintenance_bp)
     app.register_blueprint(expense_bp)
     app.register_blueprint(analytics_bp)
     app.register_blueprint(users_bp)
+    app.register_blueprint(system_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(events_bp)
+
+    from app.counters import counters_cli
+    from app.ledger import ledger_cli
+    from app.driver_stats import driver_stats_cli
+    from app.rollups import rollups_cli
+    from app.sync import sync_cli
+    app.cli.add_command(counters_cli)
+    app.cli.add_command(ledger_cli)
+    app.cli.add_command(driver_stats_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(sync_cli)
 
     return app 
\ No newline at end of file
@@ -0,0 +1,216 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import date
+
+from app.db import pooled_connection
+
+# In-memory indexes of dispatchable vehicles and drivers for auto-assignment.
+# Available vehicles are grouped by required license category and kept sorted
+# by capacity, so the smallest one that fits a load is one bisect per
+# category; on-duty drivers are grouped by license category and ordered by
+# safety score. Write routes call vehicles_changed()/drivers_changed()
+# after commit and the affected rows are re-read on the next lookup. The whole
+# index is also reloaded every AVAILABILITY_REFRESH seconds, which bounds how
+# stale another worker's writes can make it.
+#
+# The index only proposes a pair; dispatch_trip still claims both rows with
+# conditional UPDATEs, so a stale suggestion fails cleanly with a 409.
+
+VEHICLE_QUERY = """
+    SELECT id, model_name, license_plate, vehicle_type, required_license_category, max_capacity_kg
+    FROM vehicles WHERE status='available'
+"""
+
+DRIVER_QUERY = """
+    SELECT id, name, license_category, license_expiry_date, safety_score
+    FROM drivers WHERE status='on_duty'
+"""
+
+
+def _fetch(cursor, query, ids=None):
+    """Rows of an index query, restricted to `ids` if given (none for an empty set)."""
+    if ids is not None:
+        if not ids:
+            return []
+        cursor.execute(f"{query} AND id IN ({', '.join(['%s'] * len(ids))})", tuple(ids))
+    else:
+        cursor.execute(query)
+    return cursor.fetchall()
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self.refresh_interval = 60
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at = None
+        self._by_capacity = {}
+        self._vehicles = {}
+        self._by_category = {}
+        self._drivers = {}
+        self._dirty_vehicles = set()
+        self._dirty_drivers = set()
+
+    def init_app(self, app):
+        self.refresh_interval = app.config["AVAILABILITY_REFRESH"]
+
+    def vehicles_changed(self, *vehicle_ids):
+        with self._lock:
+            self._dirty_vehicles.update(vehicle_ids)
+
+    def drivers_changed(self, *driver_ids):
+        with self._lock:
+            self._dirty_drivers.update(driver_ids)
+
+    def invalidate_all(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def _needs_refresh(self):
+        return self._is_stale() or self._dirty_vehicles or self._dirty_drivers
+
+    def _add_vehicle(self, row):
+        self._vehicles[row["id"]] = row
+        insort(self._by_capacity.setdefault(row["required_license_category"], []),
+               (row["max_capacity_kg"], row["id"]))
+
+    def _remove_vehicle(self, vehicle_id):
+        row = self._vehicles.pop(vehicle_id, None)
+        if row:
+            entries = self._by_capacity[row["required_license_category"]]
+            entries.pop(bisect_left(entries, (row["max_capacity_kg"], vehicle_id)))
+
+    def _add_driver(self, row):
+        self._drivers[row["id"]] = row
+        insort(self._by_category.setdefault(row["license_category"], []), (-row["safety_score"], row["id"]))
+
+    def _remove_driver(self, driver_id):
+        row = self._drivers.pop(driver_id, None)
+        if row:
+            entries = self._by_category[row["license_category"]]
+            entries.pop(bisect_left(entries, (-row["safety_score"], driver_id)))
+
+    def _ensure_fresh(self):
+        """Apply pending changes and periodic reloads; call without holding _lock.
+
+        The queries run outside _lock, so lookups keep answering from the
+        current data meanwhile, and only one thread loads at a time. Rows are
+        re-read after their ids are taken from the dirty sets, so a change
+        marked during a load is picked up by the next one.
+        """
+        with self._lock:
+            if not self._needs_refresh():
+                return
+            loaded = self._loaded_at is not None
+
+        # With data to serve, don't queue up behind a load already running.
+        if not self._refresh_lock.acquire(blocking=not loaded):
+            return
+        try:
+            with self._lock:
+                if not self._needs_refresh():
+                    return
+                stale = self._is_stale()
+                dirty_vehicles, self._dirty_vehicles = self._dirty_vehicles, set()
+                dirty_drivers, self._dirty_drivers = self._dirty_drivers, set()
+
+            try:
+                with pooled_connection() as conn:
+                    cursor = conn.cursor(dictionary=True)
+                    if stale:
+                        vehicles = _fetch(cursor, VEHICLE_QUERY)
+                        drivers = _fetch(cursor, DRIVER_QUERY)
+                    else:
+                        vehicles = _fetch(cursor, VEHICLE_QUERY, dirty_vehicles)
+                        drivers = _fetch(cursor, DRIVER_QUERY, dirty_drivers)
+                    cursor.close()
+            except Exception:
+                with self._lock:
+                    self._dirty_vehicles |= dirty_vehicles
+                    self._dirty_drivers |= dirty_drivers
+                raise
+
+            if stale:
+                fresh = AvailabilityIndex()
+                for row in vehicles:
+                    fresh._add_vehicle(row)
+                for row in drivers:
+                    fresh._add_driver(row)
+                with self._lock:
+                    self._vehicles, self._by_capacity = fresh._vehicles, fresh._by_capacity
+                    self._drivers, self._by_category = fresh._drivers, fresh._by_category
+                    self._loaded_at = time.monotonic()
+            else:
+                with self._lock:
+                    for vehicle_id in dirty_vehicles:
+                        self._remove_vehicle(vehicle_id)
+                    for row in vehicles:
+                        self._add_vehicle(row)
+                    for driver_id in dirty_drivers:
+                        self._remove_driver(driver_id)
+                    for row in drivers:
+                        self._add_driver(row)
+        finally:
+            self._refresh_lock.release()
+
+    def _best_driver(self, license_category, today):
+        for _, driver_id in self._by_category.get(license_category, []):
+            driver = self._drivers[driver_id]
+            if driver["license_expiry_date"] >= today:
+                return driver
+        return None
+
+    def find(self, cargo_weight):
+        """Return (vehicle, driver) for the smallest available vehicle that fits
+        `cargo_weight` and has an on-duty driver with a valid license, or None.
+
+        Among drivers of the right category the highest safety score wins.
+        """
+        self._ensure_fresh()
+
+        with self._lock:
+            today = date.today()
+            best = None
+
+            for category, entries in self._by_capacity.items():
+                index = bisect_left(entries, (cargo_weight, 0))
+                if index == len(entries) or (best and entries[index] >= best[0]):
+                    continue
+                driver = self._best_driver(category, today)
+                if driver:
+                    best = (entries[index], driver)
+
+            if not best:
+                return None
+            return self._vehicles[best[0][1]], best[1]
+
+    def snapshot(self):
+        """Copies of the available vehicles by id and of the dispatchable
+        drivers by license category, best first."""
+        self._ensure_fresh()
+
+        with self._lock:
+            today = date.today()
+            drivers = {
+                category: [
+                    self._drivers[driver_id] for _, driver_id in entries
+                    if self._drivers[driver_id]["license_expiry_date"] >= today
+                ]
+                for category, entries in self._by_category.items()
+            }
+            return dict(self._vehicles), drivers
+
+    def stats(self):
+        with self._lock:
+            return {
+                "vehicles": len(self._vehicles),
+                "drivers": len(self._drivers),
+                "age": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+            }
+
+
+availability = AvailabilityIndex()
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response, Response
+from flask_jwt_extended import get_jwt
+
+from app.versions import versions
+
+# Response cache for read-heavy list endpoints. Entries are keyed by endpoint,
+# role, query args and the current generation of every table group the view
+# reads. Write routes call cache.invalidate(<group>) after commit, which bumps
+# that group's generation so older entries are never served again and age out
+# of the LRU. It also bumps the group's ETag version (app/versions.py), even
+# with the cache disabled.
+#
+# The in-process backend is per worker. When running several workers, point
+# CACHE_BACKEND at "redis" so invalidations are shared.
+
+
+class MemoryBackend:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def generations(self, groups):
+        with self._lock:
+            return [self._generations.get(group, 0) for group in groups]
+
+    def bump(self, group):
+        with self._lock:
+            self._generations[group] = self._generations.get(group, 0) + 1
+
+    def size(self):
+        return len(self._entries)
+
+
+class SharedBackend:
+    """Backend over a Redis-style client (get, set with ex=, mget, incr)."""
+
+    PREFIX = "fleetflow:cache:"
+
+    def __init__(self, client):
+        self.client = client
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self.client.get(self.PREFIX + key)
+        if raw is None:
+            return None
+        status, mimetype, body = raw.split(b"\n", 2)
+        return int(status), mimetype.decode(), body
+
+    def set(self, key, value, ttl):
+        status, mimetype, body = value
+        raw = f"{status}\n{mimetype}\n".encode() + body
+        self.client.set(self.PREFIX + key, raw, ex=max(1, int(ttl)))
+
+    def generations(self, groups):
+        values = self.client.mget([self.PREFIX + "gen:" + group for group in groups])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, group):
+        self.client.incr(self.PREFIX + "gen:" + group)
+
+    def size(self):
+        return None
+
+
+class LocalSharedClient:
+    """In-process stand-in for a Redis client, for development and tests."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            value = int(value) + 1
+            self._data[key] = (str(value).encode(), expires_at)
+            return value
+
+
+class ResponseCache:
+    def __init__(self):
+        self.enabled = False
+        self.backend = None
+        self.ttl = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0}
+
+    def init_app(self, app):
+        self.enabled = app.config["CACHE_ENABLED"]
+        self.ttl = app.config["CACHE_TTL"]
+
+        backend = app.config["CACHE_BACKEND"]
+        if backend == "memory":
+            self.backend = MemoryBackend(app.config["CACHE_MAX_ENTRIES"])
+        elif backend == "local":
+            self.backend = SharedBackend(LocalSharedClient())
+        elif backend == "redis":
+            import redis
+            self.backend = SharedBackend(redis.Redis.from_url(app.config["CACHE_REDIS_URL"]))
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _key(self, groups):
+        role = get_jwt().get("role", "")
+        generations = ",".join(str(gen) for gen in self.backend.generations(groups))
+        args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+        return f"{request.endpoint}|{role}|{generations}|{request.path}?{args}"
+
+    def cached(self, *groups):
+        """Cache a view's 200 responses until one of `groups` is invalidated or the TTL expires."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                key = self._key(groups)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._count("hits")
+                    status, mimetype, body = entry
+                    response = Response(body, status=status, mimetype=mimetype)
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+
+                self._count("misses")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.backend.set(key, (response.status_code, response.mimetype, response.get_data()), self.ttl)
+                    self._count("stores")
+                response.headers["X-Cache"] = "MISS"
+                return response
+            return wrapper
+        return decorator
+
+    def invalidate(self, *groups):
+        versions.bump(*groups)
+        if not self.enabled:
+            return
+        for group in groups:
+            self.backend.bump(group)
+            self._count("invalidations")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0
+        stats["evictions"] = self.backend.evictions if self.backend else 0
+        stats["entries"] = self.backend.size() if self.backend else 0
+        return stats
+
+
+cache = ResponseCache()
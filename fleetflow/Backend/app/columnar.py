@@ -0,0 +1,576 @@
+import re
+import threading
+import time
+
+import numpy as np
+
+from app.db import pooled_connection
+
+# In-process columnar copy of vehicles, trips, fuel_logs and maintenance_logs
+# for ad-hoc analyst queries (POST /analytics/query). Each table is a dict of
+# NumPy arrays ordered by id; strings are dictionary-encoded to int32 codes.
+# A query is a vectorized filter mask, a group index built from the key
+# columns and bincount/sort kernels, so it never touches MySQL.
+#
+# Refreshes are incremental: rows above each table's id watermark are
+# appended, trips that were still open (draft/scheduled/dispatched, the only
+# ones whose status can change) are re-read, and vehicles are reloaded whole.
+# If a table then holds fewer rows than the database has up to its watermark,
+# rows were deleted and that table is reloaded. Data is at most
+# ANALYTICS_REFRESH seconds old and, like the other in-memory indexes, per
+# process. Only loaded with ANALYTICS_ENGINE on, since it needs NumPy.
+
+VEHICLE_COLUMNS = [
+    ("id", "int"), ("vehicle_type", "category"), ("required_license_category", "category"),
+    ("status", "category"), ("max_capacity_kg", "float"), ("odometer_reading", "float"),
+    ("acquisition_cost", "float")
+]
+
+TRIP_COLUMNS = [
+    ("id", "int"), ("vehicle_id", "int"), ("driver_id", "int"), ("cargo_weight", "float"),
+    ("start_odometer", "float"), ("end_odometer", "float"), ("status", "category"),
+    ("revenue", "float"), ("created_at", "datetime"), ("completed_at", "datetime")
+]
+
+FUEL_COLUMNS = [
+    ("id", "int"), ("vehicle_id", "int"), ("trip_id", "int"), ("liters", "float"),
+    ("cost", "float"), ("fuel_date", "datetime")
+]
+
+MAINTENANCE_COLUMNS = [
+    ("id", "int"), ("vehicle_id", "int"), ("service_type", "category"),
+    ("cost", "float"), ("service_date", "datetime")
+]
+
+TABLES = {
+    "vehicles": VEHICLE_COLUMNS,
+    "trips": TRIP_COLUMNS,
+    "fuel_logs": FUEL_COLUMNS,
+    "maintenance_logs": MAINTENANCE_COLUMNS
+}
+
+# Columns computed at query time: (kind, description).
+DERIVED = {
+    "trips": {
+        "vehicle_type": ("category", "type of the trip's vehicle"),
+        "distance": ("float", "end_odometer - start_odometer"),
+        "duration_hours": ("float", "completed_at - created_at in hours"),
+        "fuel_cost": ("float", "sum of fuel_logs.cost for the trip")
+    },
+    "fuel_logs": {
+        "vehicle_type": ("category", "type of the vehicle")
+    },
+    "maintenance_logs": {
+        "vehicle_type": ("category", "type of the vehicle")
+    }
+}
+
+OPEN_TRIP_STATUSES = ["draft", "scheduled", "dispatched"]
+
+DTYPES = {"int": np.int64, "float": np.float64, "datetime": "datetime64[s]", "category": np.int32}
+
+FETCH_SIZE = 50000
+REFRESH_CHUNK = 1000
+MAX_RESULT_ROWS = 10000
+
+_BUCKETED = re.compile(r"^(day|week|month|year)\((\w+)\)$")
+
+
+class QueryError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class ColumnTable:
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+        self.kinds = dict(columns)
+        self.vocab = {col: [] for col, kind in columns if kind == "category"}
+        self._codes = {col: {} for col in self.vocab}
+        self.clear()
+
+    def clear(self):
+        self.arrays = {col: np.empty(0, dtype=DTYPES[kind]) for col, kind in self.columns}
+
+    def __len__(self):
+        return len(self.arrays["id"])
+
+    @property
+    def watermark(self):
+        ids = self.arrays["id"]
+        return int(ids[-1]) if len(ids) else 0
+
+    def _code(self, col, value):
+        if value is None:
+            return -1
+        codes = self._codes[col]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.vocab[col])
+            self.vocab[col].append(value)
+        return code
+
+    def lookup(self, col, value):
+        """Code of a category value, or None if it has never been seen."""
+        return self._codes[col].get(value)
+
+    def convert(self, rows):
+        values = list(zip(*rows)) if rows else [()] * len(self.columns)
+        arrays = {}
+        for (col, kind), column in zip(self.columns, values):
+            if kind == "int":
+                arrays[col] = np.fromiter((-1 if v is None else v for v in column), np.int64, len(column))
+            elif kind == "category":
+                arrays[col] = np.fromiter((self._code(col, v) for v in column), np.int32, len(column))
+            else:
+                arrays[col] = np.array(column, dtype=DTYPES[kind])
+        return arrays
+
+    def append(self, chunks):
+        if not chunks:
+            return
+        self.arrays = {
+            col: np.concatenate([self.arrays[col]] + [chunk[col] for chunk in chunks])
+            for col in self.arrays
+        }
+
+    def update(self, chunk):
+        """Overwrite existing rows (matched by id) in place."""
+        if not len(chunk["id"]):
+            return
+        positions = np.searchsorted(self.arrays["id"], chunk["id"])
+        for col, values in chunk.items():
+            self.arrays[col][positions] = values
+
+
+def _fetch(cursor, table, query, params=()):
+    """Run a SELECT of the table's columns and return its rows as converted chunks."""
+    cursor.execute(query, params)
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        chunks.append(table.convert(rows))
+    return chunks
+
+
+def _select(table, where=""):
+    return f"SELECT {', '.join(col for col, _ in table.columns)} FROM {table.name} {where} ORDER BY id"
+
+
+def _positions(sorted_ids, ids):
+    """Index of each id in sorted_ids, and whether it was found there."""
+    if not len(sorted_ids):
+        return np.zeros(len(ids), np.int64), np.zeros(len(ids), bool)
+    positions = np.searchsorted(sorted_ids, ids)
+    positions[positions == len(sorted_ids)] = 0
+    return positions, sorted_ids[positions] == ids
+
+
+def _bucket(values, bucket):
+    days = values.astype("datetime64[D]")
+    if bucket == "week":
+        # 1970-01-01 was a Thursday; shift to the Monday on or before.
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    if bucket == "month":
+        return values.astype("datetime64[M]").astype("datetime64[D]")
+    if bucket == "year":
+        return values.astype("datetime64[Y]").astype("datetime64[D]")
+    return days
+
+
+def _sorted_groups(groups, values, count):
+    """Values sorted within each group, with each group's start offset and size."""
+    # Sort by value, then stably by group: cheaper than lexsort on two keys.
+    order = np.argsort(values)
+    order = order[np.argsort(groups[order], kind="stable")]
+    sizes = np.bincount(groups, minlength=count)
+    starts = np.cumsum(sizes) - sizes
+    return values[order], starts, sizes
+
+
+def _percentiles(sorted_values, starts, sizes, q):
+    """Linear-interpolated percentile q (0-100) of every group, NaN for empty groups."""
+    result = np.full(len(sizes), np.nan)
+    present = sizes > 0
+    rank = (sizes[present] - 1) * (q / 100.0)
+    low = np.floor(rank).astype(np.int64)
+    high = np.minimum(low + 1, sizes[present] - 1)
+    base = starts[present]
+    lower = sorted_values[base + low]
+    upper = sorted_values[base + high]
+    result[present] = lower + (upper - lower) * (rank - low)
+    return result
+
+
+def _json_value(value):
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else str(np.datetime_as_string(value, unit="D"))
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), 4)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+
+class AnalyticsEngine:
+    def __init__(self):
+        self.refresh_interval = 60
+        self._lock = threading.Lock()
+        self._tables = {name: ColumnTable(name, columns) for name, columns in TABLES.items()}
+        self._derived = {}
+        self._refreshed_at = None
+        self._stats = {"reloads": 0, "refreshes": 0, "queries": 0, "last_refresh_ms": None}
+
+    def init_app(self, app):
+        self.refresh_interval = app.config["ANALYTICS_REFRESH"]
+        app.extensions["analytics_engine"] = self
+
+    # Loading
+
+    def _load_table(self, cursor, table):
+        table.clear()
+        table.append(_fetch(cursor, table, _select(table)))
+
+    def _count_up_to(self, cursor, table):
+        cursor.execute(f"SELECT COUNT(*) FROM {table.name} WHERE id <= %s", (table.watermark,))
+        return cursor.fetchone()[0]
+
+    def _refresh_trips(self, cursor, trips):
+        open_codes = [code for code in (trips.lookup("status", s) for s in OPEN_TRIP_STATUSES) if code is not None]
+        open_ids = trips.arrays["id"][np.isin(trips.arrays["status"], open_codes)].tolist()
+        for start in range(0, len(open_ids), REFRESH_CHUNK):
+            ids = open_ids[start:start + REFRESH_CHUNK]
+            where = f"WHERE id IN ({', '.join(['%s'] * len(ids))})"
+            for chunk in _fetch(cursor, trips, _select(trips, where), tuple(ids)):
+                trips.update(chunk)
+
+    def _refresh(self, cursor):
+        started = time.perf_counter()
+
+        self._load_table(cursor, self._tables["vehicles"])
+
+        for name in ["trips", "fuel_logs", "maintenance_logs"]:
+            table = self._tables[name]
+            if name == "trips" and len(table):
+                self._refresh_trips(cursor, table)
+            if len(table) and self._count_up_to(cursor, table) != len(table):
+                self._load_table(cursor, table)
+                self._stats["reloads"] += 1
+            else:
+                table.append(_fetch(cursor, table, _select(table, "WHERE id > %s"), (table.watermark,)))
+
+        self._derived = {}
+        self._refreshed_at = time.monotonic()
+        self._stats["refreshes"] += 1
+        self._stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    def refresh(self, force=False):
+        with self._lock:
+            self._ensure_fresh(force)
+
+    def _ensure_fresh(self, force=False):
+        stale = self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_interval
+        if not stale and not force:
+            return
+
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._refresh(cursor)
+            finally:
+                cursor.close()
+
+    def load_rows(self, name, rows):
+        """Append already-fetched rows (tuples in TABLES column order); for benchmarks."""
+        with self._lock:
+            table = self._tables[name]
+            table.append([table.convert(rows)])
+            self._derived = {}
+            self._refreshed_at = time.monotonic()
+
+    # Columns
+
+    def _derive(self, name, col):
+        table = self._tables[name]
+        arrays = table.arrays
+
+        if col == "vehicle_type":
+            vehicles = self._tables["vehicles"].arrays
+            positions, found = _positions(vehicles["id"], arrays["vehicle_id"])
+            types = vehicles["vehicle_type"][positions] if len(vehicles["id"]) else -1
+            return np.where(found, types, -1).astype(np.int32)
+        if col == "distance":
+            return arrays["end_odometer"] - arrays["start_odometer"]
+        if col == "duration_hours":
+            seconds = (arrays["completed_at"] - arrays["created_at"]).astype("timedelta64[s]")
+            hours = seconds.astype(np.float64) / 3600
+            hours[np.isnat(seconds)] = np.nan
+            return hours
+        if col == "fuel_cost":
+            fuel = self._tables["fuel_logs"].arrays
+            positions, found = _positions(arrays["id"], fuel["trip_id"])
+            return np.bincount(positions[found], weights=fuel["cost"][found], minlength=len(arrays["id"]))
+        raise QueryError(f"Unknown column {col!r}")
+
+    def _column(self, name, col):
+        """(values, kind, source) of a stored or derived column.
+
+        source is the (table, column) whose dictionary decodes a category.
+        """
+        table = self._tables[name]
+        if col in table.kinds:
+            return table.arrays[col], table.kinds[col], (table, col)
+
+        derived = DERIVED.get(name, {})
+        if col not in derived:
+            raise QueryError(f"Unknown column {col!r} for {name}")
+        key = (name, col)
+        if key not in self._derived:
+            self._derived[key] = self._derive(name, col)
+        # The only derived category is vehicle_type, decoded by vehicles.
+        return self._derived[key], derived[col][0], (self._tables["vehicles"], "vehicle_type")
+
+    def _numeric(self, name, col):
+        values, kind, _ = self._column(name, col)
+        if kind not in ("int", "float"):
+            raise QueryError(f"{col} is not numeric")
+        return values.astype(np.float64, copy=False)
+
+    # Filtering
+
+    def _filter(self, name, spec, mask):
+        if not isinstance(spec, dict) or "column" not in spec or "op" not in spec:
+            raise QueryError("Each filter needs a column and an op")
+        values, kind, (source, source_col) = self._column(name, spec["column"])
+        op = spec["op"]
+        value = spec.get("value")
+
+        if op == "is_null" or op == "not_null":
+            if kind == "category":
+                null = values < 0
+            elif kind == "datetime":
+                null = np.isnat(values)
+            elif kind == "int":
+                null = values < 0
+            else:
+                null = np.isnan(values)
+            return mask & (null if op == "is_null" else ~null)
+
+        if kind == "category":
+            def code(v):
+                found = source.lookup(source_col, v)
+                return -2 if found is None else found
+
+            if op in ("in", "not_in"):
+                if not isinstance(value, list):
+                    raise QueryError(f"{op} needs a list value")
+                selected = np.isin(values, [code(v) for v in value])
+                return mask & (selected if op == "in" else ~selected)
+            if op == "=":
+                return mask & (values == code(value))
+            if op == "!=":
+                return mask & (values != code(value)) & (values >= 0)
+            raise QueryError(f"{spec['column']} only supports =, !=, in, not_in, is_null and not_null")
+
+        if kind == "datetime":
+            try:
+                convert = lambda v: np.datetime64(v, "s")
+                operand = [convert(v) for v in value] if op in ("in", "not_in") else convert(value)
+            except (TypeError, ValueError):
+                raise QueryError(f"{spec['column']} needs ISO 8601 date or datetime values")
+        else:
+            if op in ("in", "not_in"):
+                if not isinstance(value, list) or not all(isinstance(v, (int, float)) for v in value):
+                    raise QueryError(f"{op} needs a list of numbers")
+                operand = value
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                operand = value
+            else:
+                raise QueryError(f"{spec['column']} needs a numeric value")
+
+        comparisons = {
+            "=": np.equal, "!=": np.not_equal, "<": np.less,
+            "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal
+        }
+        if op in ("in", "not_in"):
+            selected = np.isin(values, operand)
+            return mask & (selected if op == "in" else ~selected)
+        if op not in comparisons:
+            raise QueryError(f"Unknown op {op!r}")
+        return mask & comparisons[op](values, operand)
+
+    # Grouping and aggregation
+
+    def _group_keys(self, name, group_by, rows):
+        """Group index per selected row, group count and label arrays per key."""
+        if not group_by:
+            return np.zeros(len(rows), np.int64), 1, []
+
+        inverses = []
+        uniques = []
+        labelers = []
+        for key in group_by:
+            if not isinstance(key, str):
+                raise QueryError("group_by entries must be strings")
+            match = _BUCKETED.match(key)
+            col = match.group(2) if match else key
+            values, kind, (source, source_col) = self._column(name, col)
+            values = values[rows]
+
+            if match:
+                if kind != "datetime":
+                    raise QueryError(f"{match.group(1)}() needs a datetime column")
+                values = _bucket(values, match.group(1))
+                labelers.append(_json_value)
+            elif kind == "category":
+                labelers.append(lambda code, vocab=source.vocab[source_col]: vocab[code] if code >= 0 else None)
+            elif kind == "int":
+                labelers.append(lambda value: int(value) if value >= 0 else None)
+            else:
+                raise QueryError(f"Cannot group by {key}; use a category, id or day/week/month/year(column)")
+
+            unique, inverse = np.unique(values, return_inverse=True)
+            uniques.append(unique)
+            inverses.append(inverse.reshape(-1))
+
+        if len(inverses) == 1:
+            return inverses[0], len(uniques[0]), [(uniques[0], labelers[0])]
+
+        combined = np.ravel_multi_index(inverses, [len(u) for u in uniques])
+        present, groups = np.unique(combined, return_inverse=True)
+        positions = np.unravel_index(present, [len(u) for u in uniques])
+        labels = [(unique[pos], labeler) for unique, pos, labeler in zip(uniques, positions, labelers)]
+        return groups.reshape(-1), len(present), labels
+
+    def _aggregate(self, name, spec, rows, groups, count):
+        if not isinstance(spec, dict) or "fn" not in spec:
+            raise QueryError("Each aggregate needs an fn")
+        fn = spec["fn"]
+
+        if fn == "count":
+            return [(spec.get("as", "count"), np.bincount(groups, minlength=count))]
+
+        if fn == "ratio":
+            numerator = self._numeric(name, spec.get("numerator", ""))[rows]
+            denominator = self._numeric(name, spec.get("denominator", ""))[rows]
+            ok = ~np.isnan(numerator) & ~np.isnan(denominator)
+            top = np.bincount(groups[ok], weights=numerator[ok], minlength=count)
+            bottom = np.bincount(groups[ok], weights=denominator[ok], minlength=count)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = np.where(bottom != 0, top / bottom, np.nan)
+            label = f"ratio({spec['numerator']},{spec['denominator']})"
+            return [(spec.get("as", label), ratio)]
+
+        column = spec.get("column")
+        values = self._numeric(name, column)[rows]
+        ok = ~np.isnan(values)
+        values, member = values[ok], groups[ok]
+
+        if fn in ("sum", "mean"):
+            total = np.bincount(member, weights=values, minlength=count)
+            if fn == "sum":
+                return [(spec.get("as", f"sum({column})"), total)]
+            seen = np.bincount(member, minlength=count)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return [(spec.get("as", f"mean({column})"), np.where(seen > 0, total / seen, np.nan))]
+
+        if fn in ("min", "max", "median", "percentile"):
+            sorted_values, starts, sizes = _sorted_groups(member, values, count)
+            if fn == "percentile":
+                qs = spec.get("q", [50])
+                qs = qs if isinstance(qs, list) else [qs]
+                if not all(isinstance(q, (int, float)) and 0 <= q <= 100 for q in qs):
+                    raise QueryError("q must be a number or list of numbers between 0 and 100")
+                return [
+                    (f"p{q:g}({column})", _percentiles(sorted_values, starts, sizes, q))
+                    for q in qs
+                ]
+            q = {"min": 0, "max": 100, "median": 50}[fn]
+            return [(spec.get("as", f"{fn}({column})"), _percentiles(sorted_values, starts, sizes, q))]
+
+        raise QueryError(f"Unknown aggregate {fn!r}")
+
+    def query(self, spec):
+        """Run a query spec; see the /analytics/query docstring for its shape."""
+        if not isinstance(spec, dict):
+            raise QueryError("Query must be a JSON object")
+        name = spec.get("table")
+        if name not in TABLES:
+            raise QueryError(f"table must be one of {', '.join(TABLES)}")
+        group_by = spec.get("group_by", [])
+        aggregates = spec.get("aggregates", [{"fn": "count"}])
+        filters = spec.get("filters", [])
+        limit = spec.get("limit", 1000)
+        if not isinstance(group_by, list) or not isinstance(aggregates, list) or not isinstance(filters, list):
+            raise QueryError("group_by, aggregates and filters must be lists")
+        if not isinstance(limit, int) or not 0 < limit <= MAX_RESULT_ROWS:
+            raise QueryError(f"limit must be between 1 and {MAX_RESULT_ROWS}")
+
+        with self._lock:
+            self._ensure_fresh(force=spec.get("refresh") is True)
+            started = time.perf_counter()
+
+            mask = np.ones(len(self._tables[name]), dtype=bool)
+            for condition in filters:
+                mask = self._filter(name, condition, mask)
+            rows = np.flatnonzero(mask)
+
+            groups, count, labels = self._group_keys(name, group_by, rows)
+            columns = list(group_by)
+            results = []
+            for aggregate in aggregates:
+                for label, values in self._aggregate(name, aggregate, rows, groups, count):
+                    columns.append(label)
+                    results.append(values)
+
+            order = np.arange(count)
+            order_by = spec.get("order_by")
+            if order_by is not None:
+                if order_by not in columns[len(group_by):]:
+                    raise QueryError(f"order_by must name an aggregate: {', '.join(columns[len(group_by):])}")
+                values = results[columns.index(order_by) - len(group_by)]
+                # NaNs sort last either way.
+                keys = np.where(np.isnan(values), np.inf, -values if spec.get("desc") else values)
+                order = np.argsort(keys, kind="stable")
+            order = order[:limit]
+
+            output = []
+            for index in order:
+                row = [labeler(unique[index]) for unique, labeler in labels]
+                row.extend(_json_value(values[index]) for values in results)
+                output.append(row)
+
+            self._stats["queries"] += 1
+            return {
+                "table": name,
+                "columns": columns,
+                "rows": output,
+                "groups": int(count),
+                "rows_scanned": int(len(rows)),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+                "data_age_seconds": round(time.monotonic() - self._refreshed_at, 1)
+            }
+
+    def schema(self):
+        return {
+            name: {
+                "columns": {col: kind for col, kind in columns},
+                "derived": {col: f"{kind}: {description}" for col, (kind, description) in DERIVED.get(name, {}).items()}
+            }
+            for name, columns in TABLES.items()
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "rows": {name: len(table) for name, table in self._tables.items()},
+                "age": round(time.monotonic() - self._refreshed_at, 1) if self._refreshed_at else None
+            }
+
+
+engine = AnalyticsEngine()
@@ -0,0 +1,89 @@
+import gzip
+import threading
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response compression negotiated from Accept-Encoding. Buffered responses of
+# at least COMPRESS_MIN_SIZE bytes with a text-like mimetype are compressed
+# with br (when the brotli package is installed) or gzip, whichever the client
+# prefers. Streamed responses (the exports) are left alone, as are responses
+# that already carry a Content-Encoding. The response cache stores bodies
+# before this runs, so one cached body serves every encoding.
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/csv", "text/plain", "text/html", "application/x-ndjson"}
+
+
+class Compressor:
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 0
+        self.gzip_level = 1
+        self.br_quality = 4
+        self._lock = threading.Lock()
+        self._counters = {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def init_app(self, app):
+        self.enabled = app.config["COMPRESS_ENABLED"]
+        self.min_size = app.config["COMPRESS_MIN_SIZE"]
+        self.gzip_level = app.config["COMPRESS_GZIP_LEVEL"]
+        self.br_quality = app.config["COMPRESS_BR_QUALITY"]
+        if self.enabled:
+            app.after_request(self._compress)
+
+    def encodings(self):
+        return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    def negotiate(self, accept_encoding):
+        """Best encoding we support from an Accept-Encoding value, or None."""
+        accepted = accept_encoding.quality
+        best = max(self.encodings(), key=lambda encoding: accepted(encoding))
+        return best if accepted(best) > 0 else None
+
+    def encode(self, body, encoding):
+        if encoding == "br":
+            return brotli.compress(body, quality=self.br_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compress(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+
+        compressed = self.encode(body, encoding)
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+
+        with self._lock:
+            self._counters["responses"] += 1
+            self._counters["bytes_in"] += len(body)
+            self._counters["bytes_out"] += len(compressed)
+        return response
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["ratio"] = round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else 0
+        stats["encodings"] = self.encodings()
+        return stats
+
+
+compressor = Compressor()
@@ -2,3 +2,101 @@ import os
 class Config:
     SECRET_KEY = "super-secret-key"
     JWT_SECRET_KEY = "jwt-secret-key"
+
+    DB_HOST = os.environ.get("DB_HOST", "localhost")
+    DB_PORT = int(os.environ.get("DB_PORT", 3306))
+    DB_USER = os.environ.get("DB_USER", "root")
+    DB_PASSWORD = os.environ.get("DB_PASSWORD", "123456")
+    DB_NAME = os.environ.get("DB_NAME", "fleetflow")
+
+    # Connection pool: DB_POOL_SIZE connections are kept open, up to
+    # DB_POOL_MAX_OVERFLOW extra ones are opened under load and closed when
+    # returned. A checkout waits at most DB_POOL_TIMEOUT seconds for a free
+    # connection; idle connections older than DB_POOL_RECYCLE seconds are
+    # pinged before reuse.
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get("DB_POOL_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE = float(os.environ.get("DB_POOL_RECYCLE", 300))
+
+    # Use mysql-connector's pure Python protocol instead of its C extension;
+    # wsgi.py turns this on because only the former cooperates with gevent.
+    DB_USE_PURE = os.environ.get("DB_USE_PURE", "0") == "1"
+
+    # Transactions that hit a deadlock or lock wait timeout are retried this
+    # many times, backing off from DB_DEADLOCK_BACKOFF seconds.
+    DB_DEADLOCK_RETRIES = int(os.environ.get("DB_DEADLOCK_RETRIES", 3))
+    DB_DEADLOCK_BACKOFF = float(os.environ.get("DB_DEADLOCK_BACKOFF", 0.05))
+
+    # Response cache for list endpoints. CACHE_BACKEND is "memory" (per
+    # process LRU), "redis" (shared, needs the redis package) or "local"
+    # (in-process stand-in for redis).
+    CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "1") == "1"
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 512))
+    CACHE_TTL = float(os.environ.get("CACHE_TTL", 30))
+
+    # Auto-assignment keeps available vehicles and drivers in memory; rows
+    # touched by this process are refreshed on the next lookup and the whole
+    # index is reloaded after AVAILABILITY_REFRESH seconds.
+    AVAILABILITY_REFRESH = float(os.environ.get("AVAILABILITY_REFRESH", 60))
+
+    # Reservation windows (scheduled trips, booked maintenance) are indexed
+    # in memory the same way and fully reloaded every SCHEDULE_REFRESH seconds.
+    SCHEDULE_REFRESH = float(os.environ.get("SCHEDULE_REFRESH", 60))
+
+    # An immediate dispatch is refused if the vehicle or driver has a booking
+    # under way or starting within DISPATCH_BOOKING_GUARD minutes.
+    DISPATCH_BOOKING_GUARD = float(os.environ.get("DISPATCH_BOOKING_GUARD", 120))
+
+    # Columnar analytics engine behind POST /analytics/query (needs NumPy).
+    # Its in-memory copy is refreshed incrementally once older than
+    # ANALYTICS_REFRESH seconds.
+    ANALYTICS_ENGINE = os.environ.get("ANALYTICS_ENGINE", "0") == "1"
+    ANALYTICS_REFRESH = float(os.environ.get("ANALYTICS_REFRESH", 60))
+
+    # Delta sync (?since= on list endpoints, see app/sync.py). Responses hold
+    # at most SYNC_PAGE_SIZE rows; tokens trail the database clock by
+    # SYNC_GRACE seconds; tombstones are kept SYNC_TOMBSTONE_DAYS days.
+    SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", 5000))
+    SYNC_GRACE = float(os.environ.get("SYNC_GRACE", 5))
+    SYNC_TOMBSTONE_DAYS = int(os.environ.get("SYNC_TOMBSTONE_DAYS", 30))
+
+    # Weak ETags on the list endpoints from per-group version counters in
+    # table_versions; a matching If-None-Match gets a 304.
+    ETAGS_ENABLED = os.environ.get("ETAGS_ENABLED", "1") == "1"
+
+    # Compression of buffered responses of at least COMPRESS_MIN_SIZE bytes,
+    # br (needs the brotli package) or gzip as negotiated from Accept-Encoding.
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", 1))
+    COMPRESS_BR_QUALITY = int(os.environ.get("COMPRESS_BR_QUALITY", 4))
+
+    # Live change events on GET /events (see app/events.py). The last
+    # EVENTS_BUFFER_SIZE events are kept for Last-Event-ID resume; a subscriber
+    # with EVENTS_QUEUE_SIZE undelivered events is dropped. Idle streams get a
+    # heartbeat every EVENTS_HEARTBEAT seconds.
+    EVENTS_ENABLED = os.environ.get("EVENTS_ENABLED", "1") == "1"
+    EVENTS_BUFFER_SIZE = int(os.environ.get("EVENTS_BUFFER_SIZE", 1000))
+    EVENTS_QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", 256))
+    EVENTS_HEARTBEAT = float(os.environ.get("EVENTS_HEARTBEAT", 15))
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get("EVENTS_MAX_SUBSCRIBERS", 5000))
+
+    # Per-endpoint latency, status and DB time metrics served on /metrics.
+    # Set METRICS_TOKEN to require "Authorization: Bearer <token>" there.
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+    # SQL profiling (see app/profiler.py). Statements slower than SQL_SLOW_MS
+    # are logged, with their EXPLAIN plan if SQL_EXPLAIN_SLOW is set. A request
+    # running one statement more than SQL_REPEAT_THRESHOLD times, or more than
+    # SQL_QUERY_BUDGET statements in total, logs a warning.
+    SQL_PROFILE = os.environ.get("SQL_PROFILE", "1") == "1"
+    SQL_SLOW_MS = float(os.environ.get("SQL_SLOW_MS", 200))
+    SQL_SLOW_LOG_SIZE = int(os.environ.get("SQL_SLOW_LOG_SIZE", 100))
+    SQL_EXPLAIN_SLOW = os.environ.get("SQL_EXPLAIN_SLOW", "0") == "1"
+    SQL_REPEAT_THRESHOLD = int(os.environ.get("SQL_REPEAT_THRESHOLD", 10))
+    SQL_QUERY_BUDGET = int(os.environ.get("SQL_QUERY_BUDGET", 50))
+    SQL_DEBUG_HEADERS = os.environ.get("SQL_DEBUG_HEADERS", "0") == "1"
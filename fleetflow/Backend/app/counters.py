@@ -0,0 +1,133 @@
+import click
+from flask.cli import with_appcontext
+
+from app.db import get_connection
+
+# Incrementally maintained fleet-wide totals (single row, id=1) read by the
+# dashboard. Every write path that changes vehicle status or cost history
+# applies its delta here inside its own transaction.
+
+COUNTER_COLUMNS = ["total_vehicles", "on_trip_vehicles", "in_shop_vehicles", "fuel_cost", "maintenance_cost"]
+
+VEHICLE_STATUS_COUNTERS = {
+    "on_trip": "on_trip_vehicles",
+    "in_shop": "in_shop_vehicles"
+}
+
+
+def bump(cursor, **deltas):
+    """Add the given deltas to fleet_counters, e.g. bump(cursor, fuel_cost=120)."""
+    deltas = {col: value for col, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    for col in deltas:
+        if col not in COUNTER_COLUMNS:
+            raise ValueError(f"Unknown fleet counter: {col}")
+
+    assignments = ", ".join(f"{col} = {col} + %s" for col in deltas)
+    cursor.execute(
+        f"UPDATE fleet_counters SET {assignments} WHERE id = 1",
+        tuple(deltas.values())
+    )
+
+
+def vehicle_status_changed(cursor, old_status, new_status):
+    if old_status == new_status:
+        return
+
+    deltas = {}
+    if old_status in VEHICLE_STATUS_COUNTERS:
+        deltas[VEHICLE_STATUS_COUNTERS[old_status]] = -1
+    if new_status in VEHICLE_STATUS_COUNTERS:
+        deltas[VEHICLE_STATUS_COUNTERS[new_status]] = 1
+    bump(cursor, **deltas)
+
+
+def read(cursor, lock=False):
+    """Current counters; expects a dictionary cursor."""
+    query = f"SELECT {', '.join(COUNTER_COLUMNS)} FROM fleet_counters WHERE id = 1"
+    if lock:
+        query += " FOR UPDATE"
+    cursor.execute(query)
+    row = cursor.fetchone()
+    if row is None:
+        return dict.fromkeys(COUNTER_COLUMNS, 0)
+    return row
+
+
+def recompute(cursor):
+    """Recompute every counter from the base tables; expects a dictionary cursor."""
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM vehicles) AS total_vehicles,
+            (SELECT COUNT(*) FROM vehicles WHERE status='on_trip') AS on_trip_vehicles,
+            (SELECT COUNT(*) FROM vehicles WHERE status='in_shop') AS in_shop_vehicles,
+            (SELECT IFNULL(SUM(cost),0) FROM fuel_logs) AS fuel_cost,
+            (SELECT IFNULL(SUM(cost),0) FROM maintenance_logs) AS maintenance_cost
+    """)
+    return cursor.fetchone()
+
+
+def reconcile(fix=False):
+    """Compare stored counters with the base tables; optionally overwrite them.
+
+    Returns {column: (stored, actual)} for every column that drifted.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    # Lock the counter row first so in-flight writers finish (or wait) before
+    # the base tables are scanned.
+    stored = read(cursor, lock=True)
+    actual = recompute(cursor)
+    drift = {
+        col: (stored[col], actual[col])
+        for col in COUNTER_COLUMNS
+        if stored[col] != actual[col]
+    }
+
+    if fix:
+        columns = ", ".join(["id"] + COUNTER_COLUMNS)
+        placeholders = ", ".join(["1"] + ["%s"] * len(COUNTER_COLUMNS))
+        updates = ", ".join(f"{col} = VALUES({col})" for col in COUNTER_COLUMNS)
+        cursor.execute(
+            f"INSERT INTO fleet_counters ({columns}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {updates}",
+            tuple(actual[col] for col in COUNTER_COLUMNS)
+        )
+        conn.commit()
+    else:
+        conn.rollback()
+
+    cursor.close()
+    conn.close()
+    return drift
+
+
+@click.group("counters")
+def counters_cli():
+    """Maintain the fleet_counters summary table."""
+
+
+@counters_cli.command("verify")
+@with_appcontext
+def verify_command():
+    """Report drift between fleet_counters and the base tables."""
+    drift = reconcile(fix=False)
+    if not drift:
+        click.echo("fleet_counters OK")
+        return
+    for col, (stored, actual) in drift.items():
+        click.echo(f"{col}: stored={stored} actual={actual}")
+    raise SystemExit(1)
+
+
+@counters_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Recompute fleet_counters from the base tables."""
+    drift = reconcile(fix=True)
+    for col, (stored, actual) in drift.items():
+        click.echo(f"fixed {col}: {stored} -> {actual}")
+    click.echo("fleet_counters rebuilt")
@@ -1,13 +1,336 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty, Full
+
 import mysql.connector
-def get_connection () :
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",                 
-        password="123456",
-        database="fleetflow"
+from mysql.connector import errorcode
+from mysql.connector.errors import PoolError
+from flask import g, current_app, has_app_context
+
+
+def _record_db_time(started, queries=0):
+    """Add time spent since `started` (and statements run) to the current context.
+
+    Returns the elapsed seconds.
+    """
+    elapsed = time.perf_counter() - started
+    if has_app_context():
+        g.db_time = g.get("db_time", 0.0) + elapsed
+        g.db_queries = g.get("db_queries", 0) + queries
+    return elapsed
+
+
+class TimedCursor:
+    """Cursor proxy that adds statement and fetch time to the request's DB time.
+
+    With profiling on, every statement is also appended to g.db_statements
+    as {"sql", "params", "seconds", "rows"}; fetch time and fetched rows are
+    charged to the cursor's last statement. app.profiler reads the list.
+    """
+
+    def __init__(self, raw, profile=False):
+        self._raw = raw
+        self._profile = profile
+        self._statement = None
+
+    def _executed(self, started, operation, params):
+        elapsed = _record_db_time(started, 1)
+        if self._profile and has_app_context():
+            # Result rows are counted as they are fetched; for writes the
+            # affected row count is all there is.
+            rows = 0 if getattr(self._raw, "with_rows", False) else max(self._raw.rowcount or 0, 0)
+            self._statement = {"sql": operation, "params": params, "seconds": elapsed, "rows": rows}
+            g.setdefault("db_statements", []).append(self._statement)
+
+    def _fetched(self, started, rows):
+        elapsed = _record_db_time(started)
+        if self._statement is not None:
+            self._statement["seconds"] += elapsed
+            self._statement["rows"] += rows
+
+    def execute(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.execute(operation, *args, **kwargs)
+        finally:
+            self._executed(started, operation, args[0] if args else kwargs.get("params"))
+
+    def executemany(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.executemany(operation, *args, **kwargs)
+        finally:
+            self._executed(started, operation, None)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = None
+        try:
+            row = self._raw.fetchone()
+            return row
+        finally:
+            self._fetched(started, 1 if row is not None else 0)
+
+    def fetchmany(self, *args, **kwargs):
+        started = time.perf_counter()
+        rows = []
+        try:
+            rows = self._raw.fetchmany(*args, **kwargs)
+            return rows
+        finally:
+            self._fetched(started, len(rows))
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = []
+        try:
+            rows = self._raw.fetchall()
+            return rows
+        finally:
+            self._fetched(started, len(rows))
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class PooledConnection:
+    """Proxy around a pooled MySQL connection; close() hands it back to the pool."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    @property
+    def released(self):
+        return self._raw is None
+
+    def _live(self):
+        if self._raw is None:
+            raise PoolError("Connection already returned to the pool")
+        return self._raw
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._live().cursor(*args, **kwargs), self._pool.profile)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return self._live().commit()
+        finally:
+            _record_db_time(started)
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool.release(raw)
+
+    def __getattr__(self, name):
+        return getattr(self._live(), name)
+
+
+class ConnectionPool:
+    def __init__(self, size=5, max_overflow=10, timeout=30, recycle=300, profile=False, **connect_args):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.profile = profile
+        self._connect_args = connect_args
+        self._idle = LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._open = 0
+        self._counters = {
+            "checkouts": 0, "waits": 0, "timeouts": 0, "leaks": 0, "connects": 0, "deadlock_retries": 0
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self._connect_args)
+        self._count("connects")
+        return raw
+
+    def acquire(self):
+        last_used = None
+        try:
+            raw, last_used = self._idle.get_nowait()
+        except Empty:
+            with self._lock:
+                can_open = self._open < self.size + self.max_overflow
+                if can_open:
+                    self._open += 1
+
+            if can_open:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            else:
+                self._count("waits")
+                try:
+                    raw, last_used = self._idle.get(timeout=self.timeout)
+                except Empty:
+                    self._count("timeouts")
+                    raise PoolError(f"No database connection available within {self.timeout}s")
+
+        return self._checkout(raw, last_used)
+
+    def try_acquire(self):
+        """An idle connection, or None; never opens one or waits."""
+        try:
+            raw, last_used = self._idle.get_nowait()
+        except Empty:
+            return None
+        return self._checkout(raw, last_used)
+
+    def _checkout(self, raw, last_used):
+        if last_used is not None and time.monotonic() - last_used > self.recycle:
+            try:
+                raw.ping(reconnect=True, attempts=1)
+            except Exception:
+                self._discard(raw)
+                raise
+
+        self._count("checkouts")
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        try:
+            if raw.unread_result:
+                # An abandoned unbuffered result (e.g. a cancelled stream)
+                # would poison the next checkout.
+                raise PoolError("Connection returned with unread result")
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        try:
+            self._idle.put_nowait((raw, time.monotonic()))
+        except Full:
+            self._discard(raw)
+
+    def _discard(self, raw):
+        with self._lock:
+            self._open -= 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def record_leak(self):
+        self._count("leaks")
+
+    def record_deadlock_retry(self):
+        self._count("deadlock_retries")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["open"] = self._open
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["open"] - stats["idle"]
+        stats["size"] = self.size
+        stats["max_overflow"] = self.max_overflow
+        return stats
+
+
+def init_app(app):
+    app.extensions["db_pool"] = ConnectionPool(
+        size=app.config["DB_POOL_SIZE"],
+        max_overflow=app.config["DB_POOL_MAX_OVERFLOW"],
+        timeout=app.config["DB_POOL_TIMEOUT"],
+        recycle=app.config["DB_POOL_RECYCLE"],
+        profile=app.config["SQL_PROFILE"],
+        host=app.config["DB_HOST"],
+        port=app.config["DB_PORT"],
+        user=app.config["DB_USER"],
+        password=app.config["DB_PASSWORD"],
+        database=app.config["DB_NAME"],
+        use_pure=app.config["DB_USE_PURE"],
     )
+    app.teardown_appcontext(close_connection)
+
+
+def get_pool():
+    return current_app.extensions["db_pool"]
+
+
+def get_connection():
+    """Return this request's pooled connection, checking one out on first use."""
+    conn = g.get("db_conn")
+    if conn is None or conn.released:
+        conn = get_pool().acquire()
+        g.db_conn = conn
     return conn
 
-    
 
+@contextmanager
+def pooled_connection():
+    """Check out a connection of its own for the length of a with block.
+
+    For work on the side of a request (index refreshes, version counters)
+    that must not read inside, commit or release the request's connection.
+    """
+    conn = get_pool().acquire()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_connection(exc=None):
+    """Teardown hook: return the request's connection even if a handler bailed early."""
+    conn = g.pop("db_conn", None)
+    if conn is None or conn.released:
+        return
+    get_pool().record_leak()
+    conn.close()
+
+
+RETRYABLE_ERRNOS = {errorcode.ER_LOCK_DEADLOCK, errorcode.ER_LOCK_WAIT_TIMEOUT}
+
+
+def run_in_transaction(work, *args, **kwargs):
+    """Run work(conn, *args, **kwargs) and commit, returning its result.
+
+    Any exception rolls the transaction back. Deadlocks and lock wait
+    timeouts are retried up to DB_DEADLOCK_RETRIES times with jittered
+    exponential backoff; everything else is re-raised. The connection goes
+    back to the pool either way.
+    """
+    conn = get_connection()
+    retries = current_app.config["DB_DEADLOCK_RETRIES"]
+    backoff = current_app.config["DB_DEADLOCK_BACKOFF"]
+
+    try:
+        attempt = 0
+        while True:
+            try:
+                result = work(conn, *args, **kwargs)
+                conn.commit()
+                return result
+            except mysql.connector.Error as e:
+                conn.rollback()
+                if e.errno not in RETRYABLE_ERRNOS or attempt >= retries:
+                    raise
+            except Exception:
+                conn.rollback()
+                raise
 
+            get_pool().record_deadlock_retry()
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            attempt += 1
+    finally:
+        conn.close()
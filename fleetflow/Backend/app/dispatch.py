@@ -0,0 +1,457 @@
+from datetime import datetime
+
+from app import counters, driver_stats, ledger, rollups, sync
+from app.schedule import find_conflict
+
+# Trip state transitions shared by the trip routes. Vehicles and drivers are
+# claimed with conditional UPDATEs (WHERE status=...) and the affected row
+# count decides who won, so concurrent dispatchers can never double-book.
+# Rows are always locked in the order trips, vehicles, drivers,
+# driver_stats, vehicle_ledger, cost_rollups, fleet_counters; the shared
+# counter row goes last so it is held for as short a time as possible.
+
+
+class DispatchError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _claim_vehicle(cursor, vehicle_id, cargo_weight):
+    cursor.execute("""
+        UPDATE vehicles SET status='on_trip'
+        WHERE id=%s AND status='available' AND max_capacity_kg >= %s
+    """, (vehicle_id, cargo_weight))
+    if cursor.rowcount == 1:
+        return
+
+    cursor.execute("SELECT status, max_capacity_kg FROM vehicles WHERE id=%s", (vehicle_id,))
+    vehicle = cursor.fetchone()
+
+    if not vehicle:
+        raise DispatchError("Vehicle not found", 404)
+    if vehicle["status"] != "available":
+        raise DispatchError(f"Vehicle not available (status: {vehicle['status']})", 409)
+    raise DispatchError(
+        f"Cargo weight ({cargo_weight}kg) exceeds vehicle capacity ({vehicle['max_capacity_kg']}kg)"
+    )
+
+
+def _claim_driver(cursor, driver_id):
+    cursor.execute("""
+        UPDATE drivers SET status='on_trip'
+        WHERE id=%s AND status='on_duty' AND license_expiry_date >= CURDATE()
+    """, (driver_id,))
+    if cursor.rowcount == 1:
+        return
+
+    cursor.execute("SELECT status FROM drivers WHERE id=%s", (driver_id,))
+    driver = cursor.fetchone()
+
+    if not driver:
+        raise DispatchError("Driver not found", 404)
+    if driver["status"] != "on_duty":
+        raise DispatchError(f"Driver not available (status: {driver['status']})", 409)
+    raise DispatchError("Driver license expired")
+
+
+def dispatch_trip(cursor, vehicle_id, driver_id, cargo_weight, origin, destination, estimated_fuel_cost=0,
+                  until=None):
+    """Claim the vehicle and driver and insert a dispatched trip; returns the trip id.
+
+    Neither may have a booking (scheduled trip or maintenance slot) between
+    now and `until`; without `until` only a booking already under way counts.
+    Must run inside a transaction (see app.db.run_in_transaction) with a
+    dictionary cursor; a DispatchError leaves partial claims to the rollback.
+    """
+    _claim_vehicle(cursor, vehicle_id, cargo_weight)
+    _claim_driver(cursor, driver_id)
+
+    now = datetime.now()
+    conflict = find_conflict(cursor, now, max(until or now, now), vehicle_id, driver_id)
+    if conflict:
+        raise _booking_error(*conflict)
+
+    cursor.execute("""
+        INSERT INTO trips
+        (vehicle_id, driver_id, cargo_weight, origin, destination, start_odometer, status)
+        SELECT %s,%s,%s,%s,%s,odometer_reading,'dispatched'
+        FROM vehicles WHERE id=%s
+    """, (vehicle_id, driver_id, cargo_weight, origin, destination, vehicle_id))
+    trip_id = cursor.lastrowid
+    driver_stats.trip_status_changed(cursor, driver_id, None, "dispatched")
+
+    if estimated_fuel_cost > 0:
+        estimated_liters = estimated_fuel_cost / 100
+        cursor.execute("""
+            INSERT INTO fuel_logs (vehicle_id, trip_id, liters, cost, fuel_date)
+            VALUES (%s,%s,%s,%s,CURDATE())
+        """, (vehicle_id, trip_id, estimated_liters, estimated_fuel_cost))
+        ledger.add(cursor, vehicle_id, fuel_cost=estimated_fuel_cost)
+        rollups.add(cursor, vehicle_id, fuel_cost=estimated_fuel_cost)
+
+    counters.bump(cursor, on_trip_vehicles=1, fuel_cost=max(estimated_fuel_cost, 0))
+
+    return trip_id
+
+
+def _booking_error(owner, conflict):
+    return DispatchError(
+        f"{owner.capitalize()} already booked from {conflict['planned_start']} "
+        f"to {conflict['planned_end']} ({conflict['kind']} {conflict['id']})",
+        409
+    )
+
+
+def schedule_trip(cursor, vehicle_id, driver_id, cargo_weight, origin, destination, planned_start, planned_end):
+    """Reserve a vehicle and driver for [planned_start, planned_end); returns the trip id.
+
+    Statuses are left alone until the trip is started with start_scheduled_trip,
+    which applies the same claims as an immediate dispatch.
+    """
+    cursor.execute("SELECT status, max_capacity_kg FROM vehicles WHERE id=%s FOR UPDATE", (vehicle_id,))
+    vehicle = cursor.fetchone()
+
+    if not vehicle:
+        raise DispatchError("Vehicle not found", 404)
+    if vehicle["status"] == "retired":
+        raise DispatchError("Vehicle retired")
+    if cargo_weight > vehicle["max_capacity_kg"]:
+        raise DispatchError(
+            f"Cargo weight ({cargo_weight}kg) exceeds vehicle capacity ({vehicle['max_capacity_kg']}kg)"
+        )
+
+    cursor.execute("SELECT status, license_expiry_date FROM drivers WHERE id=%s FOR UPDATE", (driver_id,))
+    driver = cursor.fetchone()
+
+    if not driver:
+        raise DispatchError("Driver not found", 404)
+    if driver["status"] == "suspended":
+        raise DispatchError("Driver suspended")
+    if driver["license_expiry_date"] < planned_end.date():
+        raise DispatchError("Driver license expires before the trip ends")
+
+    conflict = find_conflict(cursor, planned_start, planned_end, vehicle_id, driver_id)
+    if conflict:
+        raise _booking_error(*conflict)
+
+    cursor.execute("""
+        INSERT INTO trips
+        (vehicle_id, driver_id, cargo_weight, origin, destination, status, planned_start, planned_end)
+        VALUES (%s,%s,%s,%s,%s,'scheduled',%s,%s)
+    """, (vehicle_id, driver_id, cargo_weight, origin, destination, planned_start, planned_end))
+    trip_id = cursor.lastrowid
+    driver_stats.trip_status_changed(cursor, driver_id, None, "scheduled")
+
+    return trip_id
+
+
+def start_scheduled_trip(cursor, trip_id):
+    """Promote a scheduled trip to 'dispatched' under the usual dispatch rules."""
+    trip = _lock_trip(cursor, trip_id)
+
+    if trip["status"] != "scheduled":
+        raise DispatchError(f"Cannot dispatch a {trip['status']} trip", 409)
+
+    now = datetime.now()
+    if not trip["planned_start"] <= now < trip["planned_end"]:
+        raise DispatchError(
+            f"Trip is scheduled from {trip['planned_start']} to {trip['planned_end']}", 409
+        )
+
+    _claim_vehicle(cursor, trip["vehicle_id"], trip["cargo_weight"])
+    _claim_driver(cursor, trip["driver_id"])
+
+    conflict = find_conflict(
+        cursor, now, trip["planned_end"], trip["vehicle_id"], trip["driver_id"], exclude_trip_id=trip_id
+    )
+    if conflict:
+        raise _booking_error(*conflict)
+
+    cursor.execute("""
+        UPDATE trips t JOIN vehicles v ON v.id = t.vehicle_id
+        SET t.status='dispatched', t.start_odometer=v.odometer_reading
+        WHERE t.id=%s
+    """, (trip_id,))
+
+    counters.bump(cursor, on_trip_vehicles=1)
+
+    return trip
+
+
+def release_resources(cursor, vehicle_id, driver_id):
+    """Hand a finished trip's vehicle and driver back, if they are still on it.
+
+    Returns True if the vehicle was released; the caller updates
+    fleet_counters once its other writes are done.
+    """
+    cursor.execute(
+        "UPDATE vehicles SET status='available' WHERE id=%s AND status='on_trip'",
+        (vehicle_id,)
+    )
+    vehicle_released = cursor.rowcount == 1
+
+    cursor.execute(
+        "UPDATE drivers SET status='on_duty' WHERE id=%s AND status='on_trip'",
+        (driver_id,)
+    )
+    return vehicle_released
+
+
+def _validate_batch_item(item):
+    if not isinstance(item, dict):
+        return "Trip must be an object"
+    if not all([item.get("vehicle_id"), item.get("driver_id"), item.get("cargo_weight"),
+                item.get("origin"), item.get("destination")]):
+        return "Missing required fields"
+    for field in ["vehicle_id", "driver_id", "cargo_weight"]:
+        if not isinstance(item[field], int) or isinstance(item[field], bool) or item[field] <= 0:
+            return f"{field} must be a positive integer"
+    fuel = item.get("estimated_fuel_cost", 0)
+    if not isinstance(fuel, (int, float)) or isinstance(fuel, bool) or fuel < 0:
+        return "estimated_fuel_cost must be a non-negative number"
+    return None
+
+
+def _lock_rows(cursor, query, ids):
+    if not ids:
+        return {}
+    cursor.execute(query.format(", ".join(["%s"] * len(ids))), tuple(sorted(ids)))
+    return {row["id"]: row for row in cursor.fetchall()}
+
+
+def _booked(cursor, start, end, vehicle_ids, driver_ids):
+    """Ids of the vehicles and drivers with a booking overlapping [start, end)."""
+    booked_vehicles, booked_drivers = set(), set()
+
+    if vehicle_ids:
+        placeholders = ", ".join(["%s"] * len(vehicle_ids))
+        cursor.execute(f"""
+            SELECT vehicle_id AS id FROM trips
+            WHERE vehicle_id IN ({placeholders}) AND status IN ('scheduled', 'dispatched')
+              AND planned_end > %s AND planned_start < %s
+            UNION
+            SELECT vehicle_id FROM maintenance_logs
+            WHERE vehicle_id IN ({placeholders}) AND planned_end > %s AND planned_start < %s
+        """, (*vehicle_ids, start, end, *vehicle_ids, start, end))
+        booked_vehicles = {row["id"] for row in cursor.fetchall()}
+
+    if driver_ids:
+        cursor.execute(f"""
+            SELECT DISTINCT driver_id AS id FROM trips
+            WHERE driver_id IN ({", ".join(["%s"] * len(driver_ids))})
+              AND status IN ('scheduled', 'dispatched') AND planned_end > %s AND planned_start < %s
+        """, (*driver_ids, start, end))
+        booked_drivers = {row["id"] for row in cursor.fetchall()}
+
+    return booked_vehicles, booked_drivers
+
+
+def dispatch_batch(cursor, items, partial=False, until=None):
+    """Dispatch many trips with a fixed number of round-trips.
+
+    All referenced vehicles, then drivers, are locked with one IN query each,
+    their bookings up to `until` (see dispatch_trip) are read with one more
+    query each and every item is validated in memory (a vehicle or driver
+    can only be used once per batch). Without `partial`, any rejected item
+    means nothing is written. Returns one result dict per item, in order.
+    """
+    results = [{"index": index} for index in range(len(items))]
+
+    for result, item in zip(results, items):
+        error = _validate_batch_item(item)
+        if error:
+            result.update(status="rejected", error=error)
+
+    valid = [(result, item) for result, item in zip(results, items) if "status" not in result]
+
+    vehicles = _lock_rows(
+        cursor,
+        "SELECT id, max_capacity_kg, status, odometer_reading FROM vehicles WHERE id IN ({}) ORDER BY id FOR UPDATE",
+        {item["vehicle_id"] for _, item in valid}
+    )
+    drivers = _lock_rows(
+        cursor,
+        "SELECT id, status, license_expiry_date FROM drivers WHERE id IN ({}) ORDER BY id FOR UPDATE",
+        {item["driver_id"] for _, item in valid}
+    )
+
+    now = datetime.now()
+    booked_vehicles, booked_drivers = _booked(
+        cursor, now, max(until or now, now), sorted(vehicles), sorted(drivers)
+    )
+
+    today = now.date()
+    claimed_vehicles = set()
+    claimed_drivers = set()
+    accepted = []
+
+    for result, item in valid:
+        vehicle = vehicles.get(item["vehicle_id"])
+        driver = drivers.get(item["driver_id"])
+
+        if not vehicle:
+            error = "Vehicle not found"
+        elif vehicle["status"] != "available" or item["vehicle_id"] in claimed_vehicles:
+            error = "Vehicle not available"
+        elif item["cargo_weight"] > vehicle["max_capacity_kg"]:
+            error = (f"Cargo weight ({item['cargo_weight']}kg) exceeds vehicle capacity "
+                     f"({vehicle['max_capacity_kg']}kg)")
+        elif item["vehicle_id"] in booked_vehicles:
+            error = "Vehicle already booked"
+        elif not driver:
+            error = "Driver not found"
+        elif driver["status"] != "on_duty" or item["driver_id"] in claimed_drivers:
+            error = "Driver not available"
+        elif driver["license_expiry_date"] < today:
+            error = "Driver license expired"
+        elif item["driver_id"] in booked_drivers:
+            error = "Driver already booked"
+        else:
+            error = None
+
+        if error:
+            result.update(status="rejected", error=error)
+            continue
+
+        claimed_vehicles.add(item["vehicle_id"])
+        claimed_drivers.add(item["driver_id"])
+        accepted.append((result, item))
+
+    if not accepted or (not partial and len(accepted) < len(items)):
+        for result, _ in accepted:
+            result.update(status="not_dispatched", error="Batch rejected")
+        return results
+
+    vehicle_ids = sorted(claimed_vehicles)
+    driver_ids = sorted(claimed_drivers)
+
+    cursor.executemany("""
+        INSERT INTO trips
+        (vehicle_id, driver_id, cargo_weight, origin, destination, start_odometer, status)
+        VALUES (%s,%s,%s,%s,%s,%s,'dispatched')
+    """, [
+        (item["vehicle_id"], item["driver_id"], item["cargo_weight"], item["origin"], item["destination"],
+         vehicles[item["vehicle_id"]]["odometer_reading"])
+        for _, item in accepted
+    ])
+    first_trip_id = cursor.lastrowid
+
+    vehicle_placeholders = ", ".join(["%s"] * len(vehicle_ids))
+
+    # Every claimed vehicle is locked and had no running trip, so the new
+    # dispatched trip at or after first_trip_id is the one just inserted.
+    cursor.execute(f"""
+        SELECT id, vehicle_id FROM trips
+        WHERE id >= %s AND vehicle_id IN ({vehicle_placeholders}) AND status='dispatched'
+    """, (first_trip_id, *vehicle_ids))
+    trip_ids = {row["vehicle_id"]: row["id"] for row in cursor.fetchall()}
+
+    cursor.execute(
+        f"UPDATE vehicles SET status='on_trip' WHERE id IN ({vehicle_placeholders})",
+        tuple(vehicle_ids)
+    )
+    cursor.execute(
+        f"UPDATE drivers SET status='on_trip' WHERE id IN ({', '.join(['%s'] * len(driver_ids))})",
+        tuple(driver_ids)
+    )
+
+    driver_stats.add_many(cursor, "total_trips", dict.fromkeys(driver_ids, 1))
+
+    fuel = {}
+    fuel_rows = []
+    for result, item in accepted:
+        trip_id = trip_ids[item["vehicle_id"]]
+        result.update(status="dispatched", trip_id=trip_id)
+
+        cost = item.get("estimated_fuel_cost", 0)
+        if cost > 0:
+            fuel_rows.append((item["vehicle_id"], trip_id, cost / 100, cost))
+            fuel[item["vehicle_id"]] = cost
+
+    if fuel_rows:
+        cursor.executemany("""
+            INSERT INTO fuel_logs (vehicle_id, trip_id, liters, cost, fuel_date)
+            VALUES (%s,%s,%s,%s,CURDATE())
+        """, fuel_rows)
+        ledger.add_many(cursor, "fuel_cost", fuel)
+        rollups.add_many(cursor, "fuel_cost", fuel)
+
+    counters.bump(cursor, on_trip_vehicles=len(accepted), fuel_cost=sum(fuel.values()))
+
+    return results
+
+
+FINISH_FROM = {
+    "completed": ["dispatched"],
+    "cancelled": ["draft", "scheduled", "dispatched"]
+}
+
+
+def _lock_trip(cursor, trip_id):
+    cursor.execute(
+        "SELECT id, vehicle_id, driver_id, cargo_weight, status, revenue, completed_at, "
+        "planned_start, planned_end FROM trips WHERE id=%s FOR UPDATE",
+        (trip_id,)
+    )
+    trip = cursor.fetchone()
+    if not trip:
+        raise DispatchError("Trip not found", 404)
+    return trip
+
+
+def finish_trip(cursor, trip_id, new_status):
+    """Move a trip to 'completed' or 'cancelled' and free its vehicle and driver."""
+    trip = _lock_trip(cursor, trip_id)
+
+    if trip["status"] not in FINISH_FROM[new_status]:
+        raise DispatchError(f"Cannot mark a {trip['status']} trip as {new_status}", 409)
+
+    if new_status == "completed":
+        cursor.execute("""
+            UPDATE trips 
+            SET status='completed', completed_at=NOW()
+            WHERE id=%s
+        """, (trip_id,))
+    else:
+        cursor.execute("""
+            UPDATE trips 
+            SET status='cancelled'
+            WHERE id=%s
+        """, (trip_id,))
+
+    vehicle_released = False
+    if trip["status"] == "dispatched":
+        vehicle_released = release_resources(cursor, trip["vehicle_id"], trip["driver_id"])
+
+    driver_stats.trip_status_changed(cursor, trip["driver_id"], trip["status"], new_status)
+    if new_status == "completed":
+        ledger.add(cursor, trip["vehicle_id"], revenue=trip["revenue"])
+        rollups.add(cursor, trip["vehicle_id"], revenue=trip["revenue"])
+    if vehicle_released:
+        counters.bump(cursor, on_trip_vehicles=-1)
+
+    return trip
+
+
+def remove_trip(cursor, trip_id):
+    """Delete a trip, freeing its resources if it was still running."""
+    trip = _lock_trip(cursor, trip_id)
+
+    sync.record_deletes(cursor, "trips", "id=%s", (trip_id,))
+    cursor.execute("DELETE FROM trips WHERE id=%s", (trip_id,))
+
+    vehicle_released = False
+    if trip["status"] == "dispatched":
+        vehicle_released = release_resources(cursor, trip["vehicle_id"], trip["driver_id"])
+
+    driver_stats.trip_status_changed(cursor, trip["driver_id"], trip["status"], None)
+    if trip["status"] == "completed":
+        ledger.add(cursor, trip["vehicle_id"], revenue=-trip["revenue"])
+        if trip["completed_at"]:
+            rollups.add(cursor, trip["vehicle_id"], trip["completed_at"], revenue=-trip["revenue"])
+    if vehicle_released:
+        counters.bump(cursor, on_trip_vehicles=-1)
+
+    return trip
@@ -0,0 +1,162 @@
+import click
+from flask.cli import with_appcontext
+
+from app.db import get_connection
+
+# Denormalized per-driver trip totals (one row per driver) behind the driver
+# performance view, so it reads one row per driver instead of grouping the
+# whole trips table. Trip write paths in app.dispatch call
+# trip_status_changed() inside their own transaction; completion rate and
+# the performance score are derived from these columns when read.
+
+STATS_COLUMNS = ["total_trips", "completed_trips", "cancelled_trips"]
+
+STATUS_COLUMNS = {
+    "completed": "completed_trips",
+    "cancelled": "cancelled_trips"
+}
+
+
+def add(cursor, driver_id, **deltas):
+    """Add the given deltas to a driver's stats row, creating it if needed."""
+    deltas = {col: value for col, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    for col in deltas:
+        if col not in STATS_COLUMNS:
+            raise ValueError(f"Unknown driver stats column: {col}")
+
+    columns = ", ".join(["driver_id"] + list(deltas))
+    placeholders = ", ".join(["%s"] * (len(deltas) + 1))
+    updates = ", ".join(f"{col} = {col} + VALUES({col})" for col in deltas)
+    cursor.execute(
+        f"INSERT INTO driver_stats ({columns}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}",
+        (driver_id, *deltas.values())
+    )
+
+
+def add_many(cursor, column, deltas):
+    """Apply {driver_id: delta} to one stats column in a single batched upsert."""
+    if column not in STATS_COLUMNS:
+        raise ValueError(f"Unknown driver stats column: {column}")
+
+    rows = [(driver_id, delta) for driver_id, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    cursor.executemany(
+        f"INSERT INTO driver_stats (driver_id, {column}) VALUES (%s, %s) "
+        f"ON DUPLICATE KEY UPDATE {column} = {column} + VALUES({column})",
+        rows
+    )
+
+
+def trip_status_changed(cursor, driver_id, old_status, new_status):
+    """Record a trip moving between statuses; None means created or deleted."""
+    if old_status == new_status:
+        return
+
+    deltas = {}
+    if old_status is None:
+        deltas["total_trips"] = 1
+    if new_status is None:
+        deltas["total_trips"] = -1
+    if old_status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[old_status]] = -1
+    if new_status in STATUS_COLUMNS:
+        deltas[STATUS_COLUMNS[new_status]] = 1
+    add(cursor, driver_id, **deltas)
+
+
+def performance(total_trips, completed_trips):
+    """(completion rate in %, performance score) for a driver's trip totals."""
+    completion_rate = (completed_trips / total_trips * 100) if total_trips > 0 else 0
+    score = max(100 - (total_trips - completed_trips) * 5, 50)
+    return round(completion_rate, 2), round(score, 2)
+
+
+RECOMPUTE_QUERY = """
+    SELECT
+        d.id AS driver_id,
+        COUNT(t.id) AS total_trips,
+        IFNULL(SUM(t.status='completed'), 0) AS completed_trips,
+        IFNULL(SUM(t.status='cancelled'), 0) AS cancelled_trips
+    FROM drivers d
+    LEFT JOIN trips t ON t.driver_id = d.id
+    GROUP BY d.id
+"""
+
+
+def reconcile(fix=False):
+    """Compare every driver's stats row with the trips table; optionally overwrite.
+
+    Returns {driver_id: {column: (stored, actual)}} for every drifted driver.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute(f"SELECT driver_id, {', '.join(STATS_COLUMNS)} FROM driver_stats FOR UPDATE")
+    stored = {row["driver_id"]: row for row in cursor.fetchall()}
+
+    cursor.execute(RECOMPUTE_QUERY)
+    actual = cursor.fetchall()
+
+    drift = {}
+    for row in actual:
+        current = stored.get(row["driver_id"], dict.fromkeys(STATS_COLUMNS, 0))
+        diff = {
+            col: (current[col], int(row[col]))
+            for col in STATS_COLUMNS
+            if current[col] != row[col]
+        }
+        if diff:
+            drift[row["driver_id"]] = diff
+
+    if fix and drift:
+        columns = ", ".join(["driver_id"] + STATS_COLUMNS)
+        placeholders = ", ".join(["%s"] * (len(STATS_COLUMNS) + 1))
+        updates = ", ".join(f"{col} = VALUES({col})" for col in STATS_COLUMNS)
+        cursor.executemany(
+            f"INSERT INTO driver_stats ({columns}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {updates}",
+            [
+                (row["driver_id"], *(row[col] for col in STATS_COLUMNS))
+                for row in actual if row["driver_id"] in drift
+            ]
+        )
+        conn.commit()
+    else:
+        conn.rollback()
+
+    cursor.close()
+    conn.close()
+    return drift
+
+
+@click.group("driver-stats")
+def driver_stats_cli():
+    """Maintain the driver_stats table."""
+
+
+@driver_stats_cli.command("verify")
+@with_appcontext
+def verify_command():
+    """Report drivers whose stats drifted from the trips table."""
+    drift = reconcile(fix=False)
+    if not drift:
+        click.echo("driver_stats OK")
+        return
+    for driver_id, diff in drift.items():
+        for col, (stored, actual) in diff.items():
+            click.echo(f"driver {driver_id} {col}: stored={stored} actual={actual}")
+    raise SystemExit(1)
+
+
+@driver_stats_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Recompute driver_stats from the trips table."""
+    drift = reconcile(fix=True)
+    click.echo(f"driver_stats rebuilt ({len(drift)} drivers corrected)")
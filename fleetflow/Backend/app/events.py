@@ -0,0 +1,199 @@
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import current_app
+
+# In-process publish/subscribe for live status changes. Write routes call
+# events.publish(entity, action, id, **fields) after commit and GET /events
+# streams the events as Server-Sent Events to every subscriber whose role may
+# see that entity. Each event is rendered once, numbered "<epoch>-<seq>" and
+# kept in a ring buffer of EVENTS_BUFFER_SIZE so a reconnecting client resumes
+# from Last-Event-ID. An id that has left the buffer, or was issued by another
+# process, gets a "reset" event instead: the client should refetch its lists.
+#
+# A subscriber is a bounded deque and a threading.Event; publishing appends to
+# the matching queues and sets their events, so there is no thread or timer
+# per subscriber. A client too slow to drain EVENTS_QUEUE_SIZE events is sent
+# "overflow" and disconnected, and resumes from the buffer when it reconnects.
+#
+# A stream subscribes when its body is first iterated, so a response that is
+# never sent holds no subscriber. Past EVENTS_MAX_SUBSCRIBERS the route answers
+# 503, or a stream that lost the race for the last slot sends "busy" and ends;
+# either way the client retries later with its Last-Event-ID.
+#
+# While it waits, an open stream still holds the request handler serving it:
+# one thread per client under the threaded development server (run.py). Serve
+# it with gunicorn.conf.py and wsgi.py instead, which monkey-patch the process
+# for gevent so every wait is a greenlet. Like the memory cache the bus is per
+# process, so with several workers a client only sees events published by its
+# own worker.
+
+ENTITY_ROLES = {
+    "trips": {"manager", "dispatcher", "analyst", "admin"},
+    "maintenance": {"manager", "dispatcher", "analyst", "admin"},
+    "drivers": {"manager", "dispatcher", "safety", "admin"}
+}
+
+
+def _frame(event_id, name, data):
+    return f"id: {event_id}\nevent: {name}\ndata: {data}\n\n"
+
+
+class Subscriber:
+    def __init__(self, entities, max_queue):
+        self.entities = entities
+        self.max_queue = max_queue
+        self.queue = deque()
+        self.overflowed = False
+        self.wakeup = threading.Event()
+        self.start_id = None
+
+    def push(self, frame):
+        """Queue a frame; False (and the subscriber marked overflowed) if the queue is full."""
+        self.wakeup.set()
+        if len(self.queue) >= self.max_queue:
+            self.overflowed = True
+            return False
+        self.queue.append(frame)
+        return True
+
+
+class EventBus:
+    def __init__(self):
+        self.enabled = False
+        self.heartbeat = 15
+        self.max_subscribers = 0
+        self.epoch = str(int(time.time()))
+        self._max_queue = 0
+        self._buffer = deque()
+        self._seq = itertools.count(1)
+        self._last_seq = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._counters = {"published": 0, "delivered": 0, "overflows": 0, "resets": 0}
+
+    def init_app(self, app):
+        self.enabled = app.config["EVENTS_ENABLED"]
+        self.heartbeat = app.config["EVENTS_HEARTBEAT"]
+        self.max_subscribers = app.config["EVENTS_MAX_SUBSCRIBERS"]
+        self._max_queue = app.config["EVENTS_QUEUE_SIZE"]
+        self._buffer = deque(maxlen=app.config["EVENTS_BUFFER_SIZE"])
+
+    def publish(self, entity, action, entity_id, **fields):
+        """Send a change to current subscribers; call after the write has committed."""
+        if not self.enabled:
+            return
+        data = current_app.json.dumps({
+            "entity": entity, "action": action, "id": entity_id,
+            **fields, "at": datetime.now().isoformat(timespec="seconds")
+        })
+
+        with self._lock:
+            seq = next(self._seq)
+            frame = _frame(f"{self.epoch}-{seq}", entity, data)
+            self._buffer.append((seq, entity, frame))
+            self._last_seq = seq
+            self._counters["published"] += 1
+            for subscriber in self._subscribers:
+                if entity in subscriber.entities and subscriber.push(frame):
+                    self._counters["delivered"] += 1
+
+    def _resume_seq(self, last_event_id):
+        """Sequence number to replay after, or None if the buffer can't cover it."""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        if seq > self._last_seq:
+            return None
+        oldest = self._buffer[0][0] if self._buffer else self._last_seq + 1
+        if seq < oldest - 1:
+            return None
+        return seq
+
+    def subscribe(self, entities, last_event_id=None):
+        """Register a subscriber, queueing whatever it missed since last_event_id.
+
+        Returns None when EVENTS_MAX_SUBSCRIBERS streams are already open.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(entities, self._max_queue)
+            subscriber.start_id = f"{self.epoch}-{self._last_seq}"
+
+            if last_event_id:
+                seq = self._resume_seq(last_event_id)
+                if seq is None:
+                    self._counters["resets"] += 1
+                    subscriber.push(_frame(subscriber.start_id, "reset", "{}"))
+                else:
+                    # The replay may exceed the queue bound; the buffer bounds it instead.
+                    subscriber.start_id = last_event_id
+                    subscriber.queue.extend(
+                        frame for event_seq, entity, frame in self._buffer
+                        if event_seq > seq and entity in entities
+                    )
+                    if subscriber.queue:
+                        subscriber.wakeup.set()
+
+            self._subscribers.add(subscriber)
+            return subscriber
+
+    def full(self):
+        with self._lock:
+            return len(self._subscribers) >= self.max_subscribers
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def wait(self, subscriber, timeout):
+        """Block up to `timeout` seconds for events; returns the queued frames (possibly none)."""
+        subscriber.wakeup.wait(timeout)
+        with self._lock:
+            frames = list(subscriber.queue)
+            subscriber.queue.clear()
+            subscriber.wakeup.clear()
+            if subscriber.overflowed:
+                self._counters["overflows"] += 1
+        return frames
+
+    def stream(self, entities, last_event_id=None):
+        """SSE body: events as they come, a comment line every heartbeat.
+
+        Subscribes on the first iteration and unsubscribes when the client
+        goes away or the generator is closed.
+        """
+        subscriber = self.subscribe(entities, last_event_id)
+        if subscriber is None:
+            yield "retry: 3000\nevent: busy\ndata: {}\n\n"
+            return
+
+        try:
+            # An id-only block sets the client's Last-Event-ID before the first event.
+            yield f"retry: 3000\nid: {subscriber.start_id}\n\n"
+            while True:
+                frames = self.wait(subscriber, self.heartbeat)
+                if frames:
+                    yield "".join(frames)
+                if subscriber.overflowed:
+                    yield "event: overflow\ndata: {}\n\n"
+                    return
+                if not frames:
+                    yield ": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["subscribers"] = len(self._subscribers)
+            stats["buffered"] = len(self._buffer)
+        return stats
+
+
+events = EventBus()
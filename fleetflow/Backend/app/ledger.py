@@ -0,0 +1,148 @@
+import click
+from flask.cli import with_appcontext
+
+from app.db import get_connection
+
+# Denormalized per-vehicle totals (one row per vehicle) used for ROI and
+# total-cost lookups. Misc expenses are stored in maintenance_logs but kept
+# in their own column here. Write paths call add() inside their own
+# transaction.
+
+LEDGER_COLUMNS = ["revenue", "fuel_cost", "maintenance_cost", "misc_cost"]
+
+MISC_SERVICE_TYPE = "Misc Expense"
+
+
+def add(cursor, vehicle_id, **deltas):
+    """Add the given deltas to a vehicle's ledger row, creating it if needed."""
+    deltas = {col: value for col, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    for col in deltas:
+        if col not in LEDGER_COLUMNS:
+            raise ValueError(f"Unknown ledger column: {col}")
+
+    columns = ", ".join(["vehicle_id"] + list(deltas))
+    placeholders = ", ".join(["%s"] * (len(deltas) + 1))
+    updates = ", ".join(f"{col} = {col} + VALUES({col})" for col in deltas)
+    cursor.execute(
+        f"INSERT INTO vehicle_ledger ({columns}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}",
+        (vehicle_id, *deltas.values())
+    )
+
+
+def add_many(cursor, column, deltas):
+    """Apply {vehicle_id: delta} to one ledger column in a single batched upsert."""
+    if column not in LEDGER_COLUMNS:
+        raise ValueError(f"Unknown ledger column: {column}")
+
+    rows = [(vehicle_id, delta) for vehicle_id, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    cursor.executemany(
+        f"INSERT INTO vehicle_ledger (vehicle_id, {column}) VALUES (%s, %s) "
+        f"ON DUPLICATE KEY UPDATE {column} = {column} + VALUES({column})",
+        rows
+    )
+
+
+RECOMPUTE_QUERY = f"""
+    SELECT
+        v.id AS vehicle_id,
+        IFNULL(r.revenue, 0) AS revenue,
+        IFNULL(f.fuel_cost, 0) AS fuel_cost,
+        IFNULL(m.maintenance_cost, 0) AS maintenance_cost,
+        IFNULL(m.misc_cost, 0) AS misc_cost
+    FROM vehicles v
+    LEFT JOIN (
+        SELECT vehicle_id, SUM(revenue) AS revenue
+        FROM trips WHERE status='completed' GROUP BY vehicle_id
+    ) r ON r.vehicle_id = v.id
+    LEFT JOIN (
+        SELECT vehicle_id, SUM(cost) AS fuel_cost
+        FROM fuel_logs GROUP BY vehicle_id
+    ) f ON f.vehicle_id = v.id
+    LEFT JOIN (
+        SELECT vehicle_id,
+               SUM(CASE WHEN service_type <> '{MISC_SERVICE_TYPE}' THEN cost ELSE 0 END) AS maintenance_cost,
+               SUM(CASE WHEN service_type = '{MISC_SERVICE_TYPE}' THEN cost ELSE 0 END) AS misc_cost
+        FROM maintenance_logs GROUP BY vehicle_id
+    ) m ON m.vehicle_id = v.id
+"""
+
+
+def reconcile(fix=False):
+    """Compare every vehicle's ledger row with the base tables; optionally overwrite.
+
+    Returns {vehicle_id: {column: (stored, actual)}} for every drifted vehicle.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute(f"SELECT vehicle_id, {', '.join(LEDGER_COLUMNS)} FROM vehicle_ledger FOR UPDATE")
+    stored = {row["vehicle_id"]: row for row in cursor.fetchall()}
+
+    cursor.execute(RECOMPUTE_QUERY)
+    actual = cursor.fetchall()
+
+    drift = {}
+    for row in actual:
+        current = stored.get(row["vehicle_id"], dict.fromkeys(LEDGER_COLUMNS, 0))
+        diff = {
+            col: (current[col], row[col])
+            for col in LEDGER_COLUMNS
+            if current[col] != row[col]
+        }
+        if diff:
+            drift[row["vehicle_id"]] = diff
+
+    if fix and drift:
+        columns = ", ".join(["vehicle_id"] + LEDGER_COLUMNS)
+        placeholders = ", ".join(["%s"] * (len(LEDGER_COLUMNS) + 1))
+        updates = ", ".join(f"{col} = VALUES({col})" for col in LEDGER_COLUMNS)
+        cursor.executemany(
+            f"INSERT INTO vehicle_ledger ({columns}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {updates}",
+            [
+                (row["vehicle_id"], *(row[col] for col in LEDGER_COLUMNS))
+                for row in actual if row["vehicle_id"] in drift
+            ]
+        )
+        conn.commit()
+    else:
+        conn.rollback()
+
+    cursor.close()
+    conn.close()
+    return drift
+
+
+@click.group("ledger")
+def ledger_cli():
+    """Maintain the vehicle_ledger table."""
+
+
+@ledger_cli.command("verify")
+@with_appcontext
+def verify_command():
+    """Report vehicles whose ledger drifted from the base tables."""
+    drift = reconcile(fix=False)
+    if not drift:
+        click.echo("vehicle_ledger OK")
+        return
+    for vehicle_id, diff in drift.items():
+        for col, (stored, actual) in diff.items():
+            click.echo(f"vehicle {vehicle_id} {col}: stored={stored} actual={actual}")
+    raise SystemExit(1)
+
+
+@ledger_cli.command("rebuild")
+@with_appcontext
+def rebuild_command():
+    """Recompute vehicle_ledger from the base tables."""
+    drift = reconcile(fix=True)
+    click.echo(f"vehicle_ledger rebuilt ({len(drift)} vehicles corrected)")
+
@@ -0,0 +1,162 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+# Request instrumentation. Every request is timed from before_request to
+# teardown and lands in a per-endpoint latency histogram, a per-status counter
+# and a DB time histogram fed by app.db's cursor wrapper. Teardown only waits
+# for the last chunk of a streamed response when the generator is wrapped in
+# stream_with_context (the exports are). Event streams are open-ended and
+# their teardown runs as soon as the headers go out, so they are counted
+# by status but kept out of the histograms. /metrics renders it all, plus
+# pool and cache counters, in the Prometheus text format.
+#
+# Recording is a bisect and a few increments under one lock, cheap enough to
+# leave on. Like the cache and pool stats, numbers are per process; scrape
+# every worker.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._latency = {}
+        self._db_time = {}
+        self._db_queries = {}
+        self._responses = {}
+
+    def init_app(self, app):
+        self.enabled = app.config["METRICS_ENABLED"]
+        if not self.enabled:
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._capture_status)
+        app.teardown_request(self._finish)
+
+    def _start(self):
+        g.metrics_started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+    def _capture_status(self, response):
+        g.metrics_status = response.status_code
+        g.metrics_untimed = response.mimetype == "text/event-stream"
+        return response
+
+    def _finish(self, exc=None):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+
+        elapsed = time.perf_counter() - started
+        route = (request.endpoint or "unmatched", request.method)
+        status = g.pop("metrics_status", 500)
+        db_time = g.get("db_time", 0.0)
+
+        with self._lock:
+            self._in_flight -= 1
+
+            key = route + (status,)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+            if g.pop("metrics_untimed", False):
+                return
+
+            latency = self._latency.get(route)
+            if latency is None:
+                latency = self._latency[route] = Histogram(LATENCY_BUCKETS)
+                self._db_time[route] = Histogram(LATENCY_BUCKETS)
+                self._db_queries[route] = 0
+            latency.observe(elapsed)
+            self._db_time[route].observe(db_time)
+            self._db_queries[route] += g.get("db_queries", 0)
+
+    def render(self, extra_gauges=()):
+        """Prometheus text exposition of everything recorded so far.
+
+        `extra_gauges` is an iterable of (name, help, type, value) tuples.
+        """
+        with self._lock:
+            lines = [
+                "# HELP fleetflow_http_requests_in_flight Requests currently being served.",
+                "# TYPE fleetflow_http_requests_in_flight gauge",
+                f"fleetflow_http_requests_in_flight {self._in_flight}",
+                "# HELP fleetflow_http_request_duration_seconds Request latency by endpoint.",
+                "# TYPE fleetflow_http_request_duration_seconds histogram"
+            ]
+            for (endpoint, method), histogram in sorted(self._latency.items()):
+                labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+                lines.extend(histogram.render("fleetflow_http_request_duration_seconds", labels))
+
+            lines.extend([
+                "# HELP fleetflow_http_responses_total Responses by endpoint and status code.",
+                "# TYPE fleetflow_http_responses_total counter"
+            ])
+            for (endpoint, method, status), count in sorted(self._responses.items()):
+                lines.append(
+                    f'fleetflow_http_responses_total{{endpoint="{_label(endpoint)}",'
+                    f'method="{method}",status="{status}"}} {count}'
+                )
+
+            lines.extend([
+                "# HELP fleetflow_db_time_seconds Time spent in the database per request.",
+                "# TYPE fleetflow_db_time_seconds histogram"
+            ])
+            for (endpoint, method), histogram in sorted(self._db_time.items()):
+                labels = f'endpoint="{_label(endpoint)}",method="{method}"'
+                lines.extend(histogram.render("fleetflow_db_time_seconds", labels))
+
+            lines.extend([
+                "# HELP fleetflow_db_queries_total SQL statements executed.",
+                "# TYPE fleetflow_db_queries_total counter"
+            ])
+            for (endpoint, method), count in sorted(self._db_queries.items()):
+                lines.append(
+                    f'fleetflow_db_queries_total{{endpoint="{_label(endpoint)}",method="{method}"}} {count}'
+                )
+
+        for name, help_text, kind, value in extra_gauges:
+            lines.extend([
+                f"# HELP {name} {help_text}",
+                f"# TYPE {name} {kind}",
+                f"{name} {value}"
+            ])
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,92 @@
+from bisect import bisect_left, insort
+
+# Load planning: consolidate shipments onto as few vehicles as possible.
+# Shipments are grouped by lane (origin, destination) since one trip serves
+# one lane. Each lane is packed best-fit decreasing: heaviest shipment first,
+# into the open vehicle with the least room that still fits it, opening the
+# largest free vehicle when none does. Open vehicles are kept in a list
+# sorted by remaining capacity, so a placement is a bisect, not a scan.
+# Once a lane is packed, every vehicle is swapped for the smallest free one
+# that still carries its load. The big vehicles go back to the pool for the
+# lanes after it. Heavy lanes are planned first.
+
+
+def _take(pool, capacity):
+    """Remove and return the smallest (capacity, vehicle_id) in `pool` that fits `capacity`."""
+    index = bisect_left(pool, (capacity,))
+    if index == len(pool):
+        return None
+    return pool.pop(index)
+
+
+def _pack_lane(shipments, pool):
+    """Best-fit decreasing for one lane; returns (loads, unplaced).
+
+    `shipments` is a list of (weight, index) sorted heaviest first and each
+    load is [vehicle, total_weight, [index, ...]].
+    """
+    loads = []
+    open_bins = []
+    unplaced = []
+
+    for weight, index in shipments:
+        position = bisect_left(open_bins, (weight,))
+        if position < len(open_bins):
+            remaining, load_number = open_bins.pop(position)
+            insort(open_bins, (remaining - weight, load_number))
+        else:
+            if not pool or pool[-1][0] < weight:
+                unplaced.append(index)
+                continue
+            vehicle = pool.pop()
+            load_number = len(loads)
+            loads.append([vehicle, 0, []])
+            insort(open_bins, (vehicle[0] - weight, load_number))
+
+        loads[load_number][1] += weight
+        loads[load_number][2].append(index)
+
+    for load in loads:
+        insort(pool, load[0])
+    for load in sorted(loads, key=lambda load: load[1], reverse=True):
+        load[0] = _take(pool, load[1])
+
+    return loads, unplaced
+
+
+def plan_loads(shipments, vehicles):
+    """Plan trips for `shipments` on `vehicles`.
+
+    `shipments` is a list of dicts with weight, origin and destination;
+    `vehicles` is a list of (max_capacity_kg, vehicle_id). Returns
+    (trips, unassigned): each trip is a dict with vehicle_id, cargo_weight,
+    origin, destination and the indexes of its shipments, and unassigned is
+    the list of shipment indexes that did not fit on any free vehicle.
+    """
+    lanes = {}
+    for index, shipment in enumerate(shipments):
+        lane = (shipment["origin"], shipment["destination"])
+        lanes.setdefault(lane, []).append((shipment["weight"], index))
+
+    ordered = sorted(lanes.items(), key=lambda item: sum(weight for weight, _ in item[1]), reverse=True)
+
+    pool = sorted(vehicles)
+    trips = []
+    unassigned = []
+
+    for (origin, destination), lane_shipments in ordered:
+        lane_shipments.sort(reverse=True)
+        loads, unplaced = _pack_lane(lane_shipments, pool)
+        unassigned.extend(unplaced)
+
+        for (capacity, vehicle_id), weight, indexes in loads:
+            trips.append({
+                "vehicle_id": vehicle_id,
+                "capacity": capacity,
+                "cargo_weight": weight,
+                "origin": origin,
+                "destination": destination,
+                "shipments": sorted(indexes)
+            })
+
+    return trips, sorted(unassigned)
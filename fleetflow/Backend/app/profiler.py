@@ -0,0 +1,158 @@
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from flask import g, request, current_app
+
+from app.db import get_pool
+
+# SQL profiling on top of app.db's cursor wrapper. At the end of each request
+# the statements it ran are normalized (literals and IN lists collapsed) and:
+#   - folded into per-statement totals (count, time, rows) for /system/sql,
+#   - checked against SQL_SLOW_MS; slow ones go to the app log and a bounded
+#     slow-query log, with their EXPLAIN plan if SQL_EXPLAIN_SLOW is set,
+#   - checked for N+1 patterns: the same normalized statement more than
+#     SQL_REPEAT_THRESHOLD times in one request,
+#   - checked against the per-request budget SQL_QUERY_BUDGET.
+# With SQL_DEBUG_HEADERS on, responses carry X-DB-Queries and X-DB-Time-Ms.
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize(sql):
+    """Collapse a statement to its shape: no literals, one placeholder per IN list."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class SQLProfiler:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._slow = deque(maxlen=100)
+        self._counters = {"requests": 0, "slow_queries": 0, "repeat_warnings": 0, "budget_warnings": 0}
+
+    def init_app(self, app):
+        self.enabled = app.config["SQL_PROFILE"]
+        if not self.enabled:
+            return
+
+        self.slow_ms = app.config["SQL_SLOW_MS"]
+        self.explain_slow = app.config["SQL_EXPLAIN_SLOW"]
+        self.repeat_threshold = app.config["SQL_REPEAT_THRESHOLD"]
+        self.query_budget = app.config["SQL_QUERY_BUDGET"]
+        self._slow = deque(maxlen=app.config["SQL_SLOW_LOG_SIZE"])
+
+        if app.config["SQL_DEBUG_HEADERS"]:
+            app.after_request(self._add_headers)
+        app.teardown_request(self._analyze)
+
+    def _add_headers(self, response):
+        response.headers["X-DB-Queries"] = str(len(g.get("db_statements", ())))
+        response.headers["X-DB-Time-Ms"] = f"{g.get('db_time', 0.0) * 1000:.2f}"
+        return response
+
+    def _explain(self, sql, params):
+        if not sql.lstrip().upper().startswith("SELECT") or not isinstance(params, (tuple, list, dict, type(None))):
+            return None
+        try:
+            # Runs in teardown: never wait on (or grow) the pool for a diagnostic.
+            conn = get_pool().try_acquire()
+            if conn is None:
+                return [{"skipped": "no idle database connection"}]
+            try:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute("EXPLAIN " + sql, params or ())
+                plan = cursor.fetchall()
+                cursor.close()
+            finally:
+                conn.close()
+            return plan
+        except Exception as e:
+            return [{"error": str(e)}]
+
+    def _analyze(self, exc=None):
+        statements = g.pop("db_statements", None)
+        if not statements:
+            return
+
+        endpoint = request.endpoint or "unmatched"
+        logger = current_app.logger
+        slow = []
+        repeats = {}
+
+        with self._lock:
+            self._counters["requests"] += 1
+            for statement in statements:
+                shape = normalize(statement["sql"])
+                repeats[shape] = repeats.get(shape, 0) + 1
+
+                totals = self._statements.get(shape)
+                if totals is None:
+                    totals = self._statements[shape] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0}
+                totals["count"] += 1
+                totals["seconds"] += statement["seconds"]
+                totals["rows"] += statement["rows"]
+                if statement["seconds"] > totals["max_seconds"]:
+                    totals["max_seconds"] = statement["seconds"]
+
+                if statement["seconds"] * 1000 >= self.slow_ms:
+                    slow.append((shape, statement))
+
+        for shape, statement in slow:
+            entry = {
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "endpoint": endpoint,
+                "sql": shape,
+                "ms": round(statement["seconds"] * 1000, 2),
+                "rows": statement["rows"]
+            }
+            if self.explain_slow:
+                entry["plan"] = self._explain(statement["sql"], statement["params"])
+            with self._lock:
+                self._slow.append(entry)
+                self._counters["slow_queries"] += 1
+            logger.warning("Slow query on %s (%.1f ms, %d rows): %s", endpoint, entry["ms"], entry["rows"], shape)
+
+        for shape, count in repeats.items():
+            if count > self.repeat_threshold:
+                with self._lock:
+                    self._counters["repeat_warnings"] += 1
+                logger.warning("Possible N+1 on %s: statement ran %d times: %s", endpoint, count, shape)
+
+        if len(statements) > self.query_budget:
+            with self._lock:
+                self._counters["budget_warnings"] += 1
+            logger.warning("%s ran %d SQL statements (budget %d)", endpoint, len(statements), self.query_budget)
+
+    def stats(self, top=20):
+        with self._lock:
+            ranked = sorted(self._statements.items(), key=lambda item: item[1]["seconds"], reverse=True)
+            return {
+                **self._counters,
+                "top_statements": [
+                    {
+                        "sql": shape,
+                        "count": totals["count"],
+                        "total_ms": round(totals["seconds"] * 1000, 2),
+                        "avg_ms": round(totals["seconds"] * 1000 / totals["count"], 3),
+                        "max_ms": round(totals["max_seconds"] * 1000, 2),
+                        "rows": totals["rows"]
+                    }
+                    for shape, totals in ranked[:top]
+                ],
+                "slow_log": list(self._slow)
+            }
+
+
+profiler = SQLProfiler()
@@ -0,0 +1,149 @@
+# Sparse fields and columnar output for the list endpoints. ?fields=a,b picks
+# columns from a per-entity whitelist and only those go into the SELECT list
+# (joins whose columns were not asked for are dropped too); id is always
+# included. ?format=columns returns {column: [values...]} instead of an array
+# of objects, built straight from tuple rows so no per-row dict is made.
+
+ENTITIES = {
+    "vehicles": {
+        "source": "vehicles v",
+        "fields": {
+            "id": "v.id",
+            "model_name": "v.model_name",
+            "license_plate": "v.license_plate",
+            "vehicle_type": "v.vehicle_type",
+            "required_license_category": "v.required_license_category",
+            "max_capacity_kg": "v.max_capacity_kg",
+            "odometer_reading": "v.odometer_reading",
+            "status": "v.status",
+            "acquisition_cost": "v.acquisition_cost",
+            "created_at": "v.created_at",
+            "updated_at": "v.updated_at"
+        },
+        "joins": {}
+    },
+    "drivers": {
+        "source": "drivers d",
+        "fields": {
+            "id": "d.id",
+            "name": "d.name",
+            "license_number": "d.license_number",
+            "license_category": "d.license_category",
+            "license_expiry_date": "d.license_expiry_date",
+            "status": "d.status",
+            "safety_score": "d.safety_score",
+            "created_at": "d.created_at",
+            "updated_at": "d.updated_at"
+        },
+        "joins": {}
+    },
+    "maintenance_logs": {
+        "source": "maintenance_logs m",
+        "fields": {
+            "id": "m.id",
+            "vehicle_id": "m.vehicle_id",
+            "vehicle": "v.model_name",
+            "service_type": "m.service_type",
+            "service_date": "m.service_date",
+            "cost": "m.cost",
+            "description": "m.description",
+            "updated_at": "m.updated_at",
+            "planned_start": "m.planned_start",
+            "planned_end": "m.planned_end"
+        },
+        "default": [
+            "id", "vehicle_id", "vehicle", "service_type", "service_date",
+            "cost", "description", "updated_at"
+        ],
+        "joins": {"v": "JOIN vehicles v ON m.vehicle_id = v.id"}
+    },
+    "trips": {
+        "source": "trips t",
+        "fields": {
+            "id": "t.id",
+            "cargo_weight": "t.cargo_weight",
+            "origin": "t.origin",
+            "destination": "t.destination",
+            "status": "t.status",
+            "created_at": "t.created_at",
+            "completed_at": "t.completed_at",
+            "updated_at": "t.updated_at",
+            "vehicle_type": "v.vehicle_type",
+            "model_name": "v.model_name",
+            "license_plate": "v.license_plate",
+            "driver_name": "d.name",
+            "vehicle_id": "t.vehicle_id",
+            "driver_id": "t.driver_id",
+            "start_odometer": "t.start_odometer",
+            "end_odometer": "t.end_odometer",
+            "revenue": "t.revenue",
+            "planned_start": "t.planned_start",
+            "planned_end": "t.planned_end"
+        },
+        "default": [
+            "id", "cargo_weight", "origin", "destination", "status",
+            "created_at", "completed_at", "updated_at",
+            "vehicle_type", "model_name", "license_plate", "driver_name"
+        ],
+        "joins": {
+            "v": "JOIN vehicles v ON t.vehicle_id = v.id",
+            "d": "JOIN drivers d ON t.driver_id = d.id"
+        }
+    }
+}
+
+FORMATS = {"rows", "columns"}
+
+
+class ProjectionError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+class Projection:
+    def __init__(self, entity, fields=None, fmt=None, required=()):
+        spec = ENTITIES[entity]
+        self.entity = entity
+        self.format = fmt or "rows"
+        if self.format not in FORMATS:
+            raise ProjectionError(f"format must be one of {', '.join(sorted(FORMATS))}")
+
+        if fields:
+            names = [name.strip() for name in fields.split(",") if name.strip()]
+            unknown = [name for name in names if name not in spec["fields"]]
+            if unknown:
+                raise ProjectionError(f"Unknown {entity} fields: {', '.join(unknown)}")
+        else:
+            names = list(spec.get("default", spec["fields"]))
+
+        self.fields = []
+        for name in ["id", *required, *names]:
+            if name not in self.fields:
+                self.fields.append(name)
+
+        expressions = [spec["fields"][name] for name in self.fields]
+        self.columns = ", ".join(
+            expr if expr.endswith(f".{name}") else f"{expr} AS {name}"
+            for name, expr in zip(self.fields, expressions)
+        )
+        aliases = {expr.split(".", 1)[0] for expr in expressions}
+        self.source = " ".join(
+            [spec["source"], *(join for alias, join in spec["joins"].items() if alias in aliases)]
+        )
+
+    def select(self):
+        return f"SELECT {self.columns} FROM {self.source}"
+
+    def shape(self, names, rows):
+        """Rows (tuples from a plain cursor) as a list of objects or as {column: [values]}."""
+        if self.format == "columns":
+            if not rows:
+                return {name: [] for name in names}
+            return {name: list(values) for name, values in zip(names, zip(*rows))}
+        return [dict(zip(names, row)) for row in rows]
+
+
+def from_request(entity, args, required=()):
+    """Projection for the ?fields= and ?format= query args."""
+    return Projection(entity, args.get("fields"), args.get("format"), required)
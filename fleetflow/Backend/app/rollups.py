@@ -0,0 +1,119 @@
+import click
+from flask.cli import with_appcontext
+
+from app.db import get_connection
+from app.ledger import MISC_SERVICE_TYPE
+
+# Per-vehicle revenue and cost totals bucketed by day, ISO week (Monday) and
+# month, so time-series analytics read a bounded number of rollup rows
+# instead of scanning trips, fuel_logs and maintenance_logs. Write paths call
+# add()/add_many() next to their ledger update, inside the same transaction;
+# a day of None means CURDATE(), matching rows inserted with CURDATE()/NOW().
+# Buckets are computed in SQL so they always agree with the database's dates.
+
+ROLLUP_COLUMNS = ["revenue", "fuel_cost", "maintenance_cost", "misc_cost"]
+
+GRANULARITIES = ["day", "week", "month"]
+
+_GRANULARITY_ROWS = " UNION ALL ".join(f"SELECT '{name}' AS granularity" for name in GRANULARITIES)
+
+_BUCKET = """CASE g.granularity
+        WHEN 'day' THEN e.day
+        WHEN 'week' THEN e.day - INTERVAL WEEKDAY(e.day) DAY
+        ELSE e.day - INTERVAL (DAYOFMONTH(e.day) - 1) DAY
+    END"""
+
+
+def _upsert(cursor, columns, rows):
+    """Fold (vehicle_id, day, *amounts) rows into every granularity with one statement."""
+    for col in columns:
+        if col not in ROLLUP_COLUMNS:
+            raise ValueError(f"Unknown rollup column: {col}")
+
+    amounts = ", ".join(f"%s AS {col}" for col in columns)
+    entries = " UNION ALL ".join(
+        [f"SELECT %s AS vehicle_id, IFNULL(DATE(%s), CURDATE()) AS day, {amounts}"] * len(rows)
+    )
+    cursor.execute(f"""
+        INSERT INTO cost_rollups (granularity, bucket, vehicle_id, {', '.join(columns)})
+        SELECT g.granularity, {_BUCKET} AS bucket, e.vehicle_id,
+               {', '.join(f'SUM(e.{col})' for col in columns)}
+        FROM ({entries}) e
+        CROSS JOIN ({_GRANULARITY_ROWS}) g
+        GROUP BY g.granularity, bucket, e.vehicle_id
+        ON DUPLICATE KEY UPDATE {', '.join(f'{col} = {col} + VALUES({col})' for col in columns)}
+    """, tuple(value for row in rows for value in row))
+
+
+def add(cursor, vehicle_id, day=None, **deltas):
+    """Add the given deltas to a vehicle's rollups for `day` (a date or datetime)."""
+    deltas = {col: value for col, value in deltas.items() if value}
+    if not deltas:
+        return
+    _upsert(cursor, list(deltas), [(vehicle_id, day, *deltas.values())])
+
+
+def add_many(cursor, column, deltas, day=None):
+    """Apply {vehicle_id: delta} to one rollup column for `day` in a single statement."""
+    rows = [(vehicle_id, day, delta) for vehicle_id, delta in sorted(deltas.items()) if delta]
+    if not rows:
+        return
+    _upsert(cursor, [column], rows)
+
+
+BACKFILL_QUERY = f"""
+    INSERT INTO cost_rollups (granularity, bucket, vehicle_id, {', '.join(ROLLUP_COLUMNS)})
+    SELECT g.granularity, {_BUCKET} AS bucket, e.vehicle_id,
+           {', '.join(f'SUM(e.{col})' for col in ROLLUP_COLUMNS)}
+    FROM (
+        SELECT vehicle_id, DATE(completed_at) AS day, SUM(revenue) AS revenue,
+               0 AS fuel_cost, 0 AS maintenance_cost, 0 AS misc_cost
+        FROM trips
+        WHERE status='completed' AND completed_at IS NOT NULL
+        GROUP BY vehicle_id, DATE(completed_at)
+        UNION ALL
+        SELECT vehicle_id, fuel_date, 0, SUM(cost), 0, 0
+        FROM fuel_logs
+        GROUP BY vehicle_id, fuel_date
+        UNION ALL
+        SELECT vehicle_id, service_date, 0,
+               SUM(CASE WHEN service_type <> '{MISC_SERVICE_TYPE}' THEN cost ELSE 0 END),
+               SUM(CASE WHEN service_type = '{MISC_SERVICE_TYPE}' THEN cost ELSE 0 END)
+        FROM maintenance_logs
+        GROUP BY vehicle_id, service_date
+    ) e
+    CROSS JOIN ({_GRANULARITY_ROWS}) g
+    GROUP BY g.granularity, bucket, e.vehicle_id
+"""
+
+
+def backfill():
+    """Rebuild cost_rollups from the base tables in one transaction; returns rows written.
+
+    Completed trips without a completed_at cannot be bucketed and are left
+    out (they still count in vehicle_ledger).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("DELETE FROM cost_rollups")
+    cursor.execute(BACKFILL_QUERY)
+    written = cursor.rowcount
+    conn.commit()
+
+    cursor.close()
+    conn.close()
+    return written
+
+
+@click.group("rollups")
+def rollups_cli():
+    """Maintain the cost_rollups table."""
+
+
+@rollups_cli.command("backfill")
+@with_appcontext
+def backfill_command():
+    """Recompute cost_rollups from trips, fuel_logs and maintenance_logs."""
+    written = backfill()
+    click.echo(f"cost_rollups rebuilt ({written} rows)")
@@ -1,6 +1,8 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt
 from app.db import get_connection
+from app import counters
+from datetime import date, timedelta
 
 analytics_bp = Blueprint("analytics", __name__, url_prefix="/analytics")
 
@@ -17,27 +19,17 @@ def dashboard_kpis():
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("SELECT COUNT(*) AS active FROM vehicles WHERE status='on_trip'")
-        active = cursor.fetchone()["active"]
+        totals = counters.read(cursor)
 
-        cursor.execute("SELECT COUNT(*) AS in_shop FROM vehicles WHERE status='in_shop'")
-        in_shop = cursor.fetchone()["in_shop"]
+        cursor.close()
+        conn.close()
 
-        cursor.execute("SELECT COUNT(*) AS total FROM vehicles")
-        total = cursor.fetchone()["total"]
+        active = totals["on_trip_vehicles"]
+        in_shop = totals["in_shop_vehicles"]
+        total = totals["total_vehicles"]
 
         utilization_rate = (active / total * 100) if total > 0 else 0
-
-        cursor.execute("SELECT IFNULL(SUM(cost),0) AS fuel FROM fuel_logs")
-        fuel = cursor.fetchone()["fuel"]
-
-        cursor.execute("SELECT IFNULL(SUM(cost),0) AS maintenance FROM maintenance_logs")
-        maintenance = cursor.fetchone()["maintenance"]
-
-        total_cost = fuel + maintenance
-
-        cursor.close()
-        conn.close()
+        total_cost = totals["fuel_cost"] + totals["maintenance_cost"]
 
         return jsonify({
             "active_fleet": active,
@@ -63,51 +55,351 @@ def vehicle_roi(vehicle_id):
         cursor = conn.cursor(dictionary=True)
 
         cursor.execute("""
-            SELECT acquisition_cost
-            FROM vehicles
-            WHERE id=%s
+            SELECT v.acquisition_cost,
+                   IFNULL(l.revenue, 0) AS revenue,
+                   IFNULL(l.fuel_cost + l.maintenance_cost + l.misc_cost, 0) AS total_expense
+            FROM vehicles v
+            LEFT JOIN vehicle_ledger l ON l.vehicle_id = v.id
+            WHERE v.id=%s
         """, (vehicle_id,))
         vehicle = cursor.fetchone()
 
+        cursor.close()
+        conn.close()
+
         if not vehicle:
             return jsonify({"error": "Vehicle not found"}), 404
 
         acquisition = vehicle["acquisition_cost"]
+        revenue = vehicle["revenue"]
+        total_expense = vehicle["total_expense"]
 
-        cursor.execute("""
-            SELECT IFNULL(SUM(revenue),0) AS revenue
-            FROM trips
-            WHERE vehicle_id=%s AND status='completed'
-        """, (vehicle_id,))
-        revenue = cursor.fetchone()["revenue"]
+        roi = ((revenue - total_expense) / acquisition) * 100 if acquisition > 0 else 0
 
-        cursor.execute("""
-            SELECT IFNULL(SUM(cost),0) AS fuel
-            FROM fuel_logs
-            WHERE vehicle_id=%s
-        """, (vehicle_id,))
-        fuel = cursor.fetchone()["fuel"]
+        return jsonify({
+            "vehicle_id": vehicle_id,
+            "revenue": revenue,
+            "total_expense": total_expense,
+            "roi_percent": round(roi, 2)
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+ROI_QUERY = """
+    SELECT v.id AS vehicle_id, v.model_name, v.license_plate, v.status,
+           v.acquisition_cost,
+           IFNULL(l.revenue, 0) AS revenue,
+           IFNULL(l.fuel_cost + l.maintenance_cost + l.misc_cost, 0) AS total_expense,
+           CASE WHEN v.acquisition_cost > 0
+                THEN (IFNULL(l.revenue, 0) - IFNULL(l.fuel_cost + l.maintenance_cost + l.misc_cost, 0))
+                     / v.acquisition_cost * 100
+                ELSE 0 END AS roi_percent
+    FROM vehicles v
+    LEFT JOIN vehicle_ledger l ON l.vehicle_id = v.id
+"""
+
+
+@analytics_bp.route("/roi", methods=["GET"])
+@jwt_required()
+def fleet_roi():
+    """Every vehicle's ROI from vehicle_ledger, best first. ?top=k / ?bottom=k limit the ranking."""
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "analyst"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    top = request.args.get("top", type=int)
+    bottom = request.args.get("bottom", type=int)
+
+    if (top is not None and top < 1) or (bottom is not None and bottom < 1):
+        return jsonify({"error": "top and bottom must be positive integers"}), 400
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        result = {}
+        if top is None and bottom is None:
+            cursor.execute(ROI_QUERY + " ORDER BY roi_percent DESC, v.id")
+            result["vehicles"] = cursor.fetchall()
+        if top is not None:
+            cursor.execute(ROI_QUERY + " ORDER BY roi_percent DESC, v.id LIMIT %s", (top,))
+            result["top"] = cursor.fetchall()
+        if bottom is not None:
+            cursor.execute(ROI_QUERY + " ORDER BY roi_percent ASC, v.id LIMIT %s", (bottom,))
+            result["bottom"] = cursor.fetchall()
+
+        cursor.close()
+        conn.close()
+
+        for rows in result.values():
+            for row in rows:
+                row["roi_percent"] = round(float(row["roi_percent"]), 2)
+
+        return jsonify(result), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@analytics_bp.route("/summary", methods=["GET"])
+@jwt_required()
+def analytics_summary():
+    """Status breakdowns and cost totals for the Analytics page, aggregated in SQL."""
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "analyst"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        trip_statuses = {"draft": 0, "scheduled": 0, "dispatched": 0, "completed": 0, "cancelled": 0}
+        cursor.execute("SELECT status, COUNT(*) AS total FROM trips GROUP BY status")
+        for row in cursor.fetchall():
+            if row["status"] in trip_statuses:
+                trip_statuses[row["status"]] = row["total"]
+
+        vehicle_statuses = {"active": 0, "idle": 0, "in_shop": 0}
+        cursor.execute("SELECT status, COUNT(*) AS total FROM vehicles GROUP BY status")
+        for row in cursor.fetchall():
+            if row["status"] == "on_trip":
+                vehicle_statuses["active"] += row["total"]
+            elif row["status"] == "in_shop":
+                vehicle_statuses["in_shop"] += row["total"]
+            else:
+                vehicle_statuses["idle"] += row["total"]
 
         cursor.execute("""
-            SELECT IFNULL(SUM(cost),0) AS maintenance
-            FROM maintenance_logs
-            WHERE vehicle_id=%s
-        """, (vehicle_id,))
-        maintenance = cursor.fetchone()["maintenance"]
+            SELECT
+                (SELECT COUNT(*) FROM drivers WHERE status='on_duty') AS available_drivers,
+                (SELECT IFNULL(SUM(cost),0) FROM fuel_logs) AS fuel,
+                (SELECT COUNT(*) FROM maintenance_logs) AS maintenance_logs,
+                (SELECT IFNULL(SUM(cost),0) FROM maintenance_logs) AS maintenance
+        """)
+        totals = cursor.fetchone()
 
-        total_expense = fuel + maintenance
+        cursor.close()
+        conn.close()
 
-        roi = ((revenue - total_expense) / acquisition) * 100 if acquisition > 0 else 0
+        return jsonify({
+            "trip_statuses": trip_statuses,
+            "vehicle_statuses": vehicle_statuses,
+            "costs": {
+                "fuel": float(totals["fuel"]),
+                "maintenance": float(totals["maintenance"])
+            },
+            "fleet": {
+                "vehicles": sum(vehicle_statuses.values()),
+                "available_drivers": totals["available_drivers"],
+                "trips": sum(trip_statuses.values()),
+                "maintenance_logs": totals["maintenance_logs"]
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+COST_GRANULARITIES = {
+    # requested granularity: (rollup rows read, their period expression,
+    #                         period expression for day rows at the edges)
+    "day": ("day", "r.bucket", "r.bucket"),
+    "week": ("week", "r.bucket", "r.bucket - INTERVAL WEEKDAY(r.bucket) DAY"),
+    "month": ("month", "r.bucket", "r.bucket - INTERVAL (DAYOFMONTH(r.bucket) - 1) DAY"),
+    "year": ("month", "MAKEDATE(YEAR(r.bucket), 1)", "MAKEDATE(YEAR(r.bucket), 1)")
+}
+
+COST_AMOUNTS = "r.vehicle_id, r.revenue, r.fuel_cost, r.maintenance_cost, r.misc_cost"
+
+COST_GROUPS = {
+    "none": None,
+    "vehicle": "r.vehicle_id",
+    "vehicle_type": "v.vehicle_type"
+}
+
+
+def _bucket_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_bucket(bucket, granularity):
+    if granularity == "day":
+        return bucket + timedelta(days=1)
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    return (bucket + timedelta(days=32)).replace(day=1)
+
+
+@analytics_bp.route("/costs", methods=["GET"])
+@jwt_required()
+def cost_series():
+    """Revenue and costs per day/week/month/year from cost_rollups.
+
+    ?from= and ?to= are inclusive dates (default: the last 365 days).
+    Periods are labelled with their calendar start, but only amounts between
+    ?from= and ?to= are counted: the first and last period may be partial,
+    summed from daily rollups. ?group_by= splits each period by vehicle or
+    vehicle_type; ?vehicle_id= narrows to one vehicle.
+    """
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "analyst"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    granularity = request.args.get("granularity", "month")
+    group_by = request.args.get("group_by", "none")
+    vehicle_id = request.args.get("vehicle_id", type=int)
+
+    if granularity not in COST_GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of {', '.join(COST_GRANULARITIES)}"}), 400
+    if group_by not in COST_GROUPS:
+        return jsonify({"error": f"group_by must be one of {', '.join(COST_GROUPS)}"}), 400
+
+    try:
+        end = date.fromisoformat(request.args["to"]) if request.args.get("to") else date.today()
+        start = date.fromisoformat(request.args["from"]) if request.args.get("from") else end - timedelta(days=364)
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYY-MM-DD dates"}), 400
+
+    if start > end:
+        return jsonify({"error": "from must not be after to"}), 400
+
+    source, period, day_period = COST_GRANULARITIES[granularity]
+    group = COST_GROUPS[group_by]
+
+    vehicle_filter = " AND r.vehicle_id = %s" if vehicle_id is not None else ""
+    vehicle_params = [vehicle_id] if vehicle_id is not None else []
+
+    # Whole `source` buckets inside [start, end] come from their own rollup
+    # rows; the days before the first and after the last one from day rows.
+    first_whole = start if _bucket_start(start, source) == start else \
+        _next_bucket(_bucket_start(start, source), source)
+    after_whole = _bucket_start(end + timedelta(days=1), source)
+
+    parts = []
+    params = []
+    if first_whole < after_whole:
+        parts.append(f"""
+            SELECT {period} AS period, {COST_AMOUNTS} FROM cost_rollups r
+            WHERE r.granularity = %s AND r.bucket >= %s AND r.bucket < %s{vehicle_filter}
+        """)
+        params += [source, first_whole, after_whole, *vehicle_params]
+        edges = [(start, first_whole - timedelta(days=1)), (after_whole, end)]
+    else:
+        edges = [(start, end)]
+
+    for first, last in edges:
+        if first <= last:
+            parts.append(f"""
+                SELECT {day_period} AS period, {COST_AMOUNTS} FROM cost_rollups r
+                WHERE r.granularity = 'day' AND r.bucket BETWEEN %s AND %s{vehicle_filter}
+            """)
+            params += [first, last, *vehicle_params]
+
+    select = ["r.period"]
+    group_columns = ["period"]
+    join = ""
+    if group:
+        select.append(f"{group} AS {group_by}")
+        group_columns.append(group_by)
+    if group_by == "vehicle_type":
+        join = "JOIN vehicles v ON v.id = r.vehicle_id"
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute(f"""
+            SELECT {', '.join(select)},
+                   SUM(r.revenue) AS revenue,
+                   SUM(r.fuel_cost) AS fuel_cost,
+                   SUM(r.maintenance_cost) AS maintenance_cost,
+                   SUM(r.misc_cost) AS misc_cost
+            FROM ({' UNION ALL '.join(parts)}) r
+            {join}
+            GROUP BY {', '.join(group_columns)}
+            ORDER BY {', '.join(group_columns)}
+        """, tuple(params))
+        rows = cursor.fetchall()
 
         cursor.close()
         conn.close()
 
+        for row in rows:
+            row["period"] = row["period"].isoformat()
+            for col in ["revenue", "fuel_cost", "maintenance_cost", "misc_cost"]:
+                row[col] = float(row[col])
+            row["total_cost"] = round(row["fuel_cost"] + row["maintenance_cost"] + row["misc_cost"], 2)
+
         return jsonify({
-            "vehicle_id": vehicle_id,
-            "revenue": revenue,
-            "total_expense": total_expense,
-            "roi_percent": round(roi, 2)
+            "granularity": granularity,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "group_by": group_by,
+            "series": rows
         }), 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+def _analytics_engine():
+    return current_app.extensions.get("analytics_engine")
+
+
+@analytics_bp.route("/query", methods=["POST"])
+@jwt_required()
+def analytics_query():
+    """Ad-hoc group-by/filter/percentile query over the in-memory columnar engine.
+
+    Body: {"table": "trips", "filters": [{"column": "status", "op": "=", "value": "completed"}],
+           "group_by": ["vehicle_type", "month(completed_at)"],
+           "aggregates": [{"fn": "ratio", "numerator": "fuel_cost", "denominator": "distance"},
+                          {"fn": "percentile", "column": "revenue", "q": [50, 95]}],
+           "order_by": "count", "desc": true, "limit": 100}
+    GET /analytics/query/schema lists tables, columns and derived columns.
+    """
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "analyst"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    engine = _analytics_engine()
+    if engine is None:
+        return jsonify({"error": "Analytics engine is disabled (ANALYTICS_ENGINE=0)"}), 503
+
+    # Only importable with NumPy installed, which the engine being on implies.
+    from app.columnar import QueryError
+
+    try:
+        return jsonify(engine.query(request.get_json(silent=True))), 200
+
+    except QueryError as e:
+        return jsonify({"error": e.message}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@analytics_bp.route("/query/schema", methods=["GET"])
+@jwt_required()
+def analytics_query_schema():
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "analyst"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    engine = _analytics_engine()
+    if engine is None:
+        return jsonify({"error": "Analytics engine is disabled (ANALYTICS_ENGINE=0)"}), 503
+
+    return jsonify(engine.schema()), 200
@@ -1,14 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app.db import get_connection
+from app.cache import cache
+from app.events import events
+from app.availability import availability
+from app import driver_stats
 from datetime import datetime
 
-driver_bp = Blueprint("driver", __name__, url_prefix="/drivers")
+driver_performance_bp = Blueprint("driver_performance", __name__, url_prefix="/drivers")
 
 
-@driver_bp.route("/", methods=["GET"])
+@driver_performance_bp.route("/performance", methods=["GET"])
 @jwt_required()
-def get_drivers():
+@cache.cached("drivers")
+def get_driver_performance():
     claims = get_jwt()
 
     if claims["role"] not in ["manager", "safety"]:
@@ -18,6 +23,8 @@ def get_drivers():
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
+        # Trip totals come from driver_stats, kept up to date by the trip
+        # write paths, so this reads one row per driver.
         cursor.execute("""
             SELECT 
                 d.id,
@@ -25,26 +32,24 @@ def get_drivers():
                 d.license_number,
                 d.license_expiry_date,
                 d.status,
-                COUNT(t.id) AS total_trips,
-                SUM(CASE WHEN t.status='completed' THEN 1 ELSE 0 END) AS completed_trips
+                IFNULL(s.total_trips, 0) AS total_trips,
+                IFNULL(s.completed_trips, 0) AS completed_trips,
+                IFNULL(s.cancelled_trips, 0) AS cancelled_trips
             FROM drivers d
-            LEFT JOIN trips t ON d.id = t.driver_id
-            GROUP BY d.id
+            LEFT JOIN driver_stats s ON s.driver_id = d.id
         """)
 
         drivers = cursor.fetchall()
+        today = datetime.today().date()
 
         for driver in drivers:
-            total = driver["total_trips"] or 0
-            completed = driver["completed_trips"] or 0
+            completion_rate, safety_score = driver_stats.performance(
+                driver["total_trips"], driver["completed_trips"]
+            )
+            driver["completion_rate"] = completion_rate
+            driver["safety_score"] = safety_score
 
-            completion_rate = (completed / total * 100) if total > 0 else 0
-            safety_score = max(100 - (total - completed) * 5, 50)
-
-            driver["completion_rate"] = round(completion_rate, 2)
-            driver["safety_score"] = round(safety_score, 2)
-
-            if driver["license_expiry_date"] and driver["license_expiry_date"] < datetime.today().date():
+            if driver["license_expiry_date"] and driver["license_expiry_date"] < today:
                 driver["status"] = "suspended"
 
         cursor.close()
@@ -56,7 +61,7 @@ def get_drivers():
         return jsonify({"error": str(e)}), 500
 
 
-@driver_bp.route("/<int:driver_id>/status", methods=["PUT"])
+@driver_performance_bp.route("/<int:driver_id>/status", methods=["PUT"])
 @jwt_required()
 def update_driver_status(driver_id):
     claims = get_jwt()
@@ -80,6 +85,10 @@ def update_driver_status(driver_id):
         cursor.close()
         conn.close()
 
+        cache.invalidate("drivers")
+        availability.drivers_changed(driver_id)
+        events.publish("drivers", "updated", driver_id, status=new_status)
+
         return jsonify({"message": "Driver status updated"}), 200
 
     except Exception as e:
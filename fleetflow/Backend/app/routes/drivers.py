@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app.db import get_connection
+from app import projection, sync
+from app.cache import cache
+from app.events import events
+from app.versions import versions
+from app.availability import availability
 
 driver_bp = Blueprint("driver", __name__, url_prefix="/drivers")
 
@@ -42,11 +47,16 @@ def add_driver():
             (name, license_number, license_category, license_expiry_date, status, safety_score)
             VALUES (%s,%s,%s,%s,%s,%s)
         """, (name, license_number, license_category, license_expiry_date, status, safety_score))
+        driver_id = cursor.lastrowid
 
         conn.commit()
         cursor.close()
         conn.close()
 
+        cache.invalidate("drivers")
+        availability.drivers_changed(driver_id)
+        events.publish("drivers", "created", driver_id, status=status)
+
         return jsonify({"message": "Driver added successfully"}), 201
 
     except Exception as e:
@@ -57,25 +67,45 @@ def add_driver():
 
 @driver_bp.route("/", methods=["GET"])
 @jwt_required()
+@versions.conditional("drivers")
+@cache.cached("drivers")
 def get_drivers():
     status = request.args.get("status")  # Filter by status if provided
-    
+    since = request.args.get("since")
+
+    if status and since is not None:
+        # A driver whose status changes would leave the filter unnoticed.
+        return jsonify({"error": "status cannot be combined with since"}), 400
+
+    try:
+        fields = projection.from_request("drivers", request.args, ("updated_at",) if since is not None else ())
+    except projection.ProjectionError as e:
+        return jsonify({"error": e.message}), 400
+
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
 
-        if status:
-            cursor.execute("SELECT * FROM drivers WHERE status=%s", (status,))
+        if since is not None:
+            window = sync.SyncWindow(cursor, since)
+            condition, params = window.condition("d")
+            cursor.execute(f"{fields.select()} WHERE {condition} {window.order('d')}", params)
+            body = window.respond(cursor, "drivers", cursor.column_names, cursor.fetchall(), fields.shape)
         else:
-            cursor.execute("SELECT * FROM drivers")
-        
-        drivers = cursor.fetchall()
+            if status:
+                cursor.execute(f"{fields.select()} WHERE d.status=%s", (status,))
+            else:
+                cursor.execute(fields.select())
+
+            body = fields.shape(cursor.column_names, cursor.fetchall())
 
         cursor.close()
         conn.close()
 
-        return jsonify(drivers), 200
+        return jsonify(body), 200
 
+    except sync.SyncError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -84,6 +114,7 @@ def get_drivers():
 
 @driver_bp.route("/available", methods=["GET"])
 @jwt_required()
+@cache.cached("drivers")
 def get_available_drivers():
     """Get drivers that are on_duty and not on_trip"""
     try:
@@ -154,6 +185,12 @@ def update_driver(driver_id):
         cursor.close()
         conn.close()
 
+        cache.invalidate("drivers")
+        availability.drivers_changed(driver_id)
+        events.publish("drivers", "updated", driver_id, **{
+            field: data[field] for field in ["status", "safety_score", "license_expiry_date"] if field in data
+        })
+
         return jsonify({"message": "Driver updated successfully"}), 200
 
     except Exception as e:
@@ -174,6 +211,7 @@ def delete_driver(driver_id):
         conn = get_connection()
         cursor = conn.cursor()
 
+        sync.record_deletes(cursor, "drivers", "id=%s", (driver_id,))
         cursor.execute("DELETE FROM drivers WHERE id=%s", (driver_id,))
         
         if cursor.rowcount == 0:
@@ -183,6 +221,10 @@ def delete_driver(driver_id):
         cursor.close()
         conn.close()
 
+        cache.invalidate("drivers")
+        availability.drivers_changed(driver_id)
+        events.publish("drivers", "deleted", driver_id)
+
         return jsonify({"message": "Driver deleted successfully"}), 200
 
     except Exception as e:
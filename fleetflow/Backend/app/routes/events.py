@@ -0,0 +1,40 @@
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from app.events import events, ENTITY_ROLES
+
+events_bp = Blueprint("events", __name__)
+
+
+# EventSource cannot set headers, so the token may also come as ?jwt=.
+@events_bp.route("/events", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def event_stream():
+    """Server-Sent Events for ?entities=trips,maintenance,drivers (default: all the role may see)."""
+    if not events.enabled:
+        return jsonify({"error": "Event stream is disabled"}), 503
+
+    role = get_jwt()["role"]
+    visible = {entity for entity, roles in ENTITY_ROLES.items() if role in roles}
+
+    requested = request.args.get("entities")
+    if requested:
+        entities = {entity.strip() for entity in requested.split(",") if entity.strip()}
+        unknown = entities - set(ENTITY_ROLES)
+        if unknown:
+            return jsonify({"error": f"Unknown entities: {', '.join(sorted(unknown))}"}), 400
+        if not entities <= visible:
+            return jsonify({"error": "Unauthorized"}), 403
+    else:
+        entities = visible
+
+    if not entities:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    if events.full():
+        return jsonify({"error": "Too many event subscribers"}), 503
+
+    return Response(
+        events.stream(entities, request.headers.get("Last-Event-ID")),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app.db import get_connection
+from app import counters, ledger, rollups
+from app.cache import cache
 
 expense_bp = Blueprint("expense", __name__, url_prefix="/expenses")
 
@@ -47,18 +49,27 @@ def add_expense():
                 INSERT INTO fuel_logs (vehicle_id, trip_id, liters, cost, fuel_date)
                 VALUES (%s,%s,%s,%s,CURDATE())
             """, (vehicle_id, trip_id, estimated_liters, fuel_cost))
+            ledger.add(cursor, vehicle_id, fuel_cost=fuel_cost)
+            rollups.add(cursor, vehicle_id, fuel_cost=fuel_cost)
 
         if misc_expense > 0:
             cursor.execute("""
                 INSERT INTO maintenance_logs
                 (vehicle_id, service_type, cost, service_date)
-                VALUES (%s,'Misc Expense',%s,CURDATE())
-            """, (vehicle_id, misc_expense))
+                VALUES (%s,%s,%s,CURDATE())
+            """, (vehicle_id, ledger.MISC_SERVICE_TYPE, misc_expense))
+            ledger.add(cursor, vehicle_id, misc_cost=misc_expense)
+            rollups.add(cursor, vehicle_id, misc_cost=misc_expense)
+
+        counters.bump(cursor, fuel_cost=max(fuel_cost, 0), maintenance_cost=max(misc_expense, 0))
 
         conn.commit()
         cursor.close()
         conn.close()
 
+        if misc_expense > 0:
+            cache.invalidate("maintenance")
+
         return jsonify({"message": "Expense logged successfully"}), 201
 
     except Exception as e:
@@ -78,18 +89,14 @@ def get_vehicle_total_cost(vehicle_id):
         cursor = conn.cursor(dictionary=True)
 
         cursor.execute("""
-            SELECT IFNULL(SUM(cost),0) as total_fuel
-            FROM fuel_logs
+            SELECT fuel_cost, maintenance_cost + misc_cost AS maintenance_cost
+            FROM vehicle_ledger
             WHERE vehicle_id=%s
         """, (vehicle_id,))
-        fuel = cursor.fetchone()["total_fuel"]
+        totals = cursor.fetchone()
 
-        cursor.execute("""
-            SELECT IFNULL(SUM(cost),0) as total_maintenance
-            FROM maintenance_logs
-            WHERE vehicle_id=%s
-        """, (vehicle_id,))
-        maintenance = cursor.fetchone()["total_maintenance"]
+        fuel = totals["fuel_cost"] if totals else 0
+        maintenance = totals["maintenance_cost"] if totals else 0
 
         total_cost = fuel + maintenance
 
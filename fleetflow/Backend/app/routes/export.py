@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt
+from app.db import get_connection
+
+export_bp = Blueprint("export", __name__, url_prefix="/export")
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORTS = {
+    "vehicles": {
+        "roles": ["manager", "analyst", "admin"],
+        "query": """
+            SELECT id, model_name, license_plate, vehicle_type, required_license_category,
+                   max_capacity_kg, odometer_reading, status, acquisition_cost, created_at
+            FROM vehicles ORDER BY id
+        """
+    },
+    "trips": {
+        "roles": ["manager", "dispatcher", "analyst", "admin"],
+        "query": """
+            SELECT id, vehicle_id, driver_id, cargo_weight, origin, destination,
+                   start_odometer, end_odometer, status, revenue, created_at, completed_at
+            FROM trips ORDER BY id
+        """
+    },
+    "fuel_logs": {
+        "roles": ["manager", "analyst", "admin"],
+        "query": """
+            SELECT id, vehicle_id, trip_id, liters, cost, fuel_date
+            FROM fuel_logs ORDER BY id
+        """
+    },
+    "maintenance_logs": {
+        "roles": ["manager", "analyst", "admin"],
+        "query": """
+            SELECT id, vehicle_id, service_type, description, cost, service_date
+            FROM maintenance_logs ORDER BY id
+        """
+    }
+}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _stream_rows(query, fmt):
+    """Yield the export body chunk by chunk from an unbuffered cursor."""
+    conn = get_connection()
+    cursor = conn.cursor(buffered=False)
+
+    try:
+        cursor.execute(query)
+        columns = cursor.column_names
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if fmt == "csv":
+            writer.writerow(columns)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+
+            if fmt == "csv":
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+                    for row in rows
+                )
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(columns, row)), default=_json_value))
+                    buffer.write("\n")
+
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        cursor.close()
+    finally:
+        # On client disconnect the cursor still has unread rows; the pool
+        # discards such connections instead of reusing them.
+        conn.close()
+
+
+@export_bp.route("/<entity>", methods=["GET"])
+@jwt_required()
+def export_entity(entity):
+    """Stream a whole table as CSV (default) or NDJSON (?format=ndjson)."""
+    export = EXPORTS.get(entity)
+
+    if not export:
+        return jsonify({"error": f"Unknown export. Must be one of: {', '.join(EXPORTS)}"}), 404
+
+    claims = get_jwt()
+
+    if claims["role"] not in export["roles"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    fmt = request.args.get("format", "csv")
+
+    if fmt not in ["csv", "ndjson"]:
+        return jsonify({"error": "Invalid format. Must be csv or ndjson"}), 400
+
+    if fmt == "csv":
+        mimetype = "text/csv"
+    else:
+        mimetype = "application/x-ndjson"
+
+    response = Response(stream_with_context(_stream_rows(export["query"], fmt)), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename={entity}.{fmt}"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,6 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app.db import get_connection
+from app import counters, ledger, projection, rollups, sync
+from app.cache import cache
+from app.events import events
+from app.versions import versions
+from app.availability import availability
+from app.schedule import schedule, find_conflict, parse_datetime
 
 maintenance_bp = Blueprint("maintenance", __name__, url_prefix="/maintenance")
 
@@ -21,12 +27,30 @@ def create_service():
     if not vehicle_id or not service_type:
         return jsonify({"error": "Missing required fields"}), 400
 
+    # A planned_start/planned_end pair books the service for later: the
+    # vehicle stays in service until then but cannot be scheduled over it.
+    planned_start = data.get("planned_start")
+    planned_end = data.get("planned_end")
+
+    if bool(planned_start) != bool(planned_end):
+        return jsonify({"error": "planned_start and planned_end go together"}), 400
+
+    if planned_start:
+        try:
+            planned_start = parse_datetime(planned_start)
+            planned_end = parse_datetime(planned_end)
+        except ValueError:
+            return jsonify({"error": "planned_start and planned_end must be ISO 8601 datetimes"}), 400
+
+        if planned_end <= planned_start:
+            return jsonify({"error": "planned_end must be after planned_start"}), 400
+
     try:
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
         # Check vehicle
-        cursor.execute("SELECT * FROM vehicles WHERE id=%s", (vehicle_id,))
+        cursor.execute("SELECT * FROM vehicles WHERE id=%s FOR UPDATE", (vehicle_id,))
         vehicle = cursor.fetchone()
 
         if not vehicle:
@@ -35,26 +59,59 @@ def create_service():
         if vehicle["status"] == "retired":
             return jsonify({"error": "Vehicle retired"}), 400
 
-        cursor.execute("""
-            INSERT INTO maintenance_logs
-            (vehicle_id, service_type, cost, service_date)
-            VALUES (%s,%s,%s,CURDATE())
-        """, (vehicle_id, service_type, cost))
-
-      
-        cursor.execute("""
-            UPDATE vehicles
-            SET status='in_shop'
-            WHERE id=%s
-        """, (vehicle_id,))
+        if planned_start:
+            conflict = find_conflict(cursor, planned_start, planned_end, vehicle_id=vehicle_id)
+            if conflict:
+                _, booking = conflict
+                return jsonify({
+                    "error": f"Vehicle already booked from {booking['planned_start']} "
+                             f"to {booking['planned_end']} ({booking['kind']} {booking['id']})"
+                }), 409
+
+            cursor.execute("""
+                INSERT INTO maintenance_logs
+                (vehicle_id, service_type, cost, service_date, planned_start, planned_end)
+                VALUES (%s,%s,%s,%s,%s,%s)
+            """, (vehicle_id, service_type, cost, planned_start.date(), planned_start, planned_end))
+            log_id = cursor.lastrowid
+        else:
+            cursor.execute("""
+                INSERT INTO maintenance_logs
+                (vehicle_id, service_type, cost, service_date)
+                VALUES (%s,%s,%s,CURDATE())
+            """, (vehicle_id, service_type, cost))
+            log_id = cursor.lastrowid
+
+            cursor.execute("""
+                UPDATE vehicles
+                SET status='in_shop'
+                WHERE id=%s
+            """, (vehicle_id,))
+
+        cost_column = "misc_cost" if service_type == ledger.MISC_SERVICE_TYPE else "maintenance_cost"
+        ledger.add(cursor, vehicle_id, **{cost_column: cost})
+        rollups.add(cursor, vehicle_id, planned_start or None, **{cost_column: cost})
+        if not planned_start:
+            counters.vehicle_status_changed(cursor, vehicle["status"], "in_shop")
+        counters.bump(cursor, maintenance_cost=cost)
 
         conn.commit()
         cursor.close()
         conn.close()
 
+        cache.invalidate("maintenance", "vehicles")
+        availability.vehicles_changed(vehicle_id)
+        schedule.vehicles_changed(vehicle_id)
+
+        vehicle_status = vehicle["status"] if planned_start else "in_shop"
+        events.publish(
+            "maintenance", "booked" if planned_start else "created", log_id,
+            vehicle_id=vehicle_id, service_type=service_type, vehicle_status=vehicle_status
+        )
+
         return jsonify({
-            "message": "Service log created",
-            "vehicle_status": "in_shop"
+            "message": "Service booked" if planned_start else "Service log created",
+            "vehicle_status": vehicle_status
         }), 201
 
     except Exception as e:
@@ -62,31 +119,36 @@ def create_service():
     
 @maintenance_bp.route("/", methods=["GET"])
 @jwt_required()
+@versions.conditional("maintenance")
+@cache.cached("maintenance")
 def get_service_logs():
+    since = request.args.get("since")
+
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        fields = projection.from_request("maintenance_logs", request.args, ("updated_at",) if since is not None else ())
+    except projection.ProjectionError as e:
+        return jsonify({"error": e.message}), 400
 
-        cursor.execute("""
-            SELECT m.id,
-                   m.vehicle_id,
-                   v.model_name AS vehicle,
-                   m.service_type,
-                   m.service_date,
-                   m.cost,
-                   m.description
-            FROM maintenance_logs m
-            JOIN vehicles v ON m.vehicle_id = v.id
-            ORDER BY m.id DESC
-        """)
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
 
-        logs = cursor.fetchall()
+        if since is not None:
+            window = sync.SyncWindow(cursor, since)
+            condition, params = window.condition("m")
+            cursor.execute(f"{fields.select()} WHERE {condition} {window.order('m')}", params)
+            body = window.respond(cursor, "maintenance_logs", cursor.column_names, cursor.fetchall(), fields.shape)
+        else:
+            cursor.execute(fields.select() + " ORDER BY m.id DESC")
+            body = fields.shape(cursor.column_names, cursor.fetchall())
 
         cursor.close()
         conn.close()
 
-        return jsonify(logs), 200
+        return jsonify(body), 200
 
+    except sync.SyncError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -102,24 +164,53 @@ def complete_service(log_id):
         conn = get_connection()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("SELECT * FROM maintenance_logs WHERE id=%s", (log_id,))
+        cursor.execute("""
+            SELECT m.vehicle_id, v.status AS vehicle_status
+            FROM maintenance_logs m
+            JOIN vehicles v ON m.vehicle_id = v.id
+            WHERE m.id=%s
+            FOR UPDATE
+        """, (log_id,))
         log = cursor.fetchone()
 
         if not log:
             return jsonify({"error": "Service log not found"}), 404
 
-        # Set vehicle back to available
+        # Set vehicle back to available, unless something else moved it on
         cursor.execute("""
             UPDATE vehicles
             SET status='available'
-            WHERE id=%s
+            WHERE id=%s AND status='in_shop'
         """, (log["vehicle_id"],))
+        released = cursor.rowcount == 1
+        if released:
+            counters.vehicle_status_changed(cursor, "in_shop", "available")
+
+        # A booked service finished early frees the rest of its window.
+        cursor.execute("""
+            UPDATE maintenance_logs
+            SET planned_end=NOW()
+            WHERE id=%s AND planned_start <= NOW() AND planned_end > NOW()
+        """, (log_id,))
+        shortened = cursor.rowcount == 1
 
         conn.commit()
         cursor.close()
         conn.close()
 
-        return jsonify({"message": "Service completed, vehicle available"}), 200
+        if not released and not shortened:
+            return jsonify({"error": f"Vehicle is not in the shop (status: {log['vehicle_status']})"}), 409
+
+        if released:
+            cache.invalidate("vehicles")
+            availability.vehicles_changed(log["vehicle_id"])
+        if shortened:
+            cache.invalidate("maintenance")
+            schedule.vehicles_changed(log["vehicle_id"])
+        vehicle_status = "available" if released else log["vehicle_status"]
+        events.publish("maintenance", "completed", log_id, vehicle_id=log["vehicle_id"], vehicle_status=vehicle_status)
+
+        return jsonify({"message": "Service completed", "vehicle_status": vehicle_status}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
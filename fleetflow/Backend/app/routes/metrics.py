@@ -0,0 +1,36 @@
+import hmac
+
+from flask import Blueprint, Response, request, jsonify, current_app
+from app.db import get_pool
+from app.cache import cache
+from app.metrics import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+POOL_COUNTERS = ["checkouts", "waits", "timeouts", "leaks", "connects", "deadlock_retries"]
+POOL_GAUGES = ["open", "idle", "in_use"]
+CACHE_COUNTERS = ["hits", "misses", "stores", "invalidations", "evictions"]
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus scrape endpoint; guarded by METRICS_TOKEN when one is set."""
+    token = current_app.config["METRICS_TOKEN"]
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+    pool = get_pool().stats()
+    cache_stats = cache.stats()
+
+    extra = [
+        (f"fleetflow_db_pool_{name}_total", f"Connection pool {name}.", "counter", pool[name])
+        for name in POOL_COUNTERS
+    ] + [
+        (f"fleetflow_db_pool_{name}", f"Connections {name}.", "gauge", pool[name])
+        for name in POOL_GAUGES
+    ] + [
+        (f"fleetflow_cache_{name}_total", f"Response cache {name}.", "counter", cache_stats[name])
+        for name in CACHE_COUNTERS
+    ]
+
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
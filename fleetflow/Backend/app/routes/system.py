@@ -0,0 +1,52 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt
+from app.db import get_pool
+from app.cache import cache
+from app.compression import compressor
+from app.events import events
+from app.versions import versions
+from app.availability import availability
+from app.schedule import schedule
+from app.profiler import profiler
+
+system_bp = Blueprint("system", __name__, url_prefix="/system")
+
+
+@system_bp.route("/stats", methods=["GET"])
+@jwt_required()
+def runtime_stats():
+    """Connection pool, response cache and in-memory index stats for this process"""
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "admin"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    stats = {
+        "db_pool": get_pool().stats(),
+        "cache": cache.stats(),
+        "etags": versions.stats(),
+        "compression": compressor.stats(),
+        "events": events.stats(),
+        "availability": availability.stats(),
+        "schedule": schedule.stats()
+    }
+    engine = current_app.extensions.get("analytics_engine")
+    if engine:
+        stats["analytics_engine"] = engine.stats()
+
+    return jsonify(stats), 200
+
+
+@system_bp.route("/sql", methods=["GET"])
+@jwt_required()
+def sql_stats():
+    """Per-statement totals and the slow-query log from the SQL profiler"""
+    claims = get_jwt()
+
+    if claims["role"] not in ["manager", "admin"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    if not profiler.enabled:
+        return jsonify({"error": "SQL profiling is disabled (SQL_PROFILE=0)"}), 404
+
+    return jsonify(profiler.stats(top=request.args.get("top", 20, type=int))), 200
@@ -1,10 +1,39 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
-from app.db import get_connection
-from datetime import datetime
+from app.db import get_connection, run_in_transaction
+from app import projection, sync
+from app.cache import cache
+from app.events import events
+from app.availability import availability
+from app.schedule import schedule, parse_datetime
+from app.planning import plan_loads
+from app.dispatch import (
+    DispatchError, dispatch_trip, dispatch_batch, schedule_trip, start_scheduled_trip, finish_trip, remove_trip
+)
+from datetime import datetime, timedelta
+import math
 
 trip_bp = Blueprint("trip", __name__, url_prefix="/trips")
 
+TRIP_STATUSES = {"draft", "scheduled", "dispatched", "completed", "cancelled"}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+MAX_PLAN_SHIPMENTS = 20000
+
+
+def _dispatch_until():
+    """End of the window an immediate dispatch must find free of bookings."""
+    return datetime.now() + timedelta(minutes=current_app.config["DISPATCH_BOOKING_GUARD"])
+
+
+def _in_cursor(conn, operation, *args):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        return operation(cursor, *args)
+    finally:
+        cursor.close()
+
 
 @trip_bp.route("/", methods=["POST"])
 @jwt_required()
@@ -27,75 +56,317 @@ def create_trip():
         return jsonify({"error": "Missing required fields"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        trip_id = run_in_transaction(
+            _in_cursor, dispatch_trip,
+            vehicle_id, driver_id, cargo_weight, origin, destination, estimated_fuel_cost,
+            _dispatch_until()
+        )
+
+        cache.invalidate("vehicles", "drivers")
+        availability.vehicles_changed(vehicle_id)
+        availability.drivers_changed(driver_id)
+        events.publish("trips", "created", trip_id, status="dispatched", vehicle_id=vehicle_id, driver_id=driver_id)
+
+        return jsonify({
+            "message": "Trip dispatched successfully",
+            "trip_id": trip_id
+        }), 201
+
+    except DispatchError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@trip_bp.route("/batch", methods=["POST"])
+@jwt_required()
+def create_trips_batch():
+    """Dispatch many trips in one transaction.
+
+    Body: {"trips": [...], "mode": "atomic" | "partial"}. In atomic mode
+    (the default) a single rejected trip means none are dispatched.
+    """
+    claims = get_jwt()
+
+    if claims["role"] not in ["dispatcher", "manager"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    data = request.get_json(silent=True) or {}
+    items = data.get("trips")
+    mode = data.get("mode", "atomic")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "trips must be a non-empty list"}), 400
+
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} trips per batch"}), 413
+
+    if mode not in ["atomic", "partial"]:
+        return jsonify({"error": "Invalid mode. Must be atomic or partial"}), 400
+
+    try:
+        results = run_in_transaction(
+            _in_cursor, dispatch_batch, items, mode == "partial", _dispatch_until()
+        )
+
+        dispatched = [items[result["index"]] for result in results if result["status"] == "dispatched"]
+        if dispatched:
+            cache.invalidate("vehicles", "drivers")
+            availability.vehicles_changed(*(item["vehicle_id"] for item in dispatched))
+            availability.drivers_changed(*(item["driver_id"] for item in dispatched))
+            for result in results:
+                if result["status"] == "dispatched":
+                    item = items[result["index"]]
+                    events.publish(
+                        "trips", "created", result["trip_id"], status="dispatched",
+                        vehicle_id=item["vehicle_id"], driver_id=item["driver_id"]
+                    )
+
+        return jsonify({
+            "mode": mode,
+            "dispatched": len(dispatched),
+            "rejected": len(results) - len(dispatched),
+            "results": results
+        }), 201 if dispatched else 400
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@trip_bp.route("/auto-assign", methods=["POST"])
+@jwt_required()
+def auto_assign():
+    """Suggest the smallest available vehicle that fits the load, with a licensed driver."""
+    claims = get_jwt()
+
+    if claims["role"] not in ["dispatcher", "manager"]:
+        return jsonify({"error": "Unauthorized"}), 403
 
-        cursor.execute(
-            "SELECT id, max_capacity_kg, status, odometer_reading FROM vehicles WHERE id=%s",
-            (vehicle_id,)
+    data = request.get_json()
+
+    cargo_weight = data.get("cargo_weight")
+    origin = data.get("origin")
+
+    if not cargo_weight or not origin:
+        return jsonify({"error": "Missing required fields"}), 400
+
+    if (not isinstance(cargo_weight, (int, float)) or isinstance(cargo_weight, bool)
+            or not math.isfinite(cargo_weight) or cargo_weight <= 0):
+        return jsonify({"error": "cargo_weight must be a positive number"}), 400
+
+    try:
+        match = availability.find(cargo_weight)
+
+        if not match:
+            return jsonify({"error": "No available vehicle and driver for this load"}), 404
+
+        vehicle, driver = match
+
+        return jsonify({
+            "origin": origin,
+            "cargo_weight": cargo_weight,
+            "vehicle": vehicle,
+            "driver": driver
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _validate_shipment(shipment):
+    if not isinstance(shipment, dict):
+        return "Shipment must be an object"
+    if not all([shipment.get("weight"), shipment.get("origin"), shipment.get("destination")]):
+        return "Missing required fields"
+    weight = shipment["weight"]
+    if not isinstance(weight, int) or isinstance(weight, bool) or weight <= 0:
+        return "weight must be a positive integer"
+    return None
+
+
+@trip_bp.route("/plan", methods=["POST"])
+@jwt_required()
+def plan_trips():
+    """Consolidate shipments onto the fewest available vehicles.
+
+    Body: {"shipments": [{"weight", "origin", "destination"}, ...]}. Nothing
+    is written; the returned trips can be posted to /trips/batch as-is.
+    """
+    claims = get_jwt()
+
+    if claims["role"] not in ["dispatcher", "manager"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    data = request.get_json(silent=True) or {}
+    shipments = data.get("shipments")
+
+    if not isinstance(shipments, list) or not shipments:
+        return jsonify({"error": "shipments must be a non-empty list"}), 400
+
+    if len(shipments) > MAX_PLAN_SHIPMENTS:
+        return jsonify({"error": f"At most {MAX_PLAN_SHIPMENTS} shipments per plan"}), 413
+
+    invalid = []
+    for index, shipment in enumerate(shipments):
+        error = _validate_shipment(shipment)
+        if error:
+            invalid.append({"index": index, "error": error})
+
+    if invalid:
+        return jsonify({"error": "Invalid shipments", "invalid": invalid}), 400
+
+    try:
+        vehicles, drivers = availability.snapshot()
+
+        planned, unassigned = plan_loads(
+            shipments,
+            [(vehicle["max_capacity_kg"], vehicle_id) for vehicle_id, vehicle in vehicles.items()]
         )
-        vehicle = cursor.fetchone()
 
-        if not vehicle:
-            return jsonify({"error": "Vehicle not found"}), 404
+        # Best drivers are listed first; reverse so each pick is a pop().
+        free_drivers = {category: rows[::-1] for category, rows in drivers.items()}
+
+        trips = []
+        unstaffed = 0
+        for trip in planned:
+            candidates = free_drivers.get(vehicles[trip["vehicle_id"]]["required_license_category"])
+            driver_id = candidates.pop()["id"] if candidates else None
+            if driver_id is None:
+                unstaffed += 1
+
+            trips.append({
+                "vehicle_id": trip["vehicle_id"],
+                "driver_id": driver_id,
+                "cargo_weight": trip["cargo_weight"],
+                "origin": trip["origin"],
+                "destination": trip["destination"],
+                "shipments": trip["shipments"]
+            })
+
+        return jsonify({
+            "trips": trips,
+            "unassigned": unassigned,
+            "vehicles_used": len(trips),
+            "unstaffed": unstaffed
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
-        if vehicle["status"] != "available":
-            return jsonify({"error": f"Vehicle not available (status: {vehicle['status']})"}), 400
+@trip_bp.route("/schedule", methods=["POST"])
+@jwt_required()
+def create_scheduled_trip():
+    """Book a vehicle and driver for a future window without dispatching yet."""
+    claims = get_jwt()
+
+    if claims["role"] not in ["dispatcher", "manager"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    data = request.get_json()
+
+    vehicle_id = data.get("vehicle_id")
+    driver_id = data.get("driver_id")
+    cargo_weight = data.get("cargo_weight")
+    origin = data.get("origin")
+    destination = data.get("destination")
+
+    if not all([vehicle_id, driver_id, cargo_weight, origin, destination,
+                data.get("planned_start"), data.get("planned_end")]):
+        return jsonify({"error": "Missing required fields"}), 400
+
+    try:
+        planned_start = parse_datetime(data.get("planned_start"))
+        planned_end = parse_datetime(data.get("planned_end"))
+    except ValueError:
+        return jsonify({"error": "planned_start and planned_end must be ISO 8601 datetimes"}), 400
 
-        if cargo_weight > vehicle["max_capacity_kg"]:
+    if planned_end <= planned_start:
+        return jsonify({"error": "planned_end must be after planned_start"}), 400
+
+    if planned_start < datetime.now():
+        return jsonify({"error": "Cannot schedule a trip in the past"}), 400
+
+    try:
+        conflict = schedule.conflict(vehicle_id, driver_id, planned_start, planned_end)
+        if conflict:
+            owner, (start, end, kind, booking_id) = conflict
             return jsonify({
-                "error": f"Cargo weight ({cargo_weight}kg) exceeds vehicle capacity ({vehicle['max_capacity_kg']}kg)"
-            }), 400
+                "error": f"{owner.capitalize()} already booked from {start} to {end} ({kind} {booking_id})"
+            }), 409
 
-        cursor.execute(
-            "SELECT id, status, license_expiry_date FROM drivers WHERE id=%s",
-            (driver_id,)
+        trip_id = run_in_transaction(
+            _in_cursor, schedule_trip,
+            vehicle_id, driver_id, cargo_weight, origin, destination, planned_start, planned_end
         )
-        driver = cursor.fetchone()
-
-        if not driver:
-            return jsonify({"error": "Driver not found"}), 404
-
-        if driver["status"] != "on_duty":
-            return jsonify({"error": f"Driver not available (status: {driver['status']})"}), 400
-
-        if driver["license_expiry_date"] < datetime.today().date():
-            return jsonify({"error": "Driver license expired"}), 400
-
-        cursor.execute("""
-            INSERT INTO trips
-            (vehicle_id, driver_id, cargo_weight, origin, destination, start_odometer, status)
-            VALUES (%s,%s,%s,%s,%s,%s,'dispatched')
-        """, (
-            vehicle_id,
-            driver_id,
-            cargo_weight,
-            origin,
-            destination,
-            vehicle["odometer_reading"]
-        ))
-
-        trip_id = cursor.lastrowid
-
-        cursor.execute("UPDATE drivers SET status='on_trip' WHERE id=%s", (driver_id,))
-        cursor.execute("UPDATE vehicles SET status='on_trip' WHERE id=%s", (vehicle_id,))
-
-        if estimated_fuel_cost > 0:
-            estimated_liters = estimated_fuel_cost / 100
-            cursor.execute("""
-                INSERT INTO fuel_logs (vehicle_id, trip_id, liters, cost, fuel_date)
-                VALUES (%s,%s,%s,%s,CURDATE())
-            """, (vehicle_id, trip_id, estimated_liters, estimated_fuel_cost))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+
+        cache.invalidate("drivers")
+        schedule.vehicles_changed(vehicle_id)
+        schedule.drivers_changed(driver_id)
+        events.publish("trips", "created", trip_id, status="scheduled", vehicle_id=vehicle_id, driver_id=driver_id)
 
         return jsonify({
-            "message": "Trip dispatched successfully",
+            "message": "Trip scheduled successfully",
             "trip_id": trip_id
         }), 201
 
+    except DispatchError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@trip_bp.route("/schedule", methods=["GET"])
+@jwt_required()
+def get_schedule():
+    """Booked windows for one vehicle or driver between ?from and ?to."""
+    vehicle_id = request.args.get("vehicle_id", type=int)
+    driver_id = request.args.get("driver_id", type=int)
+
+    if bool(vehicle_id) == bool(driver_id):
+        return jsonify({"error": "Pass exactly one of vehicle_id or driver_id"}), 400
+
+    try:
+        start = parse_datetime(request.args.get("from")) or datetime.now()
+        end = parse_datetime(request.args.get("to")) or datetime.max
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO 8601 datetimes"}), 400
+
+    try:
+        windows = schedule.windows(start, end, vehicle_id=vehicle_id, driver_id=driver_id)
+
+        return jsonify([
+            {"kind": kind, "id": booking_id, "planned_start": window_start, "planned_end": window_end}
+            for window_start, window_end, kind, booking_id in windows
+        ]), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@trip_bp.route("/<int:trip_id>/dispatch", methods=["POST"])
+@jwt_required()
+def dispatch_scheduled_trip(trip_id):
+    claims = get_jwt()
+
+    if claims["role"] not in ["dispatcher", "manager"]:
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        trip = run_in_transaction(_in_cursor, start_scheduled_trip, trip_id)
+
+        cache.invalidate("vehicles", "drivers")
+        availability.vehicles_changed(trip["vehicle_id"])
+        availability.drivers_changed(trip["driver_id"])
+        events.publish(
+            "trips", "updated", trip_id, status="dispatched", previous_status=trip["status"],
+            vehicle_id=trip["vehicle_id"], driver_id=trip["driver_id"]
+        )
+
+        return jsonify({"message": "Trip dispatched successfully", "trip_id": trip_id}), 200
+
+    except DispatchError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -103,42 +374,98 @@ def create_trip():
 @trip_bp.route("/", methods=["GET"])
 @jwt_required()
 def get_trips():
-    status = request.args.get("status")
+    """Newest-first page of trips. Pass the returned next_cursor as ?after= for the next page.
+
+    With ?since=<token> returns the trips changed after the token instead
+    (see app/sync.py); the vehicle, driver and created_at filters still apply.
+    ?fields= and ?format=columns shape the rows (see app/projection.py).
+    """
+    since = request.args.get("since")
+
+    try:
+        after = request.args.get("after", type=int)
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        vehicle_id = request.args.get("vehicle_id", type=int)
+        driver_id = request.args.get("driver_id", type=int)
+        status = request.args.get("status")
+        created_from = parse_datetime(request.args.get("created_from"))
+        created_to = parse_datetime(request.args.get("created_to"))
+    except ValueError:
+        return jsonify({"error": "Invalid filter value"}), 400
+
+    if status and status not in TRIP_STATUSES:
+        return jsonify({"error": "Invalid status"}), 400
+
+    if since is not None and (status or after is not None):
+        # Trips change status, so a status filter would hide the change.
+        return jsonify({"error": "status and after cannot be combined with since"}), 400
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    conditions = []
+    params = []
+
+    if after is not None:
+        conditions.append("t.id < %s")
+        params.append(after)
+    if status:
+        conditions.append("t.status = %s")
+        params.append(status)
+    if vehicle_id is not None:
+        conditions.append("t.vehicle_id = %s")
+        params.append(vehicle_id)
+    if driver_id is not None:
+        conditions.append("t.driver_id = %s")
+        params.append(driver_id)
+    if created_from:
+        conditions.append("t.created_at >= %s")
+        params.append(created_from)
+    if created_to:
+        conditions.append("t.created_at < %s")
+        params.append(created_to)
+
+    try:
+        fields = projection.from_request("trips", request.args, ("updated_at",) if since is not None else ())
+    except projection.ProjectionError as e:
+        return jsonify({"error": e.message}), 400
+
+    query = fields.select()
 
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-            SELECT 
-                t.id, t.cargo_weight, t.origin, t.destination, t.status,
-                t.created_at, t.completed_at,
-                v.vehicle_type, v.model_name, v.license_plate,
-                d.name as driver_name
-            FROM trips t
-            JOIN vehicles v ON t.vehicle_id = v.id
-            JOIN drivers d ON t.driver_id = d.id
-        """
-
-        if status:
-            query += " WHERE t.status=%s"
-            cursor.execute(query, (status,))
+        cursor = conn.cursor()
+
+        if since is not None:
+            window = sync.SyncWindow(cursor, since)
+            condition, sync_params = window.condition("t")
+            conditions.append(condition)
+            params.extend(sync_params)
+            query += " WHERE " + " AND ".join(conditions) + " " + window.order("t")
         else:
-            cursor.execute(query)
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += " ORDER BY t.id DESC LIMIT %s"
+            params.append(limit + 1)
 
+        cursor.execute(query, tuple(params))
         trips = cursor.fetchall()
 
-        for trip in trips:
-            if trip.get("created_at"):
-                trip["created_at"] = trip["created_at"].isoformat()
-            if trip.get("completed_at"):
-                trip["completed_at"] = trip["completed_at"].isoformat()
+        if since is not None:
+            body = window.respond(cursor, "trips", cursor.column_names, trips, fields.shape)
+        else:
+            next_cursor = None
+            if len(trips) > limit:
+                trips = trips[:limit]
+                next_cursor = trips[-1][0]  # id always comes first
+            body = {"trips": fields.shape(cursor.column_names, trips), "next_cursor": next_cursor}
 
         cursor.close()
         conn.close()
 
-        return jsonify(trips), 200
+        return jsonify(body), 200
 
+    except sync.SyncError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -158,37 +485,22 @@ def update_trip(trip_id):
         return jsonify({"error": "Invalid status"}), 400
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("SELECT vehicle_id, driver_id FROM trips WHERE id=%s", (trip_id,))
-        trip = cursor.fetchone()
-
-        if not trip:
-            return jsonify({"error": "Trip not found"}), 404
-
-        if new_status == "completed":
-            cursor.execute("""
-                UPDATE trips 
-                SET status='completed', completed_at=NOW()
-                WHERE id=%s
-            """, (trip_id,))
-        else:
-            cursor.execute("""
-                UPDATE trips 
-                SET status='cancelled'
-                WHERE id=%s
-            """, (trip_id,))
-
-        cursor.execute("UPDATE drivers SET status='on_duty' WHERE id=%s", (trip["driver_id"],))
-        cursor.execute("UPDATE vehicles SET status='available' WHERE id=%s", (trip["vehicle_id"],))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        trip = run_in_transaction(_in_cursor, finish_trip, trip_id, new_status)
+
+        cache.invalidate("vehicles", "drivers")
+        availability.vehicles_changed(trip["vehicle_id"])
+        availability.drivers_changed(trip["driver_id"])
+        schedule.vehicles_changed(trip["vehicle_id"])
+        schedule.drivers_changed(trip["driver_id"])
+        events.publish(
+            "trips", "updated", trip_id, status=new_status, previous_status=trip["status"],
+            vehicle_id=trip["vehicle_id"], driver_id=trip["driver_id"]
+        )
 
         return jsonify({"message": "Trip updated successfully"}), 200
 
+    except DispatchError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -202,24 +514,21 @@ def delete_trip(trip_id):
         return jsonify({"error": "Unauthorized"}), 403
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("SELECT vehicle_id, driver_id FROM trips WHERE id=%s", (trip_id,))
-        trip = cursor.fetchone()
-
-        if not trip:
-            return jsonify({"error": "Trip not found"}), 404
-
-        cursor.execute("DELETE FROM trips WHERE id=%s", (trip_id,))
-        cursor.execute("UPDATE drivers SET status='on_duty' WHERE id=%s", (trip["driver_id"],))
-        cursor.execute("UPDATE vehicles SET status='available' WHERE id=%s", (trip["vehicle_id"],))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        trip = run_in_transaction(_in_cursor, remove_trip, trip_id)
+
+        cache.invalidate("vehicles", "drivers")
+        availability.vehicles_changed(trip["vehicle_id"])
+        availability.drivers_changed(trip["driver_id"])
+        schedule.vehicles_changed(trip["vehicle_id"])
+        schedule.drivers_changed(trip["driver_id"])
+        events.publish(
+            "trips", "deleted", trip_id, previous_status=trip["status"],
+            vehicle_id=trip["vehicle_id"], driver_id=trip["driver_id"]
+        )
 
         return jsonify({"message": "Trip deleted successfully"}), 200
 
+    except DispatchError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
@@ -1,10 +1,26 @@
+import csv
+import io
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
+from mysql.connector.errors import IntegrityError
 from app.db import get_connection
+from app import counters, projection, sync
+from app.cache import cache
+from app.versions import versions
+from app.availability import availability
 
 vehicle_bp = Blueprint("vehicle", __name__, url_prefix="/vehicles")
 
+VEHICLE_TYPES = {"truck", "van", "bike"}
+BULK_MAX_ROWS = 10000
+BULK_CHUNK_SIZE = 500
 
+INSERT_VEHICLE = """
+    INSERT INTO vehicles
+    (model_name, license_plate, vehicle_type, required_license_category,
+     max_capacity_kg, odometer_reading, acquisition_cost)
+    VALUES (%s,%s,%s,%s,%s,%s,%s)
+"""
 
 
 @vehicle_bp.route("/", methods=["POST"])
@@ -12,7 +28,6 @@ vehicle_bp = Blueprint("vehicle", __name__, url_prefix="/vehicles")
 def add_vehicle():
     claims = get_jwt()
 
-
     if claims["role"] != "manager":
         return jsonify({"error": "Unauthorized"}), 403
 
@@ -33,50 +48,231 @@ def add_vehicle():
         conn = get_connection()
         cursor = conn.cursor()
 
-    
         cursor.execute("SELECT id FROM vehicles WHERE license_plate=%s", (license_plate,))
         if cursor.fetchone():
             return jsonify({"error": "Vehicle already exists"}), 409
 
-        cursor.execute("""
-            INSERT INTO vehicles 
-            (model_name, license_plate, vehicle_type, required_license_category,
-             max_capacity_kg, odometer_reading, acquisition_cost)
-            VALUES (%s,%s,%s,%s,%s,%s,%s)
-        """, (model, license_plate, vehicle_type, required_license,
-              max_capacity, odometer, acquisition_cost))
+        cursor.execute(INSERT_VEHICLE, (model, license_plate, vehicle_type, required_license,
+                                        max_capacity, odometer, acquisition_cost))
+        vehicle_id = cursor.lastrowid
+        counters.bump(cursor, total_vehicles=1)
 
         conn.commit()
         cursor.close()
         conn.close()
 
+        cache.invalidate("vehicles")
+        availability.vehicles_changed(vehicle_id)
+
         return jsonify({"message": "Vehicle added successfully"}), 201
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _parse_bulk_rows():
+    """Rows from a JSON array, a text/csv body or an uploaded CSV file."""
+    upload = request.files.get("file")
+    if upload:
+        return list(csv.DictReader(io.StringIO(upload.read().decode("utf-8-sig"))))
+    if request.mimetype == "text/csv":
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
 
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("vehicles")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of vehicles or a CSV file")
+    return data
 
-@vehicle_bp.route("/", methods=["GET"])
+
+def _validate_vehicle(row):
+    """Return (values, None) ready for INSERT_VEHICLE, or (None, error)."""
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+
+    model = str(row.get("model_name") or "").strip()
+    license_plate = str(row.get("license_plate") or "").strip()
+    vehicle_type = str(row.get("vehicle_type") or "").strip()
+    required_license = str(row.get("required_license_category") or "").strip()
+
+    if not all([model, license_plate, vehicle_type, required_license, row.get("max_capacity_kg")]):
+        return None, "Missing required fields"
+
+    if len(model) > 100 or len(license_plate) > 50 or len(required_license) > 50:
+        return None, "Field too long"
+
+    if vehicle_type not in VEHICLE_TYPES:
+        return None, f"Invalid vehicle_type: {vehicle_type}"
+
+    try:
+        max_capacity = int(row["max_capacity_kg"])
+        odometer = int(row.get("odometer_reading") or 0)
+        acquisition_cost = float(row.get("acquisition_cost") or 0)
+    except (TypeError, ValueError):
+        return None, "max_capacity_kg, odometer_reading and acquisition_cost must be numbers"
+
+    if max_capacity <= 0 or odometer < 0 or acquisition_cost < 0:
+        return None, "Capacity must be positive; odometer and cost cannot be negative"
+
+    return (model, license_plate, vehicle_type, required_license,
+            max_capacity, odometer, acquisition_cost), None
+
+
+@vehicle_bp.route("/bulk", methods=["POST"])
 @jwt_required()
-def get_vehicles():
+def bulk_add_vehicles():
+    """Import many vehicles at once; returns a per-row report."""
+    claims = get_jwt()
+
+    if claims["role"] != "manager":
+        return jsonify({"error": "Unauthorized"}), 403
+
+    try:
+        rows = _parse_bulk_rows()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not rows:
+        return jsonify({"error": "No vehicles provided"}), 400
+
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({"error": f"At most {BULK_MAX_ROWS} vehicles per request"}), 413
+
+    # Validate everything in one pass, including duplicates inside the payload
+    report = []
+    pending = []
+    seen = set()
+
+    for index, row in enumerate(rows):
+        values, error = _validate_vehicle(row)
+        plate = values[1] if values else (row.get("license_plate") if isinstance(row, dict) else None)
+        entry = {"row": index, "license_plate": plate}
+
+        if error:
+            entry.update(status="invalid", error=error)
+        elif plate in seen:
+            entry.update(status="duplicate", error="License plate repeated in upload")
+        else:
+            seen.add(plate)
+            pending.append((entry, values))
+        report.append(entry)
+
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor()
 
-        cursor.execute("SELECT * FROM vehicles")
-        vehicles = cursor.fetchall()
+        if pending:
+            plates = [values[1] for _, values in pending]
+            cursor.execute(
+                f"SELECT license_plate FROM vehicles WHERE license_plate IN ({', '.join(['%s'] * len(plates))})",
+                tuple(plates)
+            )
+            existing = {plate for (plate,) in cursor.fetchall()}
+
+            to_insert = []
+            for entry, values in pending:
+                if values[1] in existing:
+                    entry.update(status="duplicate", error="Vehicle already exists")
+                else:
+                    to_insert.append((entry, values))
+
+            for start in range(0, len(to_insert), BULK_CHUNK_SIZE):
+                try:
+                    _insert_chunk(conn, cursor, to_insert[start:start + BULK_CHUNK_SIZE])
+                except Exception as e:
+                    # Earlier chunks are committed; report them and stop here.
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                    for entry, _ in to_insert[start:]:
+                        if "status" not in entry:
+                            entry.update(status="failed", error=str(e))
+                    break
 
         cursor.close()
         conn.close()
 
-        return jsonify(vehicles), 200
+        created = sum(1 for entry in report if entry["status"] == "created")
+        failed = sum(1 for entry in report if entry["status"] == "failed")
+        if created:
+            cache.invalidate("vehicles")
+            availability.invalidate_all()
+
+        return jsonify({
+            "created": created,
+            "duplicates": sum(1 for entry in report if entry["status"] == "duplicate"),
+            "invalid": sum(1 for entry in report if entry["status"] == "invalid"),
+            "failed": failed,
+            "results": report
+        }), 201 if created else (500 if failed else 200)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _insert_chunk(conn, cursor, chunk):
+    """Insert one chunk in its own transaction.
+
+    If a concurrent insert claimed one of the plates, the chunk is retried row
+    by row so only the conflicting rows are reported.
+    """
+    try:
+        cursor.executemany(INSERT_VEHICLE, [values for _, values in chunk])
+        counters.bump(cursor, total_vehicles=len(chunk))
+        conn.commit()
+        for entry, _ in chunk:
+            entry["status"] = "created"
+        return
+    except IntegrityError:
+        conn.rollback()
+
+    for entry, values in chunk:
+        try:
+            cursor.execute(INSERT_VEHICLE, values)
+            counters.bump(cursor, total_vehicles=1)
+            conn.commit()
+            entry["status"] = "created"
+        except IntegrityError as e:
+            conn.rollback()
+            entry.update(status="duplicate", error=str(e))
+
+
+@vehicle_bp.route("/", methods=["GET"])
+@jwt_required()
+@versions.conditional("vehicles")
+@cache.cached("vehicles")
+def get_vehicles():
+    since = request.args.get("since")
+
+    try:
+        fields = projection.from_request("vehicles", request.args, ("updated_at",) if since is not None else ())
+    except projection.ProjectionError as e:
+        return jsonify({"error": e.message}), 400
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        if since is None:
+            cursor.execute(fields.select())
+            body = fields.shape(cursor.column_names, cursor.fetchall())
+        else:
+            window = sync.SyncWindow(cursor, since)
+            condition, params = window.condition("v")
+            cursor.execute(f"{fields.select()} WHERE {condition} {window.order('v')}", params)
+            body = window.respond(cursor, "vehicles", cursor.column_names, cursor.fetchall(), fields.shape)
+
+        cursor.close()
+        conn.close()
+
+        return jsonify(body), 200
+
+    except sync.SyncError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 @vehicle_bp.route("/<int:vehicle_id>", methods=["PUT"])
@@ -112,6 +308,9 @@ def update_vehicle(vehicle_id):
         cursor.close()
         conn.close()
 
+        cache.invalidate("vehicles", "maintenance")
+        availability.vehicles_changed(vehicle_id)
+
         return jsonify({"message": "Vehicle updated successfully"}), 200
 
     except Exception as e:
@@ -127,14 +326,40 @@ def delete_vehicle(vehicle_id):
 
     try:
         conn = get_connection()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute("SELECT status FROM vehicles WHERE id=%s FOR UPDATE", (vehicle_id,))
+        vehicle = cursor.fetchone()
+
+        if vehicle:
+            # Fuel and maintenance logs cascade with the vehicle, so their
+            # costs leave the fleet totals too.
+            cursor.execute("""
+                SELECT
+                    (SELECT IFNULL(SUM(cost),0) FROM fuel_logs WHERE vehicle_id=%s) AS fuel,
+                    (SELECT IFNULL(SUM(cost),0) FROM maintenance_logs WHERE vehicle_id=%s) AS maintenance
+            """, (vehicle_id, vehicle_id))
+            costs = cursor.fetchone()
+
+            sync.record_deletes(cursor, "maintenance_logs", "vehicle_id=%s", (vehicle_id,))
+            sync.record_deletes(cursor, "vehicles", "id=%s", (vehicle_id,))
+            cursor.execute("DELETE FROM vehicles WHERE id=%s", (vehicle_id,))
+            counters.vehicle_status_changed(cursor, vehicle["status"], None)
+            counters.bump(
+                cursor,
+                total_vehicles=-1,
+                fuel_cost=-costs["fuel"],
+                maintenance_cost=-costs["maintenance"]
+            )
 
-        cursor.execute("DELETE FROM vehicles WHERE id=%s", (vehicle_id,))
         conn.commit()
 
         cursor.close()
         conn.close()
 
+        cache.invalidate("vehicles", "maintenance")
+        availability.vehicles_changed(vehicle_id)
+
         return jsonify({"message": "Vehicle deleted"}), 200
 
     except Exception as e:
@@ -0,0 +1,276 @@
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from app.db import pooled_connection
+
+# Reservation windows for vehicles and drivers. A window is [start, end) and
+# comes from a scheduled (or promoted, still running) trip or from a booked
+# maintenance slot. Bookings never overlap, so each vehicle's and driver's
+# windows form a sorted list of disjoint intervals and an overlap check is a
+# single bisect.
+#
+# Like the availability index this is a per-process cache: write routes call
+# vehicles_changed()/drivers_changed() after commit, and the whole index is
+# reloaded every SCHEDULE_REFRESH seconds. Bookings are re-checked against
+# the database with the vehicle and driver rows locked (find_conflict), so a
+# stale index can only cause an early 409, never a double booking.
+
+VEHICLE_WINDOWS_QUERY = """
+    SELECT vehicle_id AS owner_id, planned_start, planned_end, 'trip' AS kind, id
+    FROM trips
+    WHERE status IN ('scheduled', 'dispatched') AND planned_end > NOW() {trips_filter}
+    UNION ALL
+    SELECT vehicle_id, planned_start, planned_end, 'maintenance', id
+    FROM maintenance_logs
+    WHERE planned_end > NOW() {maintenance_filter}
+"""
+
+DRIVER_WINDOWS_QUERY = """
+    SELECT driver_id AS owner_id, planned_start, planned_end, 'trip' AS kind, id
+    FROM trips
+    WHERE status IN ('scheduled', 'dispatched') AND planned_end > NOW() {trips_filter}
+"""
+
+
+def parse_datetime(value):
+    """ISO 8601 string as a naive local datetime (None for empty), like the stored windows.
+
+    Raises ValueError for anything else, including values that are not strings.
+    """
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"Not an ISO 8601 string: {value!r}")
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+class WindowIndex:
+    """Sorted, non-overlapping [start, end) windows per owner."""
+
+    def __init__(self):
+        self._starts = {}
+        self._windows = {}
+
+    def replace(self, owner_id, windows):
+        windows = sorted(windows)
+        if windows:
+            self._windows[owner_id] = windows
+            self._starts[owner_id] = [window[0] for window in windows]
+        else:
+            self._windows.pop(owner_id, None)
+            self._starts.pop(owner_id, None)
+
+    def conflict(self, owner_id, start, end):
+        """Return the window overlapping [start, end), or None."""
+        starts = self._starts.get(owner_id)
+        if not starts:
+            return None
+        # Windows are disjoint, so the last one starting before `end` also
+        # ends last among them; only it can reach past `start`.
+        index = bisect_left(starts, end)
+        if index and self._windows[owner_id][index - 1][1] > start:
+            return self._windows[owner_id][index - 1]
+        return None
+
+    def overlapping(self, owner_id, start, end):
+        starts = self._starts.get(owner_id, [])
+        index = bisect_left(starts, end)
+        found = []
+        while index and self._windows[owner_id][index - 1][1] > start:
+            index -= 1
+            found.append(self._windows[owner_id][index])
+        return found[::-1]
+
+    def __len__(self):
+        return sum(len(windows) for windows in self._windows.values())
+
+
+def _load_vehicle_windows(cursor, vehicle_ids=None):
+    if vehicle_ids is None:
+        cursor.execute(VEHICLE_WINDOWS_QUERY.format(trips_filter="", maintenance_filter=""))
+    else:
+        vehicle_filter = f"AND vehicle_id IN ({', '.join(['%s'] * len(vehicle_ids))})"
+        cursor.execute(
+            VEHICLE_WINDOWS_QUERY.format(trips_filter=vehicle_filter, maintenance_filter=vehicle_filter),
+            tuple(vehicle_ids) * 2
+        )
+    return cursor.fetchall()
+
+
+def _load_driver_windows(cursor, driver_ids=None):
+    if driver_ids is None:
+        cursor.execute(DRIVER_WINDOWS_QUERY.format(trips_filter=""))
+    else:
+        driver_filter = f"AND driver_id IN ({', '.join(['%s'] * len(driver_ids))})"
+        cursor.execute(DRIVER_WINDOWS_QUERY.format(trips_filter=driver_filter), tuple(driver_ids))
+    return cursor.fetchall()
+
+
+def _group(rows, owner_ids=()):
+    grouped = {owner_id: [] for owner_id in owner_ids}
+    for row in rows:
+        grouped.setdefault(row["owner_id"], []).append(
+            (row["planned_start"], row["planned_end"], row["kind"], row["id"])
+        )
+    return grouped
+
+
+class ScheduleIndex:
+    def __init__(self):
+        self.refresh_interval = 60
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at = None
+        self._vehicles = WindowIndex()
+        self._drivers = WindowIndex()
+        self._dirty_vehicles = set()
+        self._dirty_drivers = set()
+
+    def init_app(self, app):
+        self.refresh_interval = app.config["SCHEDULE_REFRESH"]
+
+    def vehicles_changed(self, *vehicle_ids):
+        with self._lock:
+            self._dirty_vehicles.update(vehicle_ids)
+
+    def drivers_changed(self, *driver_ids):
+        with self._lock:
+            self._dirty_drivers.update(driver_ids)
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def _needs_refresh(self):
+        return self._is_stale() or self._dirty_vehicles or self._dirty_drivers
+
+    def _ensure_fresh(self):
+        """Apply pending changes and periodic reloads; call without holding _lock.
+
+        Works like AvailabilityIndex._ensure_fresh: the queries run outside
+        _lock behind _refresh_lock and the results are swapped in under it.
+        """
+        with self._lock:
+            if not self._needs_refresh():
+                return
+            loaded = self._loaded_at is not None
+
+        if not self._refresh_lock.acquire(blocking=not loaded):
+            return
+        try:
+            with self._lock:
+                if not self._needs_refresh():
+                    return
+                stale = self._is_stale()
+                dirty_vehicles, self._dirty_vehicles = self._dirty_vehicles, set()
+                dirty_drivers, self._dirty_drivers = self._dirty_drivers, set()
+
+            try:
+                with pooled_connection() as conn:
+                    cursor = conn.cursor(dictionary=True)
+                    if stale:
+                        vehicle_rows = _load_vehicle_windows(cursor)
+                        driver_rows = _load_driver_windows(cursor)
+                    else:
+                        vehicle_rows = _load_vehicle_windows(cursor, dirty_vehicles) if dirty_vehicles else []
+                        driver_rows = _load_driver_windows(cursor, dirty_drivers) if dirty_drivers else []
+                    cursor.close()
+            except Exception:
+                with self._lock:
+                    self._dirty_vehicles |= dirty_vehicles
+                    self._dirty_drivers |= dirty_drivers
+                raise
+
+            if stale:
+                vehicles = WindowIndex()
+                for owner_id, windows in _group(vehicle_rows).items():
+                    vehicles.replace(owner_id, windows)
+                drivers = WindowIndex()
+                for owner_id, windows in _group(driver_rows).items():
+                    drivers.replace(owner_id, windows)
+                with self._lock:
+                    self._vehicles, self._drivers = vehicles, drivers
+                    self._loaded_at = time.monotonic()
+            else:
+                vehicle_windows = _group(vehicle_rows, dirty_vehicles)
+                driver_windows = _group(driver_rows, dirty_drivers)
+                with self._lock:
+                    for owner_id, windows in vehicle_windows.items():
+                        self._vehicles.replace(owner_id, windows)
+                    for owner_id, windows in driver_windows.items():
+                        self._drivers.replace(owner_id, windows)
+        finally:
+            self._refresh_lock.release()
+
+    def conflict(self, vehicle_id, driver_id, start, end):
+        """Return ("vehicle"|"driver", window) for the first booking in the way, or None."""
+        self._ensure_fresh()
+
+        with self._lock:
+            window = vehicle_id and self._vehicles.conflict(vehicle_id, start, end)
+            if window:
+                return "vehicle", window
+            window = driver_id and self._drivers.conflict(driver_id, start, end)
+            if window:
+                return "driver", window
+            return None
+
+    def windows(self, start, end, vehicle_id=None, driver_id=None):
+        self._ensure_fresh()
+
+        with self._lock:
+            if vehicle_id:
+                return self._vehicles.overlapping(vehicle_id, start, end)
+            return self._drivers.overlapping(driver_id, start, end)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "vehicle_windows": len(self._vehicles),
+                "driver_windows": len(self._drivers),
+                "age": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+            }
+
+
+def find_conflict(cursor, start, end, vehicle_id=None, driver_id=None, exclude_trip_id=None):
+    """Authoritative overlap check against the database.
+
+    Call with the vehicle and driver rows already locked FOR UPDATE so that
+    concurrent bookings of the same resources are serialized. A zero-length
+    window (start == end) finds the bookings in progress at that moment;
+    exclude_trip_id leaves a trip's own booking out.
+    """
+    trip_filter = "AND id <> %s" if exclude_trip_id else ""
+    trip_params = (exclude_trip_id,) if exclude_trip_id else ()
+
+    if vehicle_id:
+        cursor.execute(f"""
+            (SELECT 'trip' AS kind, id, planned_start, planned_end FROM trips
+             WHERE vehicle_id=%s AND status IN ('scheduled', 'dispatched')
+               AND planned_end > %s AND planned_start < %s {trip_filter} LIMIT 1)
+            UNION ALL
+            (SELECT 'maintenance', id, planned_start, planned_end FROM maintenance_logs
+             WHERE vehicle_id=%s AND planned_end > %s AND planned_start < %s LIMIT 1)
+        """, (vehicle_id, start, end, *trip_params, vehicle_id, start, end))
+        rows = cursor.fetchall()
+        if rows:
+            return "vehicle", rows[0]
+
+    if driver_id:
+        cursor.execute(f"""
+            SELECT 'trip' AS kind, id, planned_start, planned_end FROM trips
+            WHERE driver_id=%s AND status IN ('scheduled', 'dispatched')
+              AND planned_end > %s AND planned_start < %s {trip_filter} LIMIT 1
+        """, (driver_id, start, end, *trip_params))
+        row = cursor.fetchone()
+        if row:
+            return "driver", row
+
+    return None
+
+
+schedule = ScheduleIndex()
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.db import get_connection
+
+# Delta sync for the list endpoints. vehicles, drivers, trips and
+# maintenance_logs carry updated_at (TIMESTAMP(6), maintained by MySQL on
+# insert and on every update that changes the row) and delete paths leave a
+# row in sync_tombstones. A client passes ?since=<token> (0 for everything)
+# and gets {"changed": [...], "deleted": [ids], "token": ..., "has_more": ...};
+# it upserts the changed rows by id, drops the deleted ids and keeps the token.
+#
+# A token is an (updated_at, id) position. When a response is not cut off at
+# SYNC_PAGE_SIZE rows, the next token is the database time minus SYNC_GRACE
+# seconds, so rows from transactions still open at that moment are sent again
+# rather than missed; repeats are harmless to an upserting client. Tombstones
+# are pruned after SYNC_TOMBSTONE_DAYS ('flask sync prune'), so older tokens
+# get 410 and the client reloads in full.
+
+SYNC_ENTITIES = ["vehicles", "drivers", "trips", "maintenance_logs"]
+
+_TOKEN_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+class SyncError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def make_token(updated_at, row_id=0):
+    return f"{updated_at.strftime(_TOKEN_FORMAT)}.{row_id}"
+
+
+def parse_token(token):
+    """(updated_at, id) position of a token; (None, 0) for "0" (everything)."""
+    if token == "0":
+        return None, 0
+    try:
+        stamp, _, row_id = token.partition(".")
+        return datetime.strptime(stamp, _TOKEN_FORMAT), int(row_id or 0)
+    except ValueError:
+        raise SyncError("Invalid since token")
+
+
+class SyncWindow:
+    """Rows changed after a token, read in (updated_at, id) order."""
+
+    def __init__(self, cursor, token):
+        self.since, self.since_id = parse_token(token)
+        self.page_size = current_app.config["SYNC_PAGE_SIZE"]
+
+        cursor.execute("SELECT NOW(6)")
+        self.now = cursor.fetchone()[0]
+
+        retention = timedelta(days=current_app.config["SYNC_TOMBSTONE_DAYS"])
+        if self.since is not None and self.since < self.now - retention:
+            raise SyncError("since token expired; reload the full list", 410)
+
+    def condition(self, alias):
+        """SQL condition (and params) selecting rows after the token."""
+        if self.since is None:
+            return "1=1", ()
+        return (
+            f"({alias}.updated_at > %s OR ({alias}.updated_at = %s AND {alias}.id > %s))",
+            (self.since, self.since, self.since_id)
+        )
+
+    def order(self, alias):
+        return f"ORDER BY {alias}.updated_at, {alias}.id LIMIT {self.page_size + 1}"
+
+    def respond(self, cursor, entity, names, rows, shape):
+        """Response body for the changed rows (tuples with id and updated_at among `names`).
+
+        shape(names, rows) renders the rows for the response.
+        """
+        has_more = len(rows) > self.page_size
+        if has_more:
+            rows = rows[:self.page_size]
+            last = dict(zip(names, rows[-1]))
+            token = make_token(last["updated_at"], last["id"])
+        else:
+            cutoff = self.now - timedelta(seconds=current_app.config["SYNC_GRACE"])
+            if self.since is not None and self.since > cutoff:
+                token = make_token(self.since, self.since_id)
+            else:
+                token = make_token(cutoff)
+
+        deleted = []
+        if self.since is not None:
+            cursor.execute("""
+                SELECT row_id FROM sync_tombstones
+                WHERE entity=%s AND deleted_at > %s
+                ORDER BY id
+            """, (entity, self.since))
+            deleted = [row[0] for row in cursor.fetchall()]
+
+        return {"changed": shape(names, rows), "deleted": deleted, "token": token, "has_more": has_more}
+
+
+def record_deletes(cursor, entity, where, params):
+    """Leave tombstones for the rows of `entity` matching `where`; call before deleting them."""
+    cursor.execute(
+        f"INSERT INTO sync_tombstones (entity, row_id) SELECT %s, id FROM {entity} WHERE {where}",
+        (entity, *params)
+    )
+
+
+def prune(days):
+    """Delete tombstones older than `days`; returns how many were removed."""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "DELETE FROM sync_tombstones WHERE deleted_at < NOW(6) - INTERVAL %s DAY",
+        (days,)
+    )
+    removed = cursor.rowcount
+    conn.commit()
+
+    cursor.close()
+    conn.close()
+    return removed
+
+
+@click.group("sync")
+def sync_cli():
+    """Maintain delta-sync tombstones."""
+
+
+@sync_cli.command("prune")
+@click.option("--days", type=int, default=None, help="defaults to SYNC_TOMBSTONE_DAYS")
+@with_appcontext
+def prune_command(days):
+    """Delete tombstones older than the retention period."""
+    removed = prune(days if days is not None else current_app.config["SYNC_TOMBSTONE_DAYS"])
+    click.echo(f"Removed {removed} tombstones")
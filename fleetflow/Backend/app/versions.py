@@ -0,0 +1,90 @@
+import logging
+import threading
+from functools import wraps
+
+from flask import request, make_response, Response
+
+from app.db import pooled_connection
+
+logger = logging.getLogger(__name__)
+
+# Conditional GET for the list endpoints. table_versions holds one counter per
+# cache group; cache.invalidate() bumps it after every write that changes the
+# group, so a list response's ETag is just the versions it was built from.
+# A poll with a matching If-None-Match costs one primary-key read and gets a
+# bodiless 304 before the view runs.
+#
+# The counters live in the database, so every worker hands out the same tags.
+# The bump lands right after the write commits; a poll in between can still
+# get one 304 for the old version.
+
+
+class TableVersions:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters = {"not_modified": 0, "bump_errors": 0}
+
+    def init_app(self, app):
+        self.enabled = app.config["ETAGS_ENABLED"]
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def current(self, groups):
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ", ".join(["%s"] * len(groups))
+            cursor.execute(f"SELECT name, version FROM table_versions WHERE name IN ({placeholders})", groups)
+            versions = dict(cursor.fetchall())
+            cursor.close()
+        return [versions.get(group, 0) for group in groups]
+
+    def bump(self, *groups):
+        if not self.enabled or not groups:
+            return
+        try:
+            with pooled_connection() as conn:
+                cursor = conn.cursor()
+                rows = ", ".join(["(%s, 1)"] * len(groups))
+                cursor.execute(
+                    f"INSERT INTO table_versions (name, version) VALUES {rows} "
+                    "ON DUPLICATE KEY UPDATE version = version + 1",
+                    groups
+                )
+                conn.commit()
+                cursor.close()
+        except Exception:
+            # The write itself already committed; don't turn it into a 500.
+            self._count("bump_errors")
+            logger.exception("Failed to bump table versions %s", groups)
+
+    def conditional(self, *groups):
+        """Tag a view's 200 responses with the versions of `groups`; answer matching If-None-Match with 304."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                etag = "-".join(f"{group}.{version}" for group, version in zip(groups, self.current(groups)))
+                if request.if_none_match.contains_weak(etag):
+                    self._count("not_modified")
+                    response = Response(status=304)
+                    response.set_etag(etag, weak=True)
+                    return response
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    response.set_etag(etag, weak=True)
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+versions = TableVersions()
@@ -0,0 +1,89 @@
+"""Compare POST /vehicles/ one row at a time with POST /vehicles/bulk.
+
+Runs in-process against the MySQL database configured in app.config
+(DB_* environment variables) and removes the vehicles it creates.
+
+    cd Backend
+    python -m benchmarks.bulk_import --rows 2000
+"""
+import argparse
+import json
+import time
+import uuid
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.db import get_connection
+
+
+def make_vehicles(count, prefix):
+    return [
+        {
+            "model_name": f"Bench {i}",
+            "license_plate": f"{prefix}-{i:06d}",
+            "vehicle_type": ("truck", "van", "bike")[i % 3],
+            "required_license_category": "C",
+            "max_capacity_kg": 500 + i % 20000,
+            "odometer_reading": i * 10,
+            "acquisition_cost": 25000
+        }
+        for i in range(count)
+    ]
+
+
+def cleanup(app, prefix):
+    with app.app_context():
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM vehicles WHERE license_plate LIKE %s", (prefix + "-%",))
+        deleted = cursor.rowcount
+        cursor.execute("UPDATE fleet_counters SET total_vehicles = total_vehicles - %s WHERE id = 1", (deleted,))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+
+    with app.app_context():
+        token = create_access_token(identity="0", additional_claims={"role": "manager"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {"rows": args.rows}
+
+    prefix = "BPR" + uuid.uuid4().hex[:6]
+    vehicles = make_vehicles(args.rows, prefix)
+    try:
+        start = time.perf_counter()
+        for vehicle in vehicles:
+            response = client.post("/vehicles/", json=vehicle, headers=headers)
+            assert response.status_code == 201, response.get_json()
+        elapsed = time.perf_counter() - start
+        results["per_row"] = {"seconds": round(elapsed, 3), "rows_per_sec": round(args.rows / elapsed, 1)}
+    finally:
+        cleanup(app, prefix)
+
+    prefix = "BBK" + uuid.uuid4().hex[:6]
+    vehicles = make_vehicles(args.rows, prefix)
+    try:
+        start = time.perf_counter()
+        response = client.post("/vehicles/bulk", json=vehicles, headers=headers)
+        elapsed = time.perf_counter() - start
+        assert response.get_json()["created"] == args.rows, response.get_json()
+        results["bulk"] = {"seconds": round(elapsed, 3), "rows_per_sec": round(args.rows / elapsed, 1)}
+    finally:
+        cleanup(app, prefix)
+
+    results["speedup"] = round(results["per_row"]["seconds"] / results["bulk"]["seconds"], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Time the columnar analytics engine against the equivalent MySQL queries.
+
+Loads the engine from the configured database (seed it first with
+benchmarks.generate_data, e.g. --scale 10 for a million trips), times the
+initial load and an incremental refresh, then runs each analyst query
+through the engine and as hand-written SQL and reports the median of
+--repeat runs. Totals of each result are compared so a mismatch shows up.
+
+--source synthetic fills the engine from the data generator in-process
+instead, to time the kernels without a database (no SQL comparison).
+
+    cd Backend
+    python -m benchmarks.columnar_analytics --repeat 5
+    python -m benchmarks.columnar_analytics --source synthetic --scale 10
+"""
+import argparse
+import json
+import time
+from datetime import date
+
+from app.columnar import engine
+
+# name: (engine query, SQL, index of the SQL column whose total is compared,
+#        engine column compared against it)
+QUERIES = {
+    "cost_per_km_by_vehicle_type": (
+        {
+            "table": "trips",
+            "filters": [{"column": "status", "op": "=", "value": "completed"}],
+            "group_by": ["vehicle_type"],
+            "aggregates": [{"fn": "count"}, {"fn": "ratio", "numerator": "fuel_cost", "denominator": "distance"}]
+        },
+        """
+            SELECT v.vehicle_type, COUNT(*),
+                   SUM(IFNULL(f.cost, 0)) / SUM(t.end_odometer - t.start_odometer)
+            FROM trips t
+            JOIN vehicles v ON v.id = t.vehicle_id
+            LEFT JOIN (SELECT trip_id, SUM(cost) AS cost FROM fuel_logs GROUP BY trip_id) f ON f.trip_id = t.id
+            WHERE t.status = 'completed'
+            GROUP BY v.vehicle_type
+        """,
+        1, "count"
+    ),
+    "revenue_per_driver_per_month": (
+        {
+            "table": "trips",
+            "filters": [{"column": "status", "op": "=", "value": "completed"}],
+            "group_by": ["driver_id", "month(completed_at)"],
+            "aggregates": [{"fn": "sum", "column": "revenue"}],
+            "limit": 10000
+        },
+        """
+            SELECT driver_id, DATE_FORMAT(completed_at, '%Y-%m-01') AS month, SUM(revenue)
+            FROM trips
+            WHERE status = 'completed'
+            GROUP BY driver_id, month
+            ORDER BY driver_id, month
+            LIMIT 10000
+        """,
+        None, None
+    ),
+    "fuel_cost_distribution_by_vehicle_type": (
+        {
+            "table": "fuel_logs",
+            "group_by": ["vehicle_type"],
+            "aggregates": [
+                {"fn": "count"}, {"fn": "mean", "column": "cost"},
+                {"fn": "percentile", "column": "cost", "q": [50, 90, 99]}
+            ]
+        },
+        # MySQL has no percentile aggregate; a SQL route would fetch the sorted
+        # costs and pick the ranks itself, so this times that fetch.
+        """
+            SELECT v.vehicle_type, f.cost
+            FROM fuel_logs f
+            JOIN vehicles v ON v.id = f.vehicle_id
+            ORDER BY v.vehicle_type, f.cost
+        """,
+        None, None
+    ),
+    "monthly_maintenance_by_service_type": (
+        {
+            "table": "maintenance_logs",
+            "group_by": ["month(service_date)", "service_type"],
+            "aggregates": [{"fn": "sum", "column": "cost"}]
+        },
+        """
+            SELECT DATE_FORMAT(service_date, '%Y-%m-01') AS month, service_type, SUM(cost)
+            FROM maintenance_logs
+            GROUP BY month, service_type
+        """,
+        2, "sum(cost)"
+    )
+}
+
+
+def median(samples):
+    return sorted(samples)[len(samples) // 2]
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return median(samples), result
+
+
+def load_synthetic(scale, seed):
+    from benchmarks.generate_data import Fleet
+
+    fleet = Fleet(seed, scale, date.today(), {"vehicles": 0, "drivers": 0, "trips": 0})
+    engine.load_rows("vehicles", [
+        (row[0], row[3], row[4], row[7], row[5], row[6], row[8]) for row in fleet.vehicle_rows()
+    ])
+    trips = []
+    fuel = []
+    for trip, fuel_row in fleet.trip_and_fuel_rows():
+        trips.append((trip[0], trip[1], trip[2], trip[3], trip[6], trip[7], trip[8], trip[9], trip[10], trip[11]))
+        if fuel_row:
+            fuel.append((len(fuel) + 1, *fuel_row))
+    engine.load_rows("trips", trips)
+    engine.load_rows("fuel_logs", fuel)
+    engine.load_rows("maintenance_logs", [
+        (index + 1, row[0], row[1], row[3], row[4]) for index, row in enumerate(fleet.maintenance_rows())
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=["db", "synthetic"], default="db")
+    parser.add_argument("--scale", type=float, default=10, help="synthetic source only")
+    parser.add_argument("--seed", type=int, default=1, help="synthetic source only")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {"source": args.source}
+
+    if args.source == "synthetic":
+        started = time.perf_counter()
+        load_synthetic(args.scale, args.seed)
+        report["load_seconds"] = round(time.perf_counter() - started, 2)
+        conn = None
+    else:
+        from app import create_app
+        from app.db import get_connection
+
+        app = create_app()
+        context = app.app_context()
+        context.push()
+        conn = get_connection()
+
+        started = time.perf_counter()
+        engine.refresh(force=True)
+        report["load_seconds"] = round(time.perf_counter() - started, 2)
+        started = time.perf_counter()
+        engine.refresh(force=True)
+        report["incremental_refresh_seconds"] = round(time.perf_counter() - started, 3)
+
+    report["rows"] = engine.stats()["rows"]
+    results = {}
+
+    for name, (spec, sql, sql_total_index, engine_total_column) in QUERIES.items():
+        engine_seconds, result = timed(lambda: engine.query(spec), args.repeat)
+        entry = {"engine_ms": round(engine_seconds * 1000, 2), "groups": result["groups"]}
+
+        if conn is not None:
+            def run_sql():
+                cursor = conn.cursor()
+                cursor.execute(sql)
+                rows = cursor.fetchall()
+                cursor.close()
+                return rows
+
+            sql_seconds, rows = timed(run_sql, args.repeat)
+            entry["sql_ms"] = round(sql_seconds * 1000, 2)
+            entry["speedup"] = round(sql_seconds / engine_seconds, 1) if engine_seconds else None
+
+            if sql_total_index is not None:
+                column = result["columns"].index(engine_total_column)
+                engine_total = sum(row[column] or 0 for row in result["rows"])
+                sql_total = float(sum(row[sql_total_index] or 0 for row in rows))
+                entry["totals_match"] = abs(engine_total - sql_total) <= 1e-6 * max(1.0, abs(sql_total))
+
+        results[name] = entry
+
+    report["queries"] = results
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Drive many parallel dispatchers at a small fleet and check for double-bookings.
+
+Each worker repeatedly dispatches a random vehicle/driver pair and completes
+some of its trips so resources keep cycling. Afterwards (and periodically
+during the run) every vehicle and driver must have at most one dispatched
+trip and a status that agrees with it. Uses the MySQL database configured
+through the DB_* environment variables and removes everything it creates.
+
+    cd Backend
+    python -m benchmarks.dispatch_concurrency --workers 48 --seconds 20
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask_jwt_extended import create_access_token
+
+INVARIANT_QUERY = """
+    SELECT
+        (SELECT COUNT(*) FROM (
+            SELECT vehicle_id FROM trips
+            WHERE status='dispatched' AND vehicle_id IN ({vehicles})
+            GROUP BY vehicle_id HAVING COUNT(*) > 1) x) AS double_booked_vehicles,
+        (SELECT COUNT(*) FROM (
+            SELECT driver_id FROM trips
+            WHERE status='dispatched' AND driver_id IN ({drivers})
+            GROUP BY driver_id HAVING COUNT(*) > 1) y) AS double_booked_drivers,
+        (SELECT COUNT(*) FROM vehicles v
+            WHERE v.id IN ({vehicles})
+            AND (v.status='on_trip') <> EXISTS(
+                SELECT 1 FROM trips t WHERE t.vehicle_id=v.id AND t.status='dispatched')) AS vehicle_status_mismatches,
+        (SELECT COUNT(*) FROM drivers d
+            WHERE d.id IN ({drivers})
+            AND (d.status='on_trip') <> EXISTS(
+                SELECT 1 FROM trips t WHERE t.driver_id=d.id AND t.status='dispatched')) AS driver_status_mismatches
+"""
+
+
+def seed(cursor, prefix, vehicles, drivers):
+    cursor.executemany("""
+        INSERT INTO vehicles
+        (model_name, license_plate, vehicle_type, required_license_category, max_capacity_kg)
+        VALUES (%s,%s,'truck','C',10000)
+    """, [(f"Bench {i}", f"{prefix}-V{i:05d}") for i in range(vehicles)])
+    cursor.executemany("""
+        INSERT INTO drivers
+        (name, license_number, license_category, license_expiry_date, status)
+        VALUES (%s,%s,'C',DATE_ADD(CURDATE(), INTERVAL 1 YEAR),'on_duty')
+    """, [(f"Bench {i}", f"{prefix}-D{i:05d}") for i in range(drivers)])
+
+    cursor.execute("SELECT id FROM vehicles WHERE license_plate LIKE %s", (prefix + "-%",))
+    vehicle_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT id FROM drivers WHERE license_number LIKE %s", (prefix + "-%",))
+    driver_ids = [row[0] for row in cursor.fetchall()]
+    return vehicle_ids, driver_ids
+
+
+def cleanup(cursor, vehicle_ids, driver_ids):
+    vehicles = ",".join(map(str, vehicle_ids))
+    drivers = ",".join(map(str, driver_ids))
+    cursor.execute(f"DELETE FROM trips WHERE vehicle_id IN ({vehicles}) OR driver_id IN ({drivers})")
+    cursor.execute(f"DELETE FROM vehicles WHERE id IN ({vehicles})")
+    cursor.execute(f"DELETE FROM drivers WHERE id IN ({drivers})")
+
+
+def check_invariants(cursor, vehicle_ids, driver_ids):
+    cursor.execute(INVARIANT_QUERY.format(
+        vehicles=",".join(map(str, vehicle_ids)),
+        drivers=",".join(map(str, driver_ids))
+    ))
+    return cursor.fetchone()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--vehicles", type=int, default=20)
+    parser.add_argument("--drivers", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--complete-ratio", type=float, default=0.7,
+                        help="share of successful dispatches that are completed again")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DB_POOL_SIZE", str(args.workers + 2))
+    os.environ.setdefault("CACHE_ENABLED", "0")
+
+    from app import create_app
+    from app.db import get_connection
+    from app.counters import reconcile
+
+    app = create_app()
+
+    with app.app_context():
+        token = create_access_token(identity="0", additional_claims={"role": "manager"})
+        conn = get_connection()
+        cursor = conn.cursor()
+        vehicle_ids, driver_ids = seed(cursor, "DSP" + uuid.uuid4().hex[:6], args.vehicles, args.drivers)
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    headers = {"Authorization": f"Bearer {token}"}
+    stats_lock = threading.Lock()
+    stats = {"attempts": 0, "dispatched": 0, "rejected": 0, "completed": 0, "errors": 0}
+    violations = []
+    deadline = time.monotonic() + args.seconds
+    stop = threading.Event()
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        local = dict.fromkeys(stats, 0)
+
+        while time.monotonic() < deadline:
+            response = client.post("/trips/", headers=headers, json={
+                "vehicle_id": rng.choice(vehicle_ids),
+                "driver_id": rng.choice(driver_ids),
+                "cargo_weight": 100,
+                "origin": "Bench A",
+                "destination": "Bench B"
+            })
+            local["attempts"] += 1
+
+            if response.status_code == 201:
+                local["dispatched"] += 1
+                if rng.random() < args.complete_ratio:
+                    trip_id = response.get_json()["trip_id"]
+                    done = client.put(f"/trips/{trip_id}", headers=headers, json={"status": "completed"})
+                    local["completed" if done.status_code == 200 else "errors"] += 1
+            elif response.status_code in (400, 409):
+                local["rejected"] += 1
+            else:
+                local["errors"] += 1
+
+        with stats_lock:
+            for key, value in local.items():
+                stats[key] += value
+
+    def monitor():
+        with app.app_context():
+            while not stop.wait(0.5):
+                conn = get_connection()
+                cursor = conn.cursor(dictionary=True)
+                result = check_invariants(cursor, vehicle_ids, driver_ids)
+                conn.rollback()
+                cursor.close()
+                conn.close()
+                if result["double_booked_vehicles"] or result["double_booked_drivers"]:
+                    violations.append(result)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.workers)]
+    watcher = threading.Thread(target=monitor)
+
+    start = time.perf_counter()
+    watcher.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    watcher.join()
+
+    with app.app_context():
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True)
+        final = check_invariants(cursor, vehicle_ids, driver_ids)
+        pool = app.extensions["db_pool"].stats()
+        cleanup(cursor, vehicle_ids, driver_ids)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        reconcile(fix=True)
+
+    print(json.dumps({
+        "workers": args.workers,
+        "vehicles": args.vehicles,
+        "drivers": args.drivers,
+        "seconds": round(elapsed, 2),
+        **stats,
+        "requests_per_sec": round((stats["attempts"] + stats["completed"]) / elapsed, 1),
+        "dispatches_per_sec": round(stats["dispatched"] / elapsed, 1),
+        "deadlock_retries": pool["deadlock_retries"],
+        "mid_run_double_bookings": len(violations),
+        "final_check": final
+    }, indent=2, default=int))
+
+
+if __name__ == "__main__":
+    main()
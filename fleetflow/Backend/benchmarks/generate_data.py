@@ -0,0 +1,396 @@
+"""Generate a deterministic synthetic fleet (vehicles, drivers, trips, fuel and maintenance logs).
+
+--scale 1 is 1,000 vehicles, 1,500 drivers and 100,000 trips; --scale 10 gives
+a million trips. The same --seed, --scale and --anchor (the "today" of the
+data set) always produce the same rows; ids continue from the current
+maximum of each table, so the generator can be run against a non-empty
+database.
+
+Rows follow the schema's rules: every trip's vehicle and driver exist and
+match on license category, cargo never exceeds capacity, odometers only move
+forward per vehicle (end_odometer >= start_odometer), completed trips carry
+revenue and a completion time, and each vehicle or driver has at most one
+dispatched trip, with statuses that agree. vehicle_ledger, driver_stats,
+cost_rollups and fleet_counters are rebuilt from the loaded rows at the end.
+
+Loads with batched multi-row INSERTs (--method insert) or LOAD DATA LOCAL
+INFILE (--method infile, needs local_infile=ON on the server).
+
+    cd Backend
+    python -m benchmarks.generate_data --scale 10 --seed 42
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import mysql.connector
+
+from app.config import Config
+
+PER_SCALE = {"vehicles": 1000, "drivers": 1500, "trips": 100000}
+
+VEHICLE_TYPES = {
+    # type: (license category, min capacity, max capacity, share)
+    "truck": ("C", 5000, 20000, 0.45),
+    "van": ("B", 800, 3500, 0.40),
+    "bike": ("A", 20, 150, 0.15)
+}
+
+MODELS = {
+    "truck": ["Volvo FH", "Tata Prima", "Scania R", "Ashok Leyland 4825"],
+    "van": ["Ford Transit", "Mahindra Supro", "Mercedes Sprinter", "Force Traveller"],
+    "bike": ["Honda Activa", "TVS XL100", "Hero Splendor", "Bajaj Platina"]
+}
+
+CITIES = [
+    "Mumbai", "Delhi", "Bengaluru", "Hyderabad", "Ahmedabad", "Chennai", "Kolkata", "Pune",
+    "Jaipur", "Surat", "Lucknow", "Kanpur", "Nagpur", "Indore", "Bhopal", "Patna",
+    "Vadodara", "Ludhiana", "Agra", "Nashik", "Rajkot", "Varanasi", "Amritsar", "Ranchi"
+]
+
+SERVICE_TYPES = ["Oil Change", "Tyre Replacement", "Brake Service", "Engine Repair", "Inspection", "Misc Expense"]
+
+HISTORY_DAYS = 730
+FUEL_PRICE = 100
+BATCH_SIZE = 5000
+
+COLUMNS = {
+    "vehicles": ["id", "model_name", "license_plate", "vehicle_type", "required_license_category",
+                 "max_capacity_kg", "odometer_reading", "status", "acquisition_cost", "created_at"],
+    "drivers": ["id", "name", "license_number", "license_category", "license_expiry_date",
+                "status", "safety_score", "created_at"],
+    "trips": ["id", "vehicle_id", "driver_id", "cargo_weight", "origin", "destination",
+              "start_odometer", "end_odometer", "status", "revenue", "created_at", "completed_at"],
+    "fuel_logs": ["vehicle_id", "trip_id", "liters", "cost", "fuel_date"],
+    "maintenance_logs": ["vehicle_id", "service_type", "description", "cost", "service_date"]
+}
+
+
+class Fleet:
+    """Deterministic generator; every entity draws from its own seeded stream."""
+
+    def __init__(self, seed, scale, anchor, offsets):
+        self.seed = seed
+        self.anchor = datetime.combine(anchor, datetime.min.time())
+        self.offsets = offsets
+        self.vehicle_count = max(1, int(PER_SCALE["vehicles"] * scale))
+        self.driver_count = max(1, int(PER_SCALE["drivers"] * scale))
+        self.trip_count = int(PER_SCALE["trips"] * scale)
+
+        rng = random.Random(f"{seed}:fleet")
+        types = list(VEHICLE_TYPES)
+        weights = [VEHICLE_TYPES[t][3] for t in types]
+
+        self.vehicles = []
+        for index in range(self.vehicle_count):
+            vehicle_type = rng.choices(types, weights)[0]
+            category, low, high, _ = VEHICLE_TYPES[vehicle_type]
+            self.vehicles.append({
+                "id": offsets["vehicles"] + index + 1,
+                "index": index,
+                "type": vehicle_type,
+                "model": rng.choice(MODELS[vehicle_type]),
+                "category": category,
+                "capacity": rng.randint(low // 10, high // 10) * 10,
+                "odometer": rng.randint(0, 50000),
+                "status": rng.choices(["available", "in_shop", "retired"], [0.94, 0.04, 0.02])[0],
+                "created_at": self.anchor - timedelta(days=HISTORY_DAYS + rng.randint(1, 365))
+            })
+
+        self.drivers = []
+        self.drivers_by_category = {}
+        driver_categories = [VEHICLE_TYPES[t][0] for t in types]
+        for index in range(self.driver_count):
+            category = rng.choices(driver_categories, weights)[0]
+            expired = rng.random() < 0.08
+            expiry = self.anchor.date() + timedelta(days=-rng.randint(1, 400) if expired else rng.randint(30, 1800))
+            driver = {
+                "id": offsets["drivers"] + index + 1,
+                "index": index,
+                "category": category,
+                "expiry": expiry,
+                "status": rng.choices(["on_duty", "off_duty", "suspended"], [0.6, 0.33, 0.07])[0],
+                "safety_score": rng.randint(55, 100),
+                "created_at": self.anchor - timedelta(days=HISTORY_DAYS + rng.randint(1, 365))
+            }
+            self.drivers.append(driver)
+            self.drivers_by_category.setdefault(category, []).append(driver)
+
+        # About 5% of the usable vehicles are out on a trip right now, each
+        # with its own on-duty driver holding a valid license.
+        free_drivers = {
+            category: [d for d in drivers if d["status"] == "on_duty" and d["expiry"] >= self.anchor.date()]
+            for category, drivers in self.drivers_by_category.items()
+        }
+        for pool in free_drivers.values():
+            rng.shuffle(pool)
+        self.active = {}
+        for vehicle in self.vehicles:
+            pool = free_drivers.get(vehicle["category"])
+            if vehicle["status"] == "available" and pool and rng.random() < 0.05:
+                driver = pool.pop()
+                driver["status"] = "on_trip"
+                vehicle["status"] = "on_trip"
+                self.active[vehicle["id"]] = driver
+
+        # Trips per vehicle, proportional to a random weight.
+        shares = [rng.random() + 0.2 for _ in self.vehicles]
+        total = sum(shares)
+        self.trips_per_vehicle = [int(self.trip_count * share / total) for share in shares]
+        for index in range(self.trip_count - sum(self.trips_per_vehicle)):
+            self.trips_per_vehicle[index % self.vehicle_count] += 1
+
+        self.final_odometer = {}
+
+    def vehicle_rows(self):
+        for v in self.vehicles:
+            yield (
+                v["id"], v["model"],
+                f"SYN{self.seed}-{v['index']:07d}", v["type"], v["category"], v["capacity"],
+                v["odometer"], v["status"], 15000 + v["capacity"] * 4, v["created_at"]
+            )
+
+    def driver_rows(self):
+        for d in self.drivers:
+            yield (
+                d["id"], f"Driver {d['index']}", f"SYN{self.seed}-DL{d['index']:07d}", d["category"],
+                d["expiry"], d["status"], d["safety_score"], d["created_at"]
+            )
+
+    def _vehicle_trips(self, vehicle):
+        """Yield (created_at, trip, fuel, vehicle_id) for one vehicle's trips in time order."""
+        rng = random.Random(f"{self.seed}:trips:{vehicle['index']}")
+        count = self.trips_per_vehicle[vehicle["index"]]
+        drivers = self.drivers_by_category.get(vehicle["category"])
+        active_driver = self.active.get(vehicle["id"])
+        if not drivers:
+            count = 0
+
+        odometer = vehicle["odometer"]
+        start = vehicle["created_at"]
+        span = (self.anchor - start).total_seconds()
+        offsets = sorted(rng.random() * span for _ in range(count))
+
+        for position, offset in enumerate(offsets):
+            created_at = start + timedelta(seconds=int(offset))
+            is_active = active_driver is not None and position == count - 1
+            driver = active_driver if is_active else rng.choice(drivers)
+            cargo = rng.randint(max(1, vehicle["capacity"] // 20), vehicle["capacity"])
+            origin, destination = rng.sample(CITIES, 2)
+
+            if is_active:
+                status = "dispatched"
+            else:
+                status = rng.choices(["completed", "cancelled", "draft"], [0.86, 0.1, 0.04])[0]
+
+            start_odometer = end_odometer = completed_at = None
+            revenue = 0
+            fuel = None
+            if status != "draft":
+                start_odometer = odometer
+            if status == "completed":
+                distance = rng.randint(20, 900)
+                end_odometer = odometer + distance
+                odometer = end_odometer
+                completed_at = created_at + timedelta(minutes=rng.randint(30, 60 * 48))
+                revenue = round(cargo * distance * rng.uniform(0.002, 0.01) + 500, 2)
+                if rng.random() < 0.8:
+                    liters = round(distance * rng.uniform(0.08, 0.35), 2) or 0.5
+                    fuel = (liters, round(liters * FUEL_PRICE, 2), created_at.date())
+
+            yield created_at, (
+                driver["id"], cargo, origin, destination, start_odometer, end_odometer,
+                status, revenue, created_at, completed_at
+            ), fuel, vehicle["id"]
+
+        self.final_odometer[vehicle["id"]] = odometer
+
+    def trip_and_fuel_rows(self):
+        """Trips in global created_at order (ids follow time), with their fuel logs."""
+        merged = heapq.merge(*(self._vehicle_trips(v) for v in self.vehicles), key=lambda item: item[0])
+        trip_id = self.offsets["trips"]
+        for _, trip, fuel, vehicle_id in merged:
+            trip_id += 1
+            fuel_row = (vehicle_id, trip_id, *fuel) if fuel else None
+            yield (trip_id, vehicle_id, *trip), fuel_row
+
+    def maintenance_rows(self):
+        for v in self.vehicles:
+            rng = random.Random(f"{self.seed}:maintenance:{v['index']}")
+            day = v["created_at"].date()
+            end = self.anchor.date()
+            while True:
+                day += timedelta(days=rng.randint(20, 120))
+                if day >= end:
+                    break
+                service = rng.choice(SERVICE_TYPES)
+                yield (v["id"], service, f"{service} (synthetic)", round(rng.uniform(500, 25000), 2), day)
+            if v["status"] == "in_shop":
+                yield (v["id"], "Engine Repair", "In the shop (synthetic)", round(rng.uniform(2000, 40000), 2), end)
+
+
+class Loader:
+    def __init__(self, conn, method, batch_size):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.method = method
+        self.batch_size = batch_size
+        self.report = {}
+        self._tmpdir = tempfile.mkdtemp(prefix="fleetflow-gen-")
+
+    def load(self, table, rows):
+        columns = COLUMNS[table]
+        started = time.perf_counter()
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                count += self._flush(table, columns, batch)
+                batch = []
+        if batch:
+            count += self._flush(table, columns, batch)
+        self.conn.commit()
+
+        elapsed = time.perf_counter() - started
+        entry = self.report.setdefault(table, {"rows": 0, "seconds": 0.0})
+        entry["rows"] += count
+        entry["seconds"] += elapsed
+        return count
+
+    def _flush(self, table, columns, batch):
+        if self.method == "insert":
+            placeholders = ", ".join(["%s"] * len(columns))
+            self.cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", batch
+            )
+        else:
+            path = os.path.join(self._tmpdir, f"{table}.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                for row in batch:
+                    writer.writerow(["\\N" if value is None else value for value in row])
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,)
+            )
+        return len(batch)
+
+
+class SplitLoad:
+    """Feed trips and their fuel logs from one generator into two tables.
+
+    Fuel logs reference trips, so they are buffered and loaded after each
+    trip batch instead of materializing the whole data set.
+    """
+
+    def __init__(self, loader, rows):
+        self.loader = loader
+        self.rows = rows
+
+    def run(self):
+        trips = []
+        fuel = []
+        for trip, fuel_row in self.rows:
+            trips.append(trip)
+            if fuel_row:
+                fuel.append(fuel_row)
+            if len(trips) >= self.loader.batch_size * 10:
+                self.loader.load("trips", trips)
+                self.loader.load("fuel_logs", fuel)
+                trips, fuel = [], []
+        if trips:
+            self.loader.load("trips", trips)
+        if fuel:
+            self.loader.load("fuel_logs", fuel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(),
+                        help="the data set's 'today' (YYYY-MM-DD); fix it for byte-identical runs")
+    parser.add_argument("--method", choices=["insert", "infile"], default="insert")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--skip-rebuild", action="store_true",
+                        help="do not rebuild the derived tables afterwards")
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(
+        host=Config.DB_HOST, port=Config.DB_PORT, user=Config.DB_USER,
+        password=Config.DB_PASSWORD, database=Config.DB_NAME,
+        allow_local_infile=args.method == "infile", autocommit=False
+    )
+    cursor = conn.cursor()
+
+    offsets = {}
+    for table in ["vehicles", "drivers", "trips"]:
+        cursor.execute(f"SELECT IFNULL(MAX(id), 0) FROM {table}")
+        offsets[table] = cursor.fetchone()[0]
+
+    started = time.perf_counter()
+    fleet = Fleet(args.seed, args.scale, args.anchor, offsets)
+    loader = Loader(conn, args.method, args.batch_size)
+
+    loader.load("vehicles", fleet.vehicle_rows())
+    loader.load("drivers", fleet.driver_rows())
+    SplitLoad(loader, fleet.trip_and_fuel_rows()).run()
+    loader.load("maintenance_logs", fleet.maintenance_rows())
+
+    cursor.executemany(
+        "UPDATE vehicles SET odometer_reading=%s WHERE id=%s",
+        [(odometer, vehicle_id) for vehicle_id, odometer in fleet.final_odometer.items()]
+    )
+    # The rows went in behind the app's back; make clients refetch the lists.
+    cursor.execute("UPDATE table_versions SET version = version + 1")
+    conn.commit()
+    cursor.close()
+    conn.close()
+    load_seconds = time.perf_counter() - started
+
+    rebuild_seconds = None
+    if not args.skip_rebuild:
+        from app import create_app
+        from app import counters, driver_stats, ledger, rollups
+
+        rebuild_started = time.perf_counter()
+        app = create_app()
+        with app.app_context():
+            ledger.reconcile(fix=True)
+            driver_stats.reconcile(fix=True)
+            rollups.backfill()
+            counters.reconcile(fix=True)
+        rebuild_seconds = round(time.perf_counter() - rebuild_started, 2)
+
+    total_rows = sum(entry["rows"] for entry in loader.report.values())
+    print(json.dumps({
+        "seed": args.seed,
+        "scale": args.scale,
+        "anchor": args.anchor.isoformat(),
+        "method": args.method,
+        "tables": {
+            table: {
+                "rows": entry["rows"],
+                "seconds": round(entry["seconds"], 2),
+                "rows_per_sec": round(entry["rows"] / entry["seconds"]) if entry["seconds"] else None
+            }
+            for table, entry in loader.report.items()
+        },
+        "rows": total_rows,
+        "load_seconds": round(load_seconds, 2),
+        "rows_per_sec": round(total_rows / load_seconds),
+        "rebuild_seconds": rebuild_seconds
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Time encoding and compressing a large trips list response.
+
+Builds --rows trips shaped like GET /trips/ rows (from the data generator,
+no database) and times turning them into a response body three ways: the
+old path (isoformat loop, then Flask's default provider), FleetJSONProvider
+with orjson, and FleetJSONProvider's stdlib fallback. Then times gzip and,
+if the brotli package is installed, br on the encoded body and reports the
+sizes. Each figure is the median of --repeat runs.
+
+    cd Backend
+    python -m benchmarks.json_responses --rows 50000
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app import json_provider
+from app.compression import Compressor
+from app.json_provider import FleetJSONProvider
+from benchmarks.generate_data import Fleet, PER_SCALE
+
+
+def make_rows(count, seed):
+    fleet = Fleet(seed, count / PER_SCALE["trips"], date.today(), {"vehicles": 0, "drivers": 0, "trips": 0})
+    vehicles = {row[0]: row for row in fleet.vehicle_rows()}
+    drivers = {row[0]: row[1] for row in fleet.driver_rows()}
+    now = datetime.now()
+
+    rows = []
+    for trip, _ in fleet.trip_and_fuel_rows():
+        vehicle = vehicles[trip[1]]
+        rows.append({
+            "id": trip[0], "cargo_weight": trip[3], "origin": trip[4], "destination": trip[5],
+            "status": trip[8], "created_at": trip[10], "completed_at": trip[11], "updated_at": now,
+            "vehicle_type": vehicle[3], "model_name": vehicle[1], "license_plate": vehicle[2],
+            "driver_name": drivers[trip[2]]
+        })
+        if len(rows) == count:
+            break
+    return rows
+
+
+def legacy_body(app, rows):
+    for trip in rows:
+        if trip.get("created_at"):
+            trip["created_at"] = trip["created_at"].isoformat()
+        if trip.get("completed_at"):
+            trip["completed_at"] = trip["completed_at"].isoformat()
+    return app.json.response({"trips": rows, "next_cursor": None}).get_data()
+
+
+def provider_body(app, rows):
+    return app.json.response({"trips": rows, "next_cursor": None}).get_data()
+
+
+def median_ms(samples):
+    return round(sorted(samples)[len(samples) // 2] * 1000, 2)
+
+
+def timed(fn, rows, repeat):
+    samples = []
+    body = None
+    for _ in range(repeat):
+        # The legacy path rewrites rows in place, so each run gets fresh copies.
+        copies = [dict(row) for row in rows]
+        started = time.perf_counter()
+        body = fn(copies)
+        samples.append(time.perf_counter() - started)
+    return median_ms(samples), body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.seed)
+    app = Flask(__name__)
+    report = {"rows": len(rows), "orjson": json_provider.orjson is not None, "encode_ms": {}}
+
+    with app.app_context():
+        app.json = DefaultJSONProvider(app)
+        report["encode_ms"]["legacy"], _ = timed(lambda copies: legacy_body(app, copies), rows, args.repeat)
+
+        app.json = FleetJSONProvider(app)
+        if json_provider.orjson is not None:
+            report["encode_ms"]["orjson"], body = timed(lambda copies: provider_body(app, copies), rows, args.repeat)
+
+        orjson, json_provider.orjson = json_provider.orjson, None
+        try:
+            report["encode_ms"]["stdlib"], stdlib = timed(lambda copies: provider_body(app, copies), rows, args.repeat)
+        finally:
+            json_provider.orjson = orjson
+        if orjson is None:
+            body = stdlib
+        elif json.loads(body) != json.loads(stdlib):
+            raise SystemExit("orjson and stdlib bodies differ")
+
+    compressor = Compressor()
+    report["body_bytes"] = len(body)
+    report["compression"] = {}
+    for encoding in compressor.encodings():
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            compressed = compressor.encode(body, encoding)
+            samples.append(time.perf_counter() - started)
+        report["compression"][encoding] = {
+            "ms": median_ms(samples),
+            "bytes": len(compressed),
+            "ratio": round(len(compressed) / len(body), 4)
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Time the load planner on a synthetic fleet and compare it with a plain first-fit scan.
+
+Runs app.planning.plan_loads directly (no database) on random shipments
+spread over a number of lanes and reports runtime, vehicles used and the
+capacity lower bound. The reference is first-fit decreasing that scans
+every open vehicle for each shipment.
+
+    cd Backend
+    python -m benchmarks.load_planning --shipments 10000 --vehicles 1000
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+from app.planning import plan_loads
+
+CAPACITIES = [800, 1500, 3500, 8000, 12000, 20000]
+
+
+def make_input(shipments, vehicles, lanes, seed):
+    rng = random.Random(seed)
+    lane_names = [(f"Depot {i % 25}", f"City {i}") for i in range(lanes)]
+    return (
+        [
+            {"weight": rng.randint(20, 1200), "origin": origin, "destination": destination}
+            for origin, destination in (rng.choice(lane_names) for _ in range(shipments))
+        ],
+        [(rng.choice(CAPACITIES), vehicle_id) for vehicle_id in range(1, vehicles + 1)]
+    )
+
+
+def first_fit_scan(shipments, vehicles):
+    """Reference: first-fit decreasing per lane, scanning open vehicles linearly."""
+    lanes = {}
+    for shipment in shipments:
+        lanes.setdefault((shipment["origin"], shipment["destination"]), []).append(shipment["weight"])
+
+    pool = sorted(vehicles)
+    used = 0
+    for weights in lanes.values():
+        remaining = []
+        for weight in sorted(weights, reverse=True):
+            for i, room in enumerate(remaining):
+                if room >= weight:
+                    remaining[i] -= weight
+                    break
+            else:
+                if pool and pool[-1][0] >= weight:
+                    remaining.append(pool.pop()[0] - weight)
+        used += len(remaining)
+    return used
+
+
+def check(trips, unassigned, shipments, vehicles):
+    capacity = dict((vehicle_id, cap) for cap, vehicle_id in vehicles)
+    vehicle_ids = [trip["vehicle_id"] for trip in trips]
+    assert len(vehicle_ids) == len(set(vehicle_ids)), "vehicle used twice"
+    placed = set()
+    for trip in trips:
+        assert trip["cargo_weight"] <= capacity[trip["vehicle_id"]], "overloaded vehicle"
+        assert trip["cargo_weight"] == sum(shipments[i]["weight"] for i in trip["shipments"])
+        placed.update(trip["shipments"])
+    assert len(placed) + len(unassigned) == len(shipments), "shipment lost or duplicated"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shipments", type=int, default=10000)
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--lanes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    shipments, vehicles = make_input(args.shipments, args.vehicles, args.lanes, args.seed)
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        trips, unassigned = plan_loads(shipments, vehicles)
+        timings.append(time.perf_counter() - start)
+    check(trips, unassigned, shipments, vehicles)
+
+    start = time.perf_counter()
+    scan_used = first_fit_scan(shipments, vehicles)
+    scan_seconds = time.perf_counter() - start
+
+    total_weight = sum(shipment["weight"] for shipment in shipments)
+    print(json.dumps({
+        "shipments": args.shipments,
+        "vehicles": args.vehicles,
+        "lanes": args.lanes,
+        "planner": {
+            "best_seconds": round(min(timings), 4),
+            "median_seconds": round(sorted(timings)[len(timings) // 2], 4),
+            "vehicles_used": len(trips),
+            "unassigned": len(unassigned),
+            "capacity_used_kg": sum(trip["capacity"] for trip in trips)
+        },
+        "first_fit_scan": {
+            "seconds": round(scan_seconds, 4),
+            "vehicles_used": scan_used
+        },
+        "lower_bound_vehicles": math.ceil(total_weight / max(CAPACITIES))
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Replay a mixed dispatcher/manager/analyst/safety workload and report latency per endpoint.
+
+Creates one user per role through the admin account, logs each in through
+/auth/login and runs --workers threads for --seconds. Each worker plays one
+role picked from --mix and loops over that role's actions:
+
+    dispatcher  auto-assign + dispatch a trip, complete earlier trips, list trips
+    manager     list vehicles, dashboard KPIs, list trips
+    analyst     fleet ROI, analytics summary, single vehicle ROI
+    safety      driver list, available drivers, driver performance
+
+Runs in-process against the database configured through the DB_* environment
+variables, or over HTTP against a running server with --base-url. Seed the
+database at the scale under test first (benchmarks.generate_data) so list and
+analytics endpoints see realistic sizes. The run is reproducible for a given --seed; output is JSON
+(also written to --output) so runs can be diffed across commits.
+
+    cd Backend
+    python -m benchmarks.load_test --workers 16 --seconds 30 --mix dispatcher=4,manager=2,analyst=2,safety=1
+"""
+import argparse
+import http.client
+import json
+import random
+import subprocess
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+ROLES = ["dispatcher", "manager", "analyst", "safety"]
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self._client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPClient:
+    """One keep-alive connection per worker."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self._host = parts.hostname
+        self._port = parts.port or 80
+        self._conn = http.client.HTTPConnection(self._host, self._port, timeout=30)
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self._conn.request(method, path, body=payload, headers=headers)
+            response = self._conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            self._conn.close()
+            self._conn = http.client.HTTPConnection(self._host, self._port, timeout=30)
+            raise
+        data = response.read()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.statuses = {}
+
+    def record(self, name, seconds, status):
+        self.samples.setdefault(name, []).append(seconds)
+        key = (name, status)
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def merge(self, other):
+        for name, samples in other.samples.items():
+            self.samples.setdefault(name, []).extend(samples)
+        for key, count in other.statuses.items():
+            self.statuses[key] = self.statuses.get(key, 0) + count
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Session:
+    def __init__(self, client, token, recorder, rng, context):
+        self.client = client
+        self.token = token
+        self.recorder = recorder
+        self.rng = rng
+        self.context = context
+        self.open_trips = []
+
+    def call(self, name, method, path, body=None):
+        started = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, body, self.token)
+        except Exception:
+            status, data = "error", None
+        self.recorder.record(name, time.perf_counter() - started, status)
+        return status, data
+
+
+def dispatcher_dispatch(session):
+    weight = session.rng.randint(50, 2000)
+    status, match = session.call("POST /trips/auto-assign", "POST", "/trips/auto-assign",
+                                 {"cargo_weight": weight, "origin": "Load Depot"})
+    if status != 200:
+        return
+    status, data = session.call("POST /trips/", "POST", "/trips/", {
+        "vehicle_id": match["vehicle"]["id"],
+        "driver_id": match["driver"]["id"],
+        "cargo_weight": weight,
+        "origin": "Load Depot",
+        "destination": f"Load City {session.rng.randint(1, 50)}",
+        "estimated_fuel_cost": session.rng.randint(0, 500)
+    })
+    if status == 201:
+        session.open_trips.append(data["trip_id"])
+
+
+def dispatcher_complete(session):
+    if not session.open_trips:
+        return dispatcher_dispatch(session)
+    trip_id = session.open_trips.pop(0)
+    session.call("PUT /trips/<id>", "PUT", f"/trips/{trip_id}", {"status": "completed"})
+
+
+def list_trips(session):
+    session.call("GET /trips/", "GET", "/trips/?limit=50")
+
+
+def list_vehicles(session):
+    session.call("GET /vehicles/", "GET", "/vehicles/")
+
+
+def dashboard(session):
+    session.call("GET /analytics/dashboard", "GET", "/analytics/dashboard")
+
+
+def fleet_roi(session):
+    session.call("GET /analytics/roi", "GET", "/analytics/roi?top=10&bottom=10")
+
+
+def summary(session):
+    session.call("GET /analytics/summary", "GET", "/analytics/summary")
+
+
+def vehicle_roi(session):
+    vehicle_ids = session.context["vehicle_ids"]
+    if vehicle_ids:
+        vehicle_id = session.rng.choice(vehicle_ids)
+        session.call("GET /analytics/vehicle/<id>/roi", "GET", f"/analytics/vehicle/{vehicle_id}/roi")
+
+
+def list_drivers(session):
+    session.call("GET /drivers/", "GET", "/drivers/")
+
+
+def available_drivers(session):
+    session.call("GET /drivers/available", "GET", "/drivers/available")
+
+
+def driver_performance(session):
+    session.call("GET /drivers/performance", "GET", "/drivers/performance")
+
+
+# (action, weight) per role.
+WORKLOADS = {
+    "dispatcher": [(dispatcher_dispatch, 4), (dispatcher_complete, 3), (list_trips, 1)],
+    "manager": [(list_vehicles, 3), (dashboard, 3), (list_trips, 2)],
+    "analyst": [(fleet_roi, 3), (summary, 2), (vehicle_roi, 3)],
+    "safety": [(list_drivers, 3), (available_drivers, 2), (driver_performance, 2)]
+}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        role, _, weight = part.partition("=")
+        if role not in ROLES:
+            raise argparse.ArgumentTypeError(f"Unknown role {role!r}; use {', '.join(ROLES)}")
+        mix[role] = float(weight or 1)
+    return mix
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def login(client, email, password):
+    status, data = client.request("POST", "/auth/login", {"email": email, "password": password})
+    if status != 200:
+        raise SystemExit(f"Login failed for {email}: {status} {data}")
+    return data["access_token"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="run over HTTP against this server instead of in-process")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("dispatcher=4,manager=2,analyst=2,safety=1"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--admin-email", default="admin@fleetflow.com")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.base_url:
+        make_client = lambda: HTTPClient(args.base_url)
+    else:
+        from app import create_app
+        app = create_app()
+        make_client = lambda: InProcessClient(app)
+
+    setup = make_client()
+    admin_token = login(setup, args.admin_email, args.admin_password)
+
+    tag = uuid.uuid4().hex[:8]
+    password = uuid.uuid4().hex
+    users = {}
+    tokens = {}
+    try:
+        for role in ROLES:
+            email = f"load-{role}-{tag}@bench.local"
+            status, data = setup.request("POST", "/users/", {
+                "name": f"Load {role}", "email": email, "password": password, "role": role
+            }, admin_token)
+            if status != 201:
+                raise SystemExit(f"Could not create {role} user: {status} {data}")
+            users[role] = data["user_id"]
+            tokens[role] = login(setup, email, password)
+
+        status, vehicles = setup.request("GET", "/vehicles/", token=tokens["manager"])
+        context = {"vehicle_ids": [vehicle["id"] for vehicle in vehicles or []][:1000]}
+
+        rng = random.Random(args.seed)
+        roles = list(args.mix)
+        assignments = rng.choices(roles, weights=[args.mix[role] for role in roles], k=args.workers)
+
+        recorder = Recorder()
+        lock = threading.Lock()
+        deadline = time.monotonic() + args.seconds
+
+        def worker(index, role):
+            worker_rng = random.Random(f"{args.seed}:{index}")
+            local = Recorder()
+            session = Session(make_client(), tokens[role], local, worker_rng, context)
+            actions, weights = zip(*WORKLOADS[role])
+            while time.monotonic() < deadline:
+                worker_rng.choices(actions, weights=weights)[0](session)
+            # Leave no trip running.
+            for trip_id in session.open_trips:
+                session.call("PUT /trips/<id>", "PUT", f"/trips/{trip_id}", {"status": "completed"})
+            with lock:
+                recorder.merge(local)
+
+        threads = [threading.Thread(target=worker, args=(i, role)) for i, role in enumerate(assignments)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        for user_id in users.values():
+            setup.request("DELETE", f"/users/{user_id}", token=admin_token)
+
+    endpoints = {}
+    for name, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        statuses = {str(status): count for (key, status), count in recorder.statuses.items() if key == name}
+        endpoints[name] = {
+            "requests": len(ordered),
+            "per_sec": round(len(ordered) / elapsed, 1),
+            "statuses": statuses,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2)
+        }
+
+    total = sum(len(samples) for samples in recorder.samples.values())
+    report = {
+        "revision": git_revision(),
+        "target": args.base_url or "in-process",
+        "workers": args.workers,
+        "roles": {role: assignments.count(role) for role in roles},
+        "seed": args.seed,
+        "seconds": round(elapsed, 2),
+        "requests": total,
+        "requests_per_sec": round(total / elapsed, 1),
+        "server_errors": sum(
+            count for (_, status), count in recorder.statuses.items()
+            if status == "error" or status >= 500
+        ),
+        "endpoints": endpoints
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
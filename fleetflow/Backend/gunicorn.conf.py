@@ -0,0 +1,14 @@
+import os
+
+# gevent workers: every request (and every open /events stream) is a greenlet,
+# so idle event subscribers cost memory rather than a thread each. The event
+# bus and memory cache are per process; see app/events.py.
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+worker_class = "gevent"
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 10000))
+
+# Streams send a heartbeat every EVENTS_HEARTBEAT seconds; don't let the
+# arbiter mistake a long-lived response for a hung worker.
+timeout = 0
+graceful_timeout = 30
@@ -0,0 +1,139 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+class FakeDatabase:
+    """Scripted stand-in for MySQL: statements are recorded and answered by rules.
+
+    db.on(fragment, rows=..., rowcount=...) answers every statement containing
+    `fragment` (the first matching rule wins; `times` limits how often).
+    Unmatched statements return no rows and a rowcount of 1.
+    """
+
+    def __init__(self):
+        self.executed = []
+        self.rules = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.next_id = 100
+
+    def on(self, fragment, rows=(), rowcount=None, columns=(), times=None):
+        self.rules.insert(0, {
+            "fragment": fragment, "rows": list(rows), "rowcount": rowcount, "columns": tuple(columns), "times": times
+        })
+
+    def answer(self, sql):
+        for rule in self.rules:
+            if rule["fragment"] in sql and rule["times"] != 0:
+                if rule["times"]:
+                    rule["times"] -= 1
+                return rule
+        return None
+
+    def statements(self, fragment):
+        return [(sql, params) for sql, params in self.executed if fragment in sql]
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+        self.rowcount = -1
+        self.lastrowid = None
+        self.column_names = ()
+        self.with_rows = False
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self._db.executed.append((sql, params))
+        rule = self._db.answer(sql)
+        self._rows = list(rule["rows"]) if rule else []
+        self.column_names = rule["columns"] if rule else ()
+        self.with_rows = sql.lstrip("( ").upper().startswith("SELECT")
+        if rule and rule["rowcount"] is not None:
+            self.rowcount = rule["rowcount"]
+        else:
+            self.rowcount = len(self._rows) if self.with_rows else 1
+        if sql.upper().startswith("INSERT"):
+            self._db.next_id += 1
+            self.lastrowid = self._db.next_id
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        self.execute(sql, seq_params)
+        self.rowcount = len(seq_params)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchmany(self, size=1):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    in_transaction = False
+    unread_result = False
+
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self._db)
+
+    def commit(self):
+        self._db.commits += 1
+
+    def rollback(self):
+        self._db.rollbacks += 1
+
+    def ping(self, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def app(db, monkeypatch):
+    monkeypatch.setattr("mysql.connector.connect", lambda **kwargs: FakeConnection(db))
+    from app import create_app
+    from app.availability import availability
+    from app.schedule import schedule
+
+    app = create_app()
+    app.config["TESTING"] = True
+    # The indexes are process-wide; start every test from an empty one.
+    for index in (availability, schedule):
+        index.__init__()
+        index.init_app(app)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    def headers(role="manager", identity="1"):
+        with app.app_context():
+            token = create_access_token(identity=identity, additional_claims={"role": role})
+        return {"Authorization": f"Bearer {token}"}
+    return headers
@@ -0,0 +1,32 @@
+import pytest
+
+
+@pytest.mark.parametrize("planned_start, planned_end", [
+    (1893456000, 1893459600),
+    (True, "2030-01-01T12:00:00"),
+    ("2030-01-01T10:00:00", ["2030-01-01T12:00:00"]),
+    ("tomorrow", "2030-01-01T12:00:00"),
+])
+def test_scheduled_trip_rejects_bad_datetimes(client, auth, db, planned_start, planned_end):
+    response = client.post("/trips/schedule", headers=auth("dispatcher"), json={
+        "vehicle_id": 1, "driver_id": 2, "cargo_weight": 100, "origin": "A", "destination": "B",
+        "planned_start": planned_start, "planned_end": planned_end
+    })
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "planned_start and planned_end must be ISO 8601 datetimes"}
+    assert db.executed == []
+
+
+@pytest.mark.parametrize("planned_start, planned_end", [
+    (1893456000, 1893459600),
+    ("2030-01-01T10:00:00", 5),
+])
+def test_maintenance_booking_rejects_bad_datetimes(client, auth, db, planned_start, planned_end):
+    response = client.post("/maintenance/", headers=auth("manager"), json={
+        "vehicle_id": 1, "service_type": "Oil change",
+        "planned_start": planned_start, "planned_end": planned_end
+    })
+
+    assert response.status_code == 400
+    assert db.executed == []
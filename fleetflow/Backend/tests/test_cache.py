@@ -0,0 +1,35 @@
+from app.cache import cache
+
+VEHICLE = {
+    "model_name": "Actros", "license_plate": "FF-001", "vehicle_type": "truck",
+    "required_license_category": "C", "max_capacity_kg": 18000
+}
+
+
+def list_reads(db):
+    return len(db.statements("FROM vehicles v"))
+
+
+def test_write_bumps_the_generation_and_retires_cached_lists(client, auth, db):
+    first = client.get("/vehicles/", headers=auth())
+    second = client.get("/vehicles/", headers=auth())
+
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert list_reads(db) == 1
+    assert cache.backend.generations(["vehicles"]) == [0]
+
+    assert client.post("/vehicles/", headers=auth(), json=VEHICLE).status_code == 201
+
+    assert cache.backend.generations(["vehicles"]) == [1]
+    third = client.get("/vehicles/", headers=auth())
+    assert third.headers["X-Cache"] == "MISS"
+    assert list_reads(db) == 2
+
+
+def test_write_leaves_other_groups_cached(client, auth, db):
+    client.get("/vehicles/", headers=auth())
+
+    cache.invalidate("drivers")
+
+    assert cache.backend.generations(["vehicles", "drivers"]) == [0, 1]
+    assert client.get("/vehicles/", headers=auth()).headers["X-Cache"] == "HIT"
@@ -0,0 +1,148 @@
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.columnar import AnalyticsEngine, QueryError, _bucket, _percentiles, _sorted_groups
+
+
+def days(*values):
+    return np.array(values, dtype="datetime64[s]")
+
+
+def test_bucket_week_starts_on_monday():
+    values = days("2024-01-01T08:00", "2024-01-03T23:59", "2024-01-07T12:00", "1969-12-31T00:00")
+
+    assert _bucket(values, "week").astype(str).tolist() == [
+        "2024-01-01", "2024-01-01", "2024-01-01", "1969-12-29"
+    ]
+
+
+def test_bucket_day_month_year():
+    values = days("2024-02-29T23:00", "2024-12-31T01:00")
+
+    assert _bucket(values, "day").astype(str).tolist() == ["2024-02-29", "2024-12-31"]
+    assert _bucket(values, "month").astype(str).tolist() == ["2024-02-01", "2024-12-01"]
+    assert _bucket(values, "year").astype(str).tolist() == ["2024-01-01", "2024-01-01"]
+
+
+def test_bucket_empty():
+    assert len(_bucket(days(), "week")) == 0
+
+
+def test_sorted_groups_sorts_within_each_group():
+    groups = np.array([1, 0, 1, 0, 1])
+    values = np.array([5.0, 3.0, 1.0, 2.0, 4.0])
+
+    sorted_values, starts, sizes = _sorted_groups(groups, values, 3)
+
+    assert sorted_values.tolist() == [2.0, 3.0, 1.0, 4.0, 5.0]
+    assert starts.tolist() == [0, 2, 5]
+    assert sizes.tolist() == [2, 3, 0]
+
+
+def test_percentiles_match_numpy_and_leave_empty_groups_nan():
+    rng = np.random.default_rng(3)
+    groups = rng.integers(0, 4, 200)
+    groups[groups == 2] = 3
+    values = rng.normal(50, 10, 200)
+    sorted_values, starts, sizes = _sorted_groups(groups, values, 4)
+
+    for q in [0, 10, 50, 95, 100]:
+        result = _percentiles(sorted_values, starts, sizes, q)
+        assert np.isnan(result[2])
+        for group in [0, 1, 3]:
+            assert result[group] == pytest.approx(np.percentile(values[groups == group], q))
+
+
+def test_percentile_of_single_value():
+    result = _percentiles(np.array([7.0]), np.array([0]), np.array([1]), 90)
+
+    assert result.tolist() == [7.0]
+
+
+TRIPS = [
+    # id, vehicle_id, driver_id, cargo_weight, start_odometer, end_odometer, status, revenue, created_at, completed_at
+    (1, 1, 1, 100.0, 0.0, 50.0, "completed", 500.0, datetime(2024, 1, 3), datetime(2024, 1, 3, 5)),
+    (2, 1, 2, 300.0, 50.0, 80.0, "completed", 900.0, datetime(2024, 1, 20), datetime(2024, 1, 20, 2)),
+    (3, 2, 1, 200.0, 0.0, None, "dispatched", 0.0, datetime(2024, 2, 2), None),
+    (4, 2, 2, 400.0, 10.0, 110.0, "completed", 1200.0, datetime(2024, 2, 10), datetime(2024, 2, 11)),
+]
+
+
+@pytest.fixture
+def engine():
+    engine = AnalyticsEngine()
+    engine.load_rows("trips", TRIPS)
+    return engine
+
+
+def run(engine, **spec):
+    result = engine.query({"table": "trips", **spec})
+    return [dict(zip(result["columns"], row)) for row in result["rows"]]
+
+
+def test_category_filters(engine):
+    assert run(engine, filters=[{"column": "status", "op": "=", "value": "completed"}]) == [{"count": 3}]
+    assert run(engine, filters=[{"column": "status", "op": "!=", "value": "completed"}]) == [{"count": 1}]
+    assert run(engine, filters=[{"column": "status", "op": "in", "value": ["dispatched", "nope"]}]) == [{"count": 1}]
+    assert run(engine, filters=[{"column": "status", "op": "=", "value": "nope"}]) == [{"count": 0}]
+    assert run(engine, filters=[{"column": "status", "op": "not_in", "value": ["nope"]}]) == [{"count": 4}]
+
+
+def test_numeric_datetime_and_null_filters(engine):
+    assert run(engine, filters=[{"column": "cargo_weight", "op": ">=", "value": 300}]) == [{"count": 2}]
+    assert run(engine, filters=[{"column": "created_at", "op": "<", "value": "2024-02-01"}]) == [{"count": 2}]
+    assert run(engine, filters=[{"column": "completed_at", "op": "is_null"}]) == [{"count": 1}]
+    assert run(engine, filters=[{"column": "end_odometer", "op": "not_null"}]) == [{"count": 3}]
+
+
+def test_group_by_month_with_percentiles(engine):
+    rows = run(
+        engine,
+        group_by=["month(created_at)"],
+        aggregates=[{"fn": "sum", "column": "revenue"}, {"fn": "percentile", "column": "cargo_weight", "q": [0, 50]}]
+    )
+
+    assert rows == [
+        {"month(created_at)": "2024-01-01", "sum(revenue)": 1400.0, "p0(cargo_weight)": 100.0, "p50(cargo_weight)": 200.0},
+        {"month(created_at)": "2024-02-01", "sum(revenue)": 1200.0, "p0(cargo_weight)": 200.0, "p50(cargo_weight)": 300.0},
+    ]
+
+
+def test_aggregates_skip_missing_values(engine):
+    rows = run(engine, group_by=["status"], aggregates=[{"fn": "mean", "column": "distance"}])
+
+    assert {row["status"]: row["mean(distance)"] for row in rows} == {"completed": 60.0, "dispatched": None}
+
+
+def test_filter_matching_nothing(engine):
+    rows = run(
+        engine,
+        filters=[{"column": "cargo_weight", "op": ">", "value": 10000}],
+        group_by=["status"],
+        aggregates=[{"fn": "count"}, {"fn": "median", "column": "revenue"}]
+    )
+
+    assert rows == []
+
+
+def test_empty_table():
+    empty = AnalyticsEngine()
+    empty.load_rows("trips", [])
+
+    assert run(empty) == [{"count": 0}]
+    assert run(empty, group_by=["week(created_at)"]) == []
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({"filters": [{"column": "nope", "op": "="}]}, "Unknown column"),
+    ({"filters": [{"column": "cargo_weight", "op": "~", "value": 1}]}, "Unknown op"),
+    ({"filters": [{"column": "cargo_weight", "op": "=", "value": "x"}]}, "numeric value"),
+    ({"group_by": ["week(cargo_weight)"]}, "needs a datetime column"),
+    ({"aggregates": [{"fn": "percentile", "column": "revenue", "q": 101}]}, "between 0 and 100"),
+])
+def test_invalid_queries(engine, spec, message):
+    with pytest.raises(QueryError, match=message):
+        engine.query({"table": "trips", **spec})
@@ -0,0 +1,78 @@
+from datetime import date
+
+import pytest
+
+TRIP = {"vehicle_id": 1, "driver_id": 2, "cargo_weight": 100, "origin": "A", "destination": "B"}
+
+
+def test_lost_vehicle_claim_is_a_conflict(client, auth, db):
+    # Another dispatcher took the vehicle between reading it and claiming it.
+    db.on("UPDATE vehicles SET status='on_trip'", rowcount=0)
+    db.on("SELECT status, max_capacity_kg FROM vehicles", rows=[{"status": "on_trip", "max_capacity_kg": 500}])
+
+    response = client.post("/trips/", headers=auth("dispatcher"), json=TRIP)
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "Vehicle not available (status: on_trip)"}
+    assert db.statements("UPDATE drivers") == []
+    assert db.statements("INSERT INTO trips") == []
+    assert (db.commits, db.rollbacks) == (0, 1)
+
+
+def test_lost_driver_claim_is_a_conflict(client, auth, db):
+    db.on("UPDATE drivers SET status='on_trip'", rowcount=0)
+    db.on("SELECT status FROM drivers", rows=[{"status": "on_trip"}])
+
+    response = client.post("/trips/", headers=auth("dispatcher"), json=TRIP)
+
+    assert response.status_code == 409
+    assert response.get_json() == {"error": "Driver not available (status: on_trip)"}
+    assert db.statements("INSERT INTO trips") == []
+    assert (db.commits, db.rollbacks) == (0, 1)
+
+
+@pytest.mark.parametrize("vehicle, status, error", [
+    (None, 404, "Vehicle not found"),
+    ({"status": "available", "max_capacity_kg": 50}, 400, "Cargo weight (100kg) exceeds vehicle capacity (50kg)"),
+])
+def test_failed_vehicle_claim_explains_why(client, auth, db, vehicle, status, error):
+    db.on("UPDATE vehicles SET status='on_trip'", rowcount=0)
+    db.on("SELECT status, max_capacity_kg FROM vehicles", rows=[vehicle] if vehicle else [])
+
+    response = client.post("/trips/", headers=auth("dispatcher"), json=TRIP)
+
+    assert response.status_code == status
+    assert response.get_json() == {"error": error}
+    assert db.rollbacks == 1
+
+
+def test_batch_maps_trip_ids_by_vehicle(client, auth, db):
+    db.on("FROM vehicles WHERE id IN", rows=[
+        {"id": 1, "max_capacity_kg": 500, "status": "available", "odometer_reading": 10},
+        {"id": 3, "max_capacity_kg": 500, "status": "available", "odometer_reading": 30},
+    ])
+    db.on("FROM drivers WHERE id IN", rows=[
+        {"id": 2, "status": "on_duty", "license_expiry_date": date(2099, 1, 1)},
+        {"id": 4, "status": "on_duty", "license_expiry_date": date(2099, 1, 1)},
+    ])
+    # The executemany INSERT reports 101 as its first id; rows come back in
+    # no particular order and must be matched to items by vehicle.
+    db.on("SELECT id, vehicle_id FROM trips WHERE id >=", rows=[
+        {"id": 101, "vehicle_id": 3},
+        {"id": 102, "vehicle_id": 1},
+    ])
+
+    response = client.post("/trips/batch", headers=auth("dispatcher"), json={"trips": [
+        dict(TRIP, estimated_fuel_cost=200),
+        dict(TRIP, vehicle_id=3, driver_id=4),
+    ]})
+
+    assert response.status_code == 201
+    assert [(r["status"], r["trip_id"]) for r in response.get_json()["results"]] == [
+        ("dispatched", 102), ("dispatched", 101)
+    ]
+    [(_, params)] = db.statements("SELECT id, vehicle_id FROM trips WHERE id >=")
+    assert params == (101, 1, 3)
+    [(_, fuel_rows)] = db.statements("INSERT INTO fuel_logs")
+    assert fuel_rows == [(1, 102, 2.0, 200)]
+    assert db.rollbacks == 0
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from flask import Flask
+
+from app.events import EventBus
+
+
+@pytest.fixture
+def bus():
+    app = Flask(__name__)
+    app.config.update(
+        EVENTS_ENABLED=True, EVENTS_HEARTBEAT=0.01, EVENTS_MAX_SUBSCRIBERS=3,
+        EVENTS_QUEUE_SIZE=3, EVENTS_BUFFER_SIZE=4
+    )
+    bus = EventBus()
+    bus.init_app(app)
+    with app.app_context():
+        yield bus
+
+
+def names(frames):
+    return [line.split(": ", 1)[1] for frame in frames for line in frame.splitlines() if line.startswith("event: ")]
+
+
+def ids(frames):
+    return [
+        json.loads(line.split(": ", 1)[1])["id"]
+        for frame in frames for line in frame.splitlines() if line.startswith("data: ")
+    ]
+
+
+def test_publish_reaches_matching_subscribers_only(bus):
+    trips = bus.subscribe({"trips"})
+    drivers = bus.subscribe({"drivers"})
+
+    bus.publish("trips", "created", 1, status="dispatched")
+
+    assert ids(bus.wait(trips, 0)) == [1]
+    assert bus.wait(drivers, 0) == []
+    assert bus.stats()["delivered"] == 1
+
+
+def test_resume_replays_missed_events(bus):
+    bus.publish("trips", "created", 1)
+    last_seen = f"{bus.epoch}-1"
+    bus.publish("drivers", "updated", 2)
+    bus.publish("trips", "updated", 3)
+
+    subscriber = bus.subscribe({"trips"}, last_seen)
+
+    assert ids(bus.wait(subscriber, 0)) == [3]
+    assert subscriber.start_id == last_seen
+
+
+def test_resume_from_latest_id_replays_nothing(bus):
+    bus.publish("trips", "created", 1)
+
+    subscriber = bus.subscribe({"trips"}, f"{bus.epoch}-1")
+
+    assert bus.wait(subscriber, 0) == []
+    assert bus.stats()["resets"] == 0
+
+
+@pytest.mark.parametrize("last_event_id", ["0-1", "garbage", "{epoch}-99", "{epoch}-"])
+def test_unknown_last_event_id_gets_reset(bus, last_event_id):
+    bus.publish("trips", "created", 1)
+
+    subscriber = bus.subscribe({"trips"}, last_event_id.format(epoch=bus.epoch))
+
+    assert names(bus.wait(subscriber, 0)) == ["reset"]
+    assert bus.stats()["resets"] == 1
+
+
+def test_id_older_than_buffer_gets_reset(bus):
+    for trip_id in range(1, 7):
+        bus.publish("trips", "created", trip_id)
+
+    expired = bus.subscribe({"trips"}, f"{bus.epoch}-1")
+    oldest_kept = bus.subscribe({"trips"}, f"{bus.epoch}-2")
+
+    assert names(bus.wait(expired, 0)) == ["reset"]
+    assert ids(bus.wait(oldest_kept, 0)) == [3, 4, 5, 6]
+
+
+def test_resume_on_empty_bus(bus):
+    subscriber = bus.subscribe({"trips"}, f"{bus.epoch}-0")
+
+    assert bus.wait(subscriber, 0) == []
+    assert bus.stats()["resets"] == 0
+
+
+def test_slow_subscriber_overflows_and_is_dropped(bus):
+    stream = bus.stream({"trips"})
+    assert next(stream).startswith("retry: 3000\nid: ")
+
+    for trip_id in range(1, 5):
+        bus.publish("trips", "created", trip_id)
+
+    assert ids([next(stream)]) == [1, 2, 3]
+    assert names([next(stream)]) == ["overflow"]
+    with pytest.raises(StopIteration):
+        next(stream)
+    assert bus.stats()["subscribers"] == 0
+    assert bus.stats()["overflows"] == 1
+
+
+def test_stream_subscribes_lazily_and_unsubscribes_on_close(bus):
+    stream = bus.stream({"trips"})
+    assert bus.stats()["subscribers"] == 0
+
+    next(stream)
+    assert bus.stats()["subscribers"] == 1
+    assert next(stream) == ": heartbeat\n\n"
+
+    stream.close()
+    assert bus.stats()["subscribers"] == 0
+
+
+def test_full_bus_sends_busy(bus):
+    for _ in range(3):
+        bus.subscribe({"trips"})
+
+    assert bus.full()
+    assert names(list(bus.stream({"trips"}))) == ["busy"]
+
+
+def test_disabled_bus_publishes_nothing(bus):
+    subscriber = bus.subscribe({"trips"})
+    bus.enabled = False
+
+    bus.publish("trips", "created", 1)
+
+    assert bus.wait(subscriber, 0) == []
+    assert bus.stats()["published"] == 0
@@ -0,0 +1,19 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import jsonify
+
+
+def test_jsonify_emits_iso_dates_and_string_decimals(app):
+    with app.app_context():
+        response = jsonify({
+            "service_date": date(2030, 1, 1),
+            "created_at": datetime(2030, 1, 1, 10, 0, 0),
+            "cost": Decimal("1250.50"),
+        })
+
+    assert response.get_json() == {
+        "service_date": "2030-01-01",
+        "created_at": "2030-01-01T10:00:00",
+        "cost": "1250.50",
+    }
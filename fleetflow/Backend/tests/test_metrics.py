@@ -0,0 +1,27 @@
+from flask import Flask, Response, jsonify
+
+from app.metrics import Metrics
+
+
+def test_event_streams_are_counted_but_not_timed():
+    app = Flask(__name__)
+    app.config["METRICS_ENABLED"] = True
+    metrics = Metrics()
+    metrics.init_app(app)
+
+    @app.get("/stream")
+    def stream():
+        return Response(iter(["data: 1\n\n"]), mimetype="text/event-stream")
+
+    @app.get("/plain")
+    def plain():
+        return jsonify({"ok": True})
+
+    client = app.test_client()
+    client.get("/stream").get_data()
+    client.get("/plain")
+
+    assert metrics._responses == {("stream", "GET", 200): 1, ("plain", "GET", 200): 1}
+    assert list(metrics._latency) == [("plain", "GET")]
+    assert list(metrics._db_time) == [("plain", "GET")]
+    assert metrics._in_flight == 0
@@ -0,0 +1,89 @@
+import random
+
+from app.planning import plan_loads
+
+
+def shipment(weight, origin="Depot", destination="City"):
+    return {"weight": weight, "origin": origin, "destination": destination}
+
+
+def check_plan(trips, unassigned, shipments, vehicles):
+    capacity = {vehicle_id: cap for cap, vehicle_id in vehicles}
+    used = [trip["vehicle_id"] for trip in trips]
+    assert len(used) == len(set(used))
+
+    placed = []
+    for trip in trips:
+        assert trip["capacity"] == capacity[trip["vehicle_id"]]
+        assert trip["cargo_weight"] <= trip["capacity"]
+        assert trip["cargo_weight"] == sum(shipments[i]["weight"] for i in trip["shipments"])
+        lanes = {(shipments[i]["origin"], shipments[i]["destination"]) for i in trip["shipments"]}
+        assert lanes == {(trip["origin"], trip["destination"])}
+        placed.extend(trip["shipments"])
+
+    assert sorted(placed + unassigned) == list(range(len(shipments)))
+
+
+def test_empty_inputs():
+    assert plan_loads([], []) == ([], [])
+    assert plan_loads([], [(1000, 1)]) == ([], [])
+
+
+def test_no_vehicles_leaves_everything_unassigned():
+    assert plan_loads([shipment(10), shipment(20)], []) == ([], [0, 1])
+
+
+def test_shipment_heavier_than_any_vehicle_is_unassigned():
+    shipments = [shipment(5000), shipment(300)]
+    trips, unassigned = plan_loads(shipments, [(1000, 1)])
+
+    assert unassigned == [0]
+    assert [(trip["vehicle_id"], trip["shipments"]) for trip in trips] == [(1, [1])]
+
+
+def test_load_moves_to_smallest_vehicle_that_carries_it():
+    shipments = [shipment(300), shipment(200)]
+    trips, unassigned = plan_loads(shipments, [(20000, 3), (600, 2), (1000, 1)])
+
+    assert unassigned == []
+    assert len(trips) == 1
+    assert trips[0]["vehicle_id"] == 2
+    assert trips[0]["cargo_weight"] == 500
+    assert trips[0]["shipments"] == [0, 1]
+
+
+def test_exact_fit_shares_a_vehicle():
+    shipments = [shipment(400), shipment(600)]
+    trips, _ = plan_loads(shipments, [(1000, 1), (1000, 2)])
+
+    assert len(trips) == 1
+    assert trips[0]["cargo_weight"] == 1000
+
+
+def test_lanes_never_share_a_vehicle():
+    shipments = [shipment(100, "A", "B"), shipment(100, "A", "C"), shipment(100, "A", "B")]
+    vehicles = [(1000, 1), (1000, 2), (1000, 3)]
+    trips, unassigned = plan_loads(shipments, vehicles)
+
+    assert unassigned == []
+    assert sorted(trip["shipments"] for trip in trips) == [[0, 2], [1]]
+    check_plan(trips, unassigned, shipments, vehicles)
+
+
+def test_heaviest_lane_is_planned_first_when_vehicles_run_out():
+    shipments = [shipment(100, "A", "B"), shipment(900, "A", "C")]
+    trips, unassigned = plan_loads(shipments, [(1000, 1)])
+
+    assert unassigned == [0]
+    assert trips[0]["destination"] == "C"
+
+
+def test_random_plans_are_consistent():
+    rng = random.Random(7)
+    lanes = [(f"Depot {i}", f"City {i}") for i in range(12)]
+    shipments = [shipment(rng.randint(20, 1200), *rng.choice(lanes)) for _ in range(400)]
+    vehicles = [(rng.choice([800, 1500, 3500, 8000]), vehicle_id) for vehicle_id in range(1, 80)]
+
+    trips, unassigned = plan_loads(shipments, vehicles)
+
+    check_plan(trips, unassigned, shipments, vehicles)
@@ -0,0 +1,73 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from app.projection import ENTITIES, Projection, ProjectionError, from_request
+
+
+def test_defaults_keep_joins_and_put_id_first():
+    projection = from_request("trips", MultiDict())
+
+    assert projection.fields == ENTITIES["trips"]["default"]
+    assert projection.fields[0] == "id"
+    assert projection.source == (
+        "trips t JOIN vehicles v ON t.vehicle_id = v.id JOIN drivers d ON t.driver_id = d.id"
+    )
+    assert projection.format == "rows"
+
+
+def test_selected_fields_drop_unused_joins():
+    projection = from_request("trips", MultiDict({"fields": "status, driver_name,status"}))
+
+    assert projection.fields == ["id", "status", "driver_name"]
+    assert projection.select() == (
+        "SELECT t.id, t.status, d.name AS driver_name FROM trips t JOIN drivers d ON t.driver_id = d.id"
+    )
+
+
+def test_fields_without_joins():
+    projection = from_request("trips", MultiDict({"fields": "origin"}))
+
+    assert projection.source == "trips t"
+
+
+def test_required_fields_are_added_once():
+    projection = from_request("maintenance_logs", MultiDict({"fields": "cost,updated_at"}), ("updated_at",))
+
+    assert projection.fields == ["id", "updated_at", "cost"]
+
+
+def test_entity_without_default_selects_every_field():
+    projection = Projection("vehicles")
+
+    assert projection.fields == list(ENTITIES["vehicles"]["fields"])
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ProjectionError) as error:
+        from_request("vehicles", MultiDict({"fields": "id,colour,engine"}))
+
+    assert error.value.message == "Unknown vehicles fields: colour, engine"
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ProjectionError, match="format must be one of columns, rows"):
+        from_request("vehicles", MultiDict({"format": "csv"}))
+
+
+def test_shape_rows_and_columns():
+    names = ("id", "status")
+    rows = [(1, "available"), (2, "in_shop")]
+
+    assert Projection("vehicles").shape(names, rows) == [
+        {"id": 1, "status": "available"}, {"id": 2, "status": "in_shop"}
+    ]
+    assert Projection("vehicles", fmt="columns").shape(names, rows) == {
+        "id": [1, 2], "status": ["available", "in_shop"]
+    }
+
+
+def test_shape_empty_rows():
+    names = ("id", "status")
+
+    assert Projection("vehicles").shape(names, []) == []
+    assert Projection("vehicles", fmt="columns").shape(names, []) == {"id": [], "status": []}
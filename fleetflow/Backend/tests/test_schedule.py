@@ -0,0 +1,215 @@
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schedule import ScheduleIndex, WindowIndex, find_conflict, parse_datetime
+
+
+def at(hour):
+    return datetime(2030, 1, 1) + timedelta(hours=hour)
+
+
+def window(start, end, kind="trip", booking_id=1):
+    return (at(start), at(end), kind, booking_id)
+
+
+def index_with(*windows, owner_id=1):
+    index = WindowIndex()
+    index.replace(owner_id, list(windows))
+    return index
+
+
+def test_empty_index_has_no_conflicts():
+    index = WindowIndex()
+
+    assert index.conflict(1, at(0), at(24)) is None
+    assert index.overlapping(1, at(0), at(24)) == []
+    assert len(index) == 0
+
+
+def test_touching_windows_do_not_conflict():
+    index = index_with(window(10, 12))
+
+    assert index.conflict(1, at(12), at(14)) is None
+    assert index.conflict(1, at(8), at(10)) is None
+    assert index.overlapping(1, at(8), at(10)) == []
+    assert index.overlapping(1, at(12), at(14)) == []
+
+
+def test_overlaps_are_found():
+    booked = window(10, 12)
+    index = index_with(booked)
+
+    assert index.conflict(1, at(11), at(13)) == booked
+    assert index.conflict(1, at(9), at(11)) == booked
+    assert index.conflict(1, at(9), at(13)) == booked
+    assert index.conflict(1, at(10.5), at(11)) == booked
+
+
+def test_conflict_picks_the_window_reaching_into_the_range():
+    index = index_with(window(1, 2, booking_id=1), window(5, 6, booking_id=2), window(8, 9, booking_id=3))
+
+    assert index.conflict(1, at(2), at(5)) is None
+    assert index.conflict(1, at(5.5), at(7))[3] == 2
+    assert index.conflict(1, at(7), at(20))[3] == 3
+
+
+def test_zero_length_range_finds_window_in_progress():
+    index = index_with(window(10, 12))
+
+    assert index.conflict(1, at(11), at(11)) is not None
+    assert index.conflict(1, at(12), at(12)) is None
+
+
+def test_overlapping_returns_every_window_in_order():
+    index = index_with(window(5, 6, booking_id=2), window(1, 2, booking_id=1), window(8, 9, booking_id=3))
+
+    assert [w[3] for w in index.overlapping(1, at(1.5), at(8.5))] == [1, 2, 3]
+    assert [w[3] for w in index.overlapping(1, at(2), at(8))] == [2]
+
+
+def test_replace_with_no_windows_forgets_the_owner():
+    index = index_with(window(10, 12))
+    index.replace(2, [window(1, 2)])
+    index.replace(1, [])
+
+    assert index.conflict(1, at(0), at(24)) is None
+    assert len(index) == 1
+
+
+def test_owners_are_independent():
+    index = index_with(window(10, 12), owner_id=1)
+
+    assert index.conflict(2, at(10), at(12)) is None
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+
+def test_find_conflict_can_exclude_a_trip():
+    cursor = RecordingCursor()
+
+    assert find_conflict(cursor, at(0), at(1), vehicle_id=3, driver_id=4, exclude_trip_id=9) is None
+
+    (vehicle_sql, vehicle_params), (driver_sql, driver_params) = cursor.executed
+    assert "id <> %s" in vehicle_sql and "id <> %s" in driver_sql
+    assert vehicle_params == (3, at(0), at(1), 9, 3, at(0), at(1))
+    assert driver_params == (4, at(0), at(1), 9)
+
+
+def test_find_conflict_without_exclusion():
+    cursor = RecordingCursor()
+
+    find_conflict(cursor, at(0), at(1), vehicle_id=3)
+
+    ((sql, params),) = cursor.executed
+    assert "id <>" not in sql
+    assert params == (3, at(0), at(1), 3, at(0), at(1))
+
+
+def test_parse_datetime():
+    assert parse_datetime(None) is None
+    assert parse_datetime("") is None
+    assert parse_datetime("2030-01-01T10:00:00") == datetime(2030, 1, 1, 10)
+
+    aware = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+    parsed = parse_datetime(aware.isoformat())
+    assert parsed.tzinfo is None
+    assert parsed == aware.astimezone().replace(tzinfo=None)
+
+
+class WindowCursor(RecordingCursor):
+    def __init__(self, index, vehicle_rows, driver_rows):
+        super().__init__()
+        self.index = index
+        self.results = [vehicle_rows, driver_rows]
+
+    def execute(self, sql, params=()):
+        # The index lock must be free while the database is queried.
+        assert not self.index._lock.locked()
+        super().execute(sql, params)
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+    def close(self):
+        pass
+
+
+def fake_connection(monkeypatch, cursor):
+    class Connection:
+        def cursor(self, **kwargs):
+            return cursor
+
+    class Checkout:
+        def __enter__(self):
+            return Connection()
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(sys.modules["app.schedule"], "pooled_connection", Checkout)
+
+
+def row(owner_id, start, end, kind="trip", booking_id=1):
+    return {"owner_id": owner_id, "planned_start": at(start), "planned_end": at(end), "kind": kind, "id": booking_id}
+
+
+def test_schedule_index_loads_outside_its_lock(monkeypatch):
+    index = ScheduleIndex()
+    cursor = WindowCursor(index, [row(1, 10, 12)], [row(2, 10, 12)])
+    fake_connection(monkeypatch, cursor)
+
+    assert index.conflict(1, None, at(11), at(13)) == ("vehicle", window(10, 12))
+    assert index.conflict(5, 2, at(11), at(13)) == ("driver", window(10, 12))
+    assert len(cursor.executed) == 2
+
+
+def test_schedule_index_reloads_only_dirty_owners(monkeypatch):
+    index = ScheduleIndex()
+    fake_connection(monkeypatch, WindowCursor(index, [row(1, 10, 12), row(3, 1, 2)], []))
+    index.windows(at(0), at(24), vehicle_id=1)
+
+    index.vehicles_changed(1)
+    cursor = WindowCursor(index, [], [])
+    fake_connection(monkeypatch, cursor)
+
+    assert index.windows(at(0), at(24), vehicle_id=1) == []
+    assert index.windows(at(0), at(24), vehicle_id=3) == [window(1, 2)]
+    ((sql, params),) = cursor.executed
+    assert params == (1, 1)
+
+
+def test_failed_refresh_keeps_owners_dirty(monkeypatch):
+    index = ScheduleIndex()
+    fake_connection(monkeypatch, WindowCursor(index, [], []))
+    index.windows(at(0), at(24), vehicle_id=1)
+    index.vehicles_changed(1)
+
+    class BrokenCursor(WindowCursor):
+        def execute(self, sql, params=()):
+            raise RuntimeError("connection lost")
+
+    fake_connection(monkeypatch, BrokenCursor(index, [], []))
+    with pytest.raises(RuntimeError):
+        index.windows(at(0), at(24), vehicle_id=1)
+
+    assert index._dirty_vehicles == {1}
+
+
+def test_parse_datetime_rejects_non_strings():
+    for value in [1893456000, 12.5, True, ["2030-01-01"]]:
+        with pytest.raises(ValueError):
+            parse_datetime(value)
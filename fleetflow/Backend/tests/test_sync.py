@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import sync
+
+NOW = datetime(2030, 1, 1, 12, 0, 0, 250000)
+
+
+def test_tokens_round_trip():
+    token = sync.make_token(NOW, 42)
+
+    assert token == "20300101120000250000.42"
+    assert sync.parse_token(token) == (NOW, 42)
+    assert sync.parse_token("0") == (None, 0)
+
+
+@pytest.mark.parametrize("token", ["yesterday", "20300101.x", ""])
+def test_malformed_token_is_rejected(client, auth, db, token):
+    response = client.get(f"/vehicles/?since={token}", headers=auth())
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid since token"}
+
+
+def test_delete_leaves_a_tombstone_before_the_row_goes(client, auth, db):
+    db.on("SELECT status FROM vehicles WHERE id=%s FOR UPDATE", rows=[{"status": "available"}])
+    db.on("AS maintenance", rows=[{"fuel": 0, "maintenance": 0}])
+
+    assert client.delete("/vehicles/7", headers=auth()).status_code == 200
+
+    statements = [sql for sql, _ in db.executed]
+    tombstone = statements.index("INSERT INTO sync_tombstones (entity, row_id) SELECT %s, id FROM vehicles WHERE id=%s")
+    assert tombstone < statements.index("DELETE FROM vehicles WHERE id=%s")
+    assert db.executed[tombstone][1] == ("vehicles", 7)
+
+
+def test_sync_returns_changes_tombstones_and_next_token(client, auth, db):
+    since = NOW - timedelta(minutes=10)
+    db.on("SELECT NOW(6)", rows=[(NOW,)])
+    db.on("FROM vehicles v WHERE", rows=[(3, since + timedelta(minutes=1))], columns=("id", "updated_at"))
+    db.on("FROM sync_tombstones", rows=[(7,), (9,)])
+
+    response = client.get(f"/vehicles/?since={sync.make_token(since, 5)}", headers=auth())
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [row["id"] for row in body["changed"]] == [3]
+    assert body["deleted"] == [7, 9]
+    assert body["has_more"] is False
+    # Caught up: the next token trails the database clock by SYNC_GRACE.
+    assert body["token"] == sync.make_token(NOW - timedelta(seconds=5))
+
+    [(_, params)] = db.statements("FROM sync_tombstones")
+    assert params == ("vehicles", since)
+
+
+def test_expired_token_asks_for_a_full_reload(client, auth, db):
+    db.on("SELECT NOW(6)", rows=[(NOW,)])
+
+    response = client.get(f"/vehicles/?since={sync.make_token(NOW - timedelta(days=31))}", headers=auth())
+
+    assert response.status_code == 410
+    assert db.statements("FROM sync_tombstones") == []
@@ -0,0 +1,33 @@
+VEHICLE = {
+    "model_name": "Actros", "license_plate": "FF-001", "vehicle_type": "truck",
+    "required_license_category": "C", "max_capacity_kg": 18000
+}
+
+
+def test_matching_etag_gets_304_without_running_the_view(client, auth, db):
+    db.on("FROM table_versions", rows=[("vehicles", 3)])
+
+    first = client.get("/vehicles/", headers=auth())
+    assert first.status_code == 200
+    assert first.headers["ETag"] == 'W/"vehicles.3"'
+
+    again = client.get("/vehicles/", headers=dict(auth(), **{"If-None-Match": first.headers["ETag"]}))
+    assert again.status_code == 304
+    assert again.get_data() == b""
+    assert len(db.statements("FROM vehicles v")) == 1
+
+
+def test_write_bumps_the_version_and_retires_the_etag(client, auth, db):
+    db.on("FROM table_versions", rows=[("vehicles", 3)])
+    etag = client.get("/vehicles/", headers=auth()).headers["ETag"]
+
+    assert client.post("/vehicles/", headers=auth(), json=VEHICLE).status_code == 201
+
+    [(sql, params)] = db.statements("INSERT INTO table_versions")
+    assert sql.endswith("ON DUPLICATE KEY UPDATE version = version + 1")
+    assert params == ("vehicles",)
+
+    db.on("FROM table_versions", rows=[("vehicles", 4)])
+    response = client.get("/vehicles/", headers=dict(auth(), **{"If-None-Match": etag}))
+    assert response.status_code == 200
+    assert response.headers["ETag"] == 'W/"vehicles.4"'
@@ -0,0 +1,18 @@
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Patch the standard library for gevent before anything else is imported, so
+# sockets, locks, queues and sleeps (including the pool's, and the /events
+# waits) yield to other greenlets instead of blocking the worker.
+from gevent import monkey
+
+monkey.patch_all()
+
+import os
+
+# The C extension of mysql-connector does its own blocking I/O, out of
+# gevent's reach; the pure Python protocol goes through the patched sockets.
+os.environ.setdefault("DB_USE_PURE", "1")
+
+from app import create_app
+
+app = create_app()
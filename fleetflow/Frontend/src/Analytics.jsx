@@ -87,60 +87,20 @@ function Analytics({ onNavigate }) {
       const token = localStorage.getItem("access_token");
       const headers = { Authorization: `Bearer ${token}` };
 
-      // Fetch multiple endpoints in parallel
-      const [tripsRes, vehiclesRes, driversRes, maintenanceRes] = await Promise.allSettled([
-        fetch(`${API_BASE_URL}/trips/`, { headers }),
-        fetch(`${API_BASE_URL}/vehicles/`, { headers }),
-        fetch(`${API_BASE_URL}/drivers/available`, { headers }),
-        fetch(`${API_BASE_URL}/maintenance/`, { headers }),
-      ]);
-
-      const trips = tripsRes.status === "fulfilled" && tripsRes.value.ok ? await tripsRes.value.json() : [];
-      const vehicles = vehiclesRes.status === "fulfilled" && vehiclesRes.value.ok ? await vehiclesRes.value.json() : [];
-      const drivers = driversRes.status === "fulfilled" && driversRes.value.ok ? await driversRes.value.json() : [];
-      const maintenance = maintenanceRes.status === "fulfilled" && maintenanceRes.value.ok ? await maintenanceRes.value.json() : [];
-
-      // Process trip statuses
-      const tripStatuses = { draft: 0, dispatched: 0, completed: 0, cancelled: 0 };
-      (Array.isArray(trips) ? trips : []).forEach((t) => {
-        if (tripStatuses[t.status] !== undefined) tripStatuses[t.status]++;
-      });
-
-      // Process vehicle statuses
-      const vehicleStatuses = { active: 0, idle: 0, in_shop: 0 };
-      (Array.isArray(vehicles) ? vehicles : []).forEach((v) => {
-        const s = (v.status || "idle").toLowerCase();
-        if (s === "active" || s === "on_trip") vehicleStatuses.active++;
-        else if (s === "in_shop" || s === "maintenance") vehicleStatuses.in_shop++;
-        else vehicleStatuses.idle++;
-      });
-
-      // Process maintenance costs
-      let totalMaintCost = 0;
-      let maintenanceByMonth = {};
-      (Array.isArray(maintenance) ? maintenance : []).forEach((m) => {
-        totalMaintCost += parseFloat(m.cost) || 0;
-        const month = (m.service_date || "").substring(0, 7);
-        if (month) {
-          maintenanceByMonth[month] = (maintenanceByMonth[month] || 0) + (parseFloat(m.cost) || 0);
-        }
-      });
-
-      // Fuel cost from trips
-      let totalFuelCost = 0;
-      (Array.isArray(trips) ? trips : []).forEach((t) => {
-        totalFuelCost += parseFloat(t.estimated_fuel_cost) || 0;
-      });
+      // Counts and totals are aggregated server-side
+      const res = await fetch(`${API_BASE_URL}/analytics/summary`, { headers });
+      if (!res.ok) throw new Error(`Summary request failed (${res.status})`);
+      const summary = await res.json();
 
       setStats({
-        tripStatuses,
-        vehicleStatuses,
-        totalVehicles: Array.isArray(vehicles) ? vehicles.length : 0,
-        totalDrivers: Array.isArray(drivers) ? drivers.length : 0,
-        totalTrips: Array.isArray(trips) ? trips.length : 0,
-        totalMaintenance: Array.isArray(maintenance) ? maintenance.length : 0,
-        totalMaintCost,
-        totalFuelCost,
+        tripStatuses: summary.trip_statuses,
+        vehicleStatuses: summary.vehicle_statuses,
+        totalVehicles: summary.fleet.vehicles,
+        totalDrivers: summary.fleet.available_drivers,
+        totalTrips: summary.fleet.trips,
+        totalMaintenance: summary.fleet.maintenance_logs,
+        totalMaintCost: summary.costs.maintenance,
+        totalFuelCost: summary.costs.fuel,
       });
     } catch (err) {
       console.error("Analytics fetch error:", err);
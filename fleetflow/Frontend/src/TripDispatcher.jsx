@@ -4,6 +4,7 @@ import "./TripDispatcher.css";
 
 function TripDispatcher({ onNavigate }) {
   const [trips, setTrips] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [vehicles, setVehicles] = useState([]);
   const [drivers, setDrivers] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -22,11 +23,13 @@ function TripDispatcher({ onNavigate }) {
 
   const API_BASE_URL = "http://127.0.0.1:5000";
 
-  // Fetch trips
-  const fetchTrips = async () => {
+  // Fetch trips. The API returns one page at a time; pass the previous
+  // page's next_cursor as `after` to append the following page.
+  const fetchTrips = async (after = null) => {
     try {
       const token = localStorage.getItem("access_token");
-      const response = await fetch(`${API_BASE_URL}/trips/`, {
+      const query = after === null ? "" : `?after=${after}`;
+      const response = await fetch(`${API_BASE_URL}/trips/${query}`, {
         headers: {
           Authorization: `Bearer ${token}`,
         },
@@ -34,7 +37,10 @@ function TripDispatcher({ onNavigate }) {
 
       if (response.ok) {
         const data = await response.json();
-        setTrips(data);
+        setTrips((current) =>
+          after === null ? data.trips : [...current, ...data.trips]
+        );
+        setNextCursor(data.next_cursor);
       } else {
         setError("Failed to fetch trips");
       }
@@ -186,6 +192,7 @@ function TripDispatcher({ onNavigate }) {
   const getStatusClass = (status) => {
     const statusMap = {
       draft: "status-draft",
+      scheduled: "status-scheduled",
       dispatched: "status-dispatched",
       completed: "status-completed",
       cancelled: "status-cancelled",
@@ -196,6 +203,7 @@ function TripDispatcher({ onNavigate }) {
   const getStatusDisplay = (status) => {
     const statusMap = {
       draft: "Draft",
+      scheduled: "Scheduled",
       dispatched: "On Way",
       completed: "Completed",
       cancelled: "Cancelled",
@@ -274,6 +282,16 @@ function TripDispatcher({ onNavigate }) {
                 )}
               </tbody>
             </table>
+
+            {nextCursor !== null && (
+              <button
+                className="btn-load-more"
+                onClick={() => fetchTrips(nextCursor)}
+                aria-label="Load more trips"
+              >
+                Load More
+              </button>
+            )}
           </div>
 
           {showForm && (
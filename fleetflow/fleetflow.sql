@@ -44,6 +44,62 @@ LOCK TABLES `audit_logs` WRITE;
 /*!40000 ALTER TABLE `audit_logs` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `cost_rollups`
+--
+
+DROP TABLE IF EXISTS `cost_rollups`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `cost_rollups` (
+  `granularity` enum('day','week','month') NOT NULL,
+  `bucket` date NOT NULL,
+  `vehicle_id` int NOT NULL,
+  `revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `fuel_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `maintenance_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `misc_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`granularity`,`bucket`,`vehicle_id`),
+  KEY `idx_cost_rollups_vehicle` (`vehicle_id`,`granularity`,`bucket`),
+  CONSTRAINT `cost_rollups_ibfk_1` FOREIGN KEY (`vehicle_id`) REFERENCES `vehicles` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `cost_rollups`
+--
+
+LOCK TABLES `cost_rollups` WRITE;
+/*!40000 ALTER TABLE `cost_rollups` DISABLE KEYS */;
+/*!40000 ALTER TABLE `cost_rollups` ENABLE KEYS */;
+UNLOCK TABLES;
+
+--
+-- Table structure for table `driver_stats`
+--
+
+DROP TABLE IF EXISTS `driver_stats`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `driver_stats` (
+  `driver_id` int NOT NULL,
+  `total_trips` int NOT NULL DEFAULT '0',
+  `completed_trips` int NOT NULL DEFAULT '0',
+  `cancelled_trips` int NOT NULL DEFAULT '0',
+  PRIMARY KEY (`driver_id`),
+  CONSTRAINT `driver_stats_ibfk_1` FOREIGN KEY (`driver_id`) REFERENCES `drivers` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `driver_stats`
+--
+
+LOCK TABLES `driver_stats` WRITE;
+/*!40000 ALTER TABLE `driver_stats` DISABLE KEYS */;
+/*!40000 ALTER TABLE `driver_stats` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `drivers`
 --
@@ -60,8 +116,10 @@ CREATE TABLE `drivers` (
   `status` enum('on_duty','off_duty','suspended','on_trip') DEFAULT 'off_duty',
   `safety_score` int DEFAULT '100',
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   PRIMARY KEY (`id`),
   UNIQUE KEY `license_number` (`license_number`),
+  KEY `idx_drivers_updated` (`updated_at`),
   CONSTRAINT `drivers_chk_1` CHECK ((`safety_score` >= 0))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -75,6 +133,35 @@ LOCK TABLES `drivers` WRITE;
 /*!40000 ALTER TABLE `drivers` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `fleet_counters`
+--
+
+DROP TABLE IF EXISTS `fleet_counters`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `fleet_counters` (
+  `id` tinyint NOT NULL DEFAULT '1',
+  `total_vehicles` int NOT NULL DEFAULT '0',
+  `on_trip_vehicles` int NOT NULL DEFAULT '0',
+  `in_shop_vehicles` int NOT NULL DEFAULT '0',
+  `fuel_cost` decimal(16,2) NOT NULL DEFAULT '0.00',
+  `maintenance_cost` decimal(16,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`id`),
+  CONSTRAINT `fleet_counters_chk_1` CHECK ((`id` = 1))
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `fleet_counters`
+--
+
+LOCK TABLES `fleet_counters` WRITE;
+/*!40000 ALTER TABLE `fleet_counters` DISABLE KEYS */;
+INSERT INTO `fleet_counters` VALUES (1,0,0,0,0.00,0.00);
+/*!40000 ALTER TABLE `fleet_counters` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `fuel_logs`
 --
@@ -122,10 +209,16 @@ CREATE TABLE `maintenance_logs` (
   `description` text,
   `cost` decimal(12,2) DEFAULT '0.00',
   `service_date` date DEFAULT (curdate()),
+  `planned_start` datetime DEFAULT NULL,
+  `planned_end` datetime DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   PRIMARY KEY (`id`),
   KEY `idx_maintenance_vehicle` (`vehicle_id`),
+  KEY `idx_maintenance_vehicle_window` (`vehicle_id`,`planned_end`),
+  KEY `idx_maintenance_updated` (`updated_at`),
   CONSTRAINT `maintenance_logs_ibfk_1` FOREIGN KEY (`vehicle_id`) REFERENCES `vehicles` (`id`) ON DELETE CASCADE,
-  CONSTRAINT `maintenance_logs_chk_1` CHECK ((`cost` >= 0))
+  CONSTRAINT `maintenance_logs_chk_1` CHECK ((`cost` >= 0)),
+  CONSTRAINT `maintenance_logs_chk_2` CHECK (((`planned_end` is null) or (`planned_end` > `planned_start`)))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -138,6 +231,56 @@ LOCK TABLES `maintenance_logs` WRITE;
 /*!40000 ALTER TABLE `maintenance_logs` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `sync_tombstones`
+--
+
+DROP TABLE IF EXISTS `sync_tombstones`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `sync_tombstones` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `entity` varchar(32) NOT NULL,
+  `row_id` int NOT NULL,
+  `deleted_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  PRIMARY KEY (`id`),
+  KEY `idx_sync_tombstones_entity` (`entity`,`deleted_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `sync_tombstones`
+--
+
+LOCK TABLES `sync_tombstones` WRITE;
+/*!40000 ALTER TABLE `sync_tombstones` DISABLE KEYS */;
+/*!40000 ALTER TABLE `sync_tombstones` ENABLE KEYS */;
+UNLOCK TABLES;
+
+--
+-- Table structure for table `table_versions`
+--
+
+DROP TABLE IF EXISTS `table_versions`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `table_versions` (
+  `name` varchar(32) NOT NULL,
+  `version` bigint NOT NULL DEFAULT '0',
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `table_versions`
+--
+
+LOCK TABLES `table_versions` WRITE;
+/*!40000 ALTER TABLE `table_versions` DISABLE KEYS */;
+INSERT INTO `table_versions` VALUES ('drivers',0),('maintenance',0),('vehicles',0);
+/*!40000 ALTER TABLE `table_versions` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `trips`
 --
@@ -154,18 +297,27 @@ CREATE TABLE `trips` (
   `destination` varchar(200) NOT NULL,
   `start_odometer` int DEFAULT NULL,
   `end_odometer` int DEFAULT NULL,
-  `status` enum('draft','dispatched','completed','cancelled') DEFAULT 'draft',
+  `status` enum('draft','scheduled','dispatched','completed','cancelled') DEFAULT 'draft',
   `revenue` decimal(12,2) DEFAULT '0.00',
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
   `completed_at` timestamp NULL DEFAULT NULL,
+  `planned_start` datetime DEFAULT NULL,
+  `planned_end` datetime DEFAULT NULL,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   PRIMARY KEY (`id`),
   KEY `idx_trips_vehicle` (`vehicle_id`),
   KEY `idx_trips_driver` (`driver_id`),
+  KEY `idx_trips_status_id` (`status`,`id`),
+  KEY `idx_trips_created_id` (`created_at`,`id`),
+  KEY `idx_trips_vehicle_window` (`vehicle_id`,`planned_end`),
+  KEY `idx_trips_driver_window` (`driver_id`,`planned_end`),
+  KEY `idx_trips_updated` (`updated_at`),
   CONSTRAINT `trips_ibfk_1` FOREIGN KEY (`vehicle_id`) REFERENCES `vehicles` (`id`) ON DELETE RESTRICT,
   CONSTRAINT `trips_ibfk_2` FOREIGN KEY (`driver_id`) REFERENCES `drivers` (`id`) ON DELETE RESTRICT,
   CONSTRAINT `trips_chk_1` CHECK ((`cargo_weight` > 0)),
   CONSTRAINT `trips_chk_2` CHECK ((`revenue` >= 0)),
-  CONSTRAINT `trips_chk_3` CHECK (((`end_odometer` is null) or (`end_odometer` >= `start_odometer`)))
+  CONSTRAINT `trips_chk_3` CHECK (((`end_odometer` is null) or (`end_odometer` >= `start_odometer`))),
+  CONSTRAINT `trips_chk_4` CHECK (((`planned_end` is null) or (`planned_end` > `planned_start`)))
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -207,6 +359,33 @@ LOCK TABLES `users` WRITE;
 /*!40000 ALTER TABLE `users` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `vehicle_ledger`
+--
+
+DROP TABLE IF EXISTS `vehicle_ledger`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `vehicle_ledger` (
+  `vehicle_id` int NOT NULL,
+  `revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `fuel_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `maintenance_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  `misc_cost` decimal(14,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (`vehicle_id`),
+  CONSTRAINT `vehicle_ledger_ibfk_1` FOREIGN KEY (`vehicle_id`) REFERENCES `vehicles` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `vehicle_ledger`
+--
+
+LOCK TABLES `vehicle_ledger` WRITE;
+/*!40000 ALTER TABLE `vehicle_ledger` DISABLE KEYS */;
+/*!40000 ALTER TABLE `vehicle_ledger` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `vehicles`
 --
@@ -225,8 +404,10 @@ CREATE TABLE `vehicles` (
   `status` enum('available','on_trip','in_shop','retired') DEFAULT 'available',
   `acquisition_cost` decimal(12,2) DEFAULT '0.00',
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   PRIMARY KEY (`id`),
   UNIQUE KEY `license_plate` (`license_plate`),
+  KEY `idx_vehicles_updated` (`updated_at`),
   CONSTRAINT `vehicles_chk_1` CHECK ((`max_capacity_kg` > 0)),
   CONSTRAINT `vehicles_chk_2` CHECK ((`odometer_reading` >= 0)),
   CONSTRAINT `vehicles_chk_3` CHECK ((`acquisition_cost` >= 0))